@@ -1,6 +1,48 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, Event, BudgetItem, Guest, Vendor, SubscriptionPlan, UserSubscription, PaymentRequest, PaymentHistory, UserSettings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from .models import User, Event, BudgetItem, Guest, Vendor, SubscriptionPlan, UserSubscription, PaymentRequest, PaymentHistory, UserSettings, EventTemplate, Contact, ContactGroup, ArchivedEvent, DeletionJob
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that uses the query planner's row estimate for large result sets.
+
+    An exact COUNT(*) is only run when the estimate is small (or the database
+    can't provide one), so paging through millions of rows stays cheap.
+    """
+    exact_count_threshold = 10000
+
+    @cached_property
+    def count(self):
+        estimate = self._estimated_count()
+        if estimate is None or estimate < self.exact_count_threshold:
+            return super().count
+        return estimate
+
+    def _estimated_count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+class PerformanceModelAdmin(admin.ModelAdmin):
+    """Changelist defaults for tables that grow to millions of rows.
+
+    Subclasses should also set ``list_select_related`` for FK columns and
+    ``autocomplete_fields`` for FK inputs, and keep ``search_fields`` to
+    prefix (``^``) or exact (``=``) lookups on indexed columns.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
@@ -19,37 +61,85 @@ class UserAdmin(BaseUserAdmin):
     )
 
 @admin.register(Event)
-class EventAdmin(admin.ModelAdmin):
+class EventAdmin(PerformanceModelAdmin):
     list_display = ('name', 'user', 'category', 'date', 'status', 'budget', 'expected_guests', 'created_at')
     list_filter = ('category', 'status', 'date', 'created_at')
-    search_fields = ('name', 'venue', 'user__email')
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
+    search_fields = ('^name', '^venue', '=user__email')
+    search_help_text = 'Event or venue name prefix, or exact owner email'
     ordering = ('-created_at',)
     date_hierarchy = 'date'
 
 @admin.register(BudgetItem)
-class BudgetItemAdmin(admin.ModelAdmin):
+class BudgetItemAdmin(PerformanceModelAdmin):
     list_display = ('item_name', 'event', 'category', 'estimated_cost', 'actual_cost', 'status', 'due_date')
     list_filter = ('category', 'status', 'due_date', 'created_at')
-    search_fields = ('item_name', 'event__name', 'vendor')
+    list_select_related = ('event',)
+    autocomplete_fields = ('event', 'vendor')
+    search_fields = ('^item_name',)
+    search_help_text = 'Item name prefix'
     ordering = ('-created_at',)
 
 @admin.register(Guest)
-class GuestAdmin(admin.ModelAdmin):
+class GuestAdmin(PerformanceModelAdmin):
     list_display = ('name', 'event', 'category', 'rsvp_status', 'plus_ones', 'invitation_sent', 'checked_in')
     list_filter = ('category', 'rsvp_status', 'invitation_sent', 'checked_in', 'created_at')
-    search_fields = ('name', 'email', 'event__name')
+    list_select_related = ('event',)
+    autocomplete_fields = ('event', 'contact')
+    search_fields = ('^name', '=email')
+    search_help_text = 'Guest name prefix or exact email'
+    ordering = ('-created_at',)
+
+@admin.register(Contact)
+class ContactAdmin(PerformanceModelAdmin):
+    list_display = ('name', 'user', 'phone', 'email', 'category', 'created_at')
+    list_filter = ('category', 'created_at')
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
+    search_fields = ('^name', '=normalized_email', '=normalized_phone')
+    search_help_text = 'Contact name prefix, exact email or exact phone with country code'
     ordering = ('-created_at',)
 
+@admin.register(ContactGroup)
+class ContactGroupAdmin(admin.ModelAdmin):
+    list_display = ('name', 'user', 'created_at')
+    list_select_related = ('user',)
+    autocomplete_fields = ('user', 'contacts')
+    search_fields = ('^name',)
+
 @admin.register(Vendor)
-class VendorAdmin(admin.ModelAdmin):
+class VendorAdmin(PerformanceModelAdmin):
     list_display = ('name', 'user', 'category', 'rating', 'price_range', 'is_preferred', 'created_at')
     list_filter = ('category', 'price_range', 'is_preferred', 'created_at')
-    search_fields = ('name', 'services', 'user__email')
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
+    search_fields = ('^name', '=user__email')
+    search_help_text = 'Vendor name prefix or exact owner email'
     ordering = ('-created_at',)
 
+@admin.register(ArchivedEvent)
+class ArchivedEventAdmin(PerformanceModelAdmin):
+    list_display = ('name', 'user', 'category', 'date', 'status', 'guest_count', 'actual_total', 'archived_at')
+    list_filter = ('category', 'status', 'archived_at')
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
+    raw_id_fields = ('series',)
+    search_fields = ('^name', '=user__email')
+    search_help_text = 'Event name prefix or exact owner email'
+    ordering = ('-archived_at',)
+
+@admin.register(DeletionJob)
+class DeletionJobAdmin(admin.ModelAdmin):
+    list_display = ('object_repr', 'model', 'user', 'status', 'deleted_rows', 'total_rows', 'created_at', 'finished_at')
+    list_filter = ('status', 'model')
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
+
 admin.site.register(SubscriptionPlan)
 admin.site.register(UserSubscription)
 admin.site.register(PaymentRequest)
 admin.site.register(PaymentHistory)
 admin.site.register(UserSettings)
 
+admin.site.register(EventTemplate)
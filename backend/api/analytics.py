@@ -1,70 +1,59 @@
 from django.db.models import Sum, Count, Avg, Q, F
-from django.db.models.functions import TruncMonth
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
-from rest_framework.response import Response
-from .models import Event, BudgetItem, Guest, Vendor
+from .async_utils import async_api_view, api_response, gather_queries
+from .deletion import owned_events
+from .models import Event, BudgetItem, Guest, Vendor, EventDailyStats, UserDailyStats, ArchivedEvent
+from .timeseries import timeline_params, daily_rows, bucketed
 from datetime import datetime, timedelta
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def event_analytics(request, event_id):
-    """Get comprehensive analytics for a specific event"""
-    try:
-        event = Event.objects.get(id=event_id, user=request.user)
-    except Event.DoesNotExist:
-        return Response({'error': 'Event not found'}, status=404)
-    
-    # Budget Analytics
-    budget_items = BudgetItem.objects.filter(event=event)
-    budget_stats = budget_items.aggregate(
-        total_estimated=Sum('estimated_cost'),
-        total_actual=Sum('actual_cost'),
-        total_items=Count('id'),
-        paid_items=Count('id', filter=Q(status='paid')),
-        pending_items=Count('id', filter=Q(status='pending')),
-        overdue_items=Count('id', filter=Q(status='overdue'))
-    )
-    
-    # Handle None values
-    budget_stats['total_estimated'] = budget_stats['total_estimated'] or 0
-    budget_stats['total_actual'] = budget_stats['total_actual'] or 0
-    
-    # Budget by category
-    budget_by_category = budget_items.values('category').annotate(
-        estimated=Sum('estimated_cost'),
-        actual=Sum('actual_cost'),
-        count=Count('id')
-    ).order_by('-estimated')
-    
-    # Guest Analytics
-    guests = Guest.objects.filter(event=event)
-    guest_stats = guests.aggregate(
-        total_guests=Count('id'),
-        total_attendees=Sum(F('plus_ones') + 1),
-        confirmed_guests=Count('id', filter=Q(rsvp_status='confirmed')),
-        confirmed_attendees=Sum(F('plus_ones') + 1, filter=Q(rsvp_status='confirmed')),
-        pending_guests=Count('id', filter=Q(rsvp_status='pending')),
-        declined_guests=Count('id', filter=Q(rsvp_status='declined')),
-        checked_in_guests=Count('id', filter=Q(checked_in=True)),
-        checked_in_attendees=Sum(F('plus_ones') + 1, filter=Q(checked_in=True))
-    )
-    
-    # Handle None values for guests
-    for key in guest_stats:
-        guest_stats[key] = guest_stats[key] or 0
-    
-    # Guest by category
-    guest_by_category = guests.values('category').annotate(
-        count=Count('id'),
-        attendees=Sum(F('plus_ones') + 1),
-        confirmed=Count('id', filter=Q(rsvp_status='confirmed'))
-    ).order_by('-count')
-    
-    # Vendor Analytics (user's vendors, not event-specific)
-    user_vendors = Vendor.objects.filter(user=request.user)
+MAX_BATCH_EVENTS = 100
+
+
+def _budget_aggregates():
+    return {
+        'total_estimated': Sum('estimated_cost'),
+        'total_actual': Sum('actual_cost'),
+        'total_items': Count('id'),
+        'paid_items': Count('id', filter=Q(status='paid')),
+        'pending_items': Count('id', filter=Q(status='pending')),
+        'overdue_items': Count('id', filter=Q(status='overdue')),
+    }
+
+
+def _budget_category_aggregates():
+    return {
+        'estimated': Sum('estimated_cost'),
+        'actual': Sum('actual_cost'),
+        'count': Count('id'),
+    }
+
+
+def _guest_aggregates():
+    return {
+        'total_guests': Count('id'),
+        'total_attendees': Sum(F('plus_ones') + 1),
+        'confirmed_guests': Count('id', filter=Q(rsvp_status='confirmed')),
+        'confirmed_attendees': Sum(F('plus_ones') + 1, filter=Q(rsvp_status='confirmed')),
+        'pending_guests': Count('id', filter=Q(rsvp_status='pending')),
+        'declined_guests': Count('id', filter=Q(rsvp_status='declined')),
+        'checked_in_guests': Count('id', filter=Q(checked_in=True)),
+        'checked_in_attendees': Sum(F('plus_ones') + 1, filter=Q(checked_in=True)),
+    }
+
+
+def _guest_category_aggregates():
+    return {
+        'count': Count('id'),
+        'attendees': Sum(F('plus_ones') + 1),
+        'confirmed': Count('id', filter=Q(rsvp_status='confirmed')),
+    }
+
+
+def _vendor_analytics(user):
+    """Vendor block (user's vendors, not event-specific)"""
+    user_vendors = Vendor.objects.filter(user=user)
     vendor_stats = user_vendors.aggregate(
         total_vendors=Count('id'),
         avg_rating=Avg('rating'),
@@ -80,47 +69,20 @@ def event_analytics(request, event_id):
         avg_rating=Avg('rating')
     ).order_by('-count')
     
-    # Timeline data (for charts)
-    # budget_timeline = budget_items.extra(
-    #     select={'month': "DATE_TRUNC('month', created_at)"}
-    # ).values('month').annotate(
-    #     amount=Sum('actual_cost'),
-    #     count=Count('id')
-    # ).order_by('month')
-    
-    # guest_timeline = guests.extra(
-    #     select={'month': "DATE_TRUNC('month', created_at)"}
-    # ).values('month').annotate(
-    #     count=Count('id'),
-    #     attendees=Sum(F('plus_ones') + 1)
-    # ).order_by('month')
-
-    # Budget timeline
-    budget_timeline = budget_items.annotate(
-        month=TruncMonth('created_at')
-    ).values('month').annotate(
-        amount=Sum('actual_cost'),
-        count=Count('id')
-    ).order_by('month')
-
-    # Guest timeline
-    guest_timeline = guests.annotate(
-        month=TruncMonth('created_at')
-    ).values('month').annotate(
-        count=Count('id'),
-        attendees=Sum(F('plus_ones') + 1)
-    ).order_by('month')
+    return {
+        'stats': vendor_stats,
+        'by_category': list(vendor_by_category)
+    }
+
 
+def _event_summary(event, budget_stats, budget_by_category, guest_stats, guest_by_category):
+    """Event, budget, guest and progress blocks shared by the single and batch endpoints"""
+    budget_stats = {key: value or 0 for key, value in budget_stats.items()}
+    guest_stats = {key: value or 0 for key, value in guest_stats.items()}
     
-    # Event progress
     days_until_event = (event.date - timezone.now().date()).days
-    event_progress = {
-        'days_until_event': days_until_event,
-        'is_past_event': days_until_event < 0,
-        'planning_progress': min(100, max(0, (100 - days_until_event * 2))) if days_until_event > 0 else 100
-    }
     
-    return Response({
+    return {
         'event': {
             'id': event.id,
             'name': event.name,
@@ -133,68 +95,255 @@ def event_analytics(request, event_id):
         'budget': {
             'stats': budget_stats,
             'by_category': list(budget_by_category),
-            'timeline': list(budget_timeline),
             'budget_utilization': (float(budget_stats['total_actual']) / float(event.budget)) * 100 if event.budget > 0 else 0,
             'variance': float(budget_stats['total_actual']) - float(budget_stats['total_estimated'])
         },
         'guests': {
             'stats': guest_stats,
             'by_category': list(guest_by_category),
-            'timeline': list(guest_timeline),
             'rsvp_rate': (guest_stats['confirmed_guests'] / guest_stats['total_guests'] * 100) if guest_stats['total_guests'] > 0 else 0,
             'attendance_rate': (guest_stats['checked_in_guests'] / guest_stats['confirmed_guests'] * 100) if guest_stats['confirmed_guests'] > 0 else 0
         },
-        'vendors': {
-            'stats': vendor_stats,
-            'by_category': list(vendor_by_category)
+        'progress': {
+            'days_until_event': days_until_event,
+            'is_past_event': days_until_event < 0,
+            'planning_progress': min(100, max(0, (100 - days_until_event * 2))) if days_until_event > 0 else 100
         },
-        'progress': event_progress,
-        'generated_at': timezone.now().isoformat()
-    })
+    }
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def overall_analytics(request):
-    """Get overall analytics across all user events"""
-    user_events = Event.objects.filter(user=request.user)
+
+def _event_analytics_queries(event, user, start=None, end=None):
+    """Independent queries behind the event analytics payload, keyed by name"""
+    budget_items = BudgetItem.objects.filter(event=event)
+    guests = Guest.objects.filter(event=event)
+    return {
+        # Budget Analytics
+        'budget_stats': lambda: budget_items.aggregate(**_budget_aggregates()),
+        'budget_by_category': lambda: list(budget_items.values('category').annotate(
+            **_budget_category_aggregates()
+        ).order_by('-estimated')),
+        # Guest Analytics
+        'guest_stats': lambda: guests.aggregate(**_guest_aggregates()),
+        'guest_by_category': lambda: list(guests.values('category').annotate(
+            **_guest_category_aggregates()
+        ).order_by('-count')),
+        # Timeline data (for charts), served from the per-day rollup
+        'daily': lambda: list(daily_rows(
+            EventDailyStats.objects.filter(event=event),
+            ('budget_items', 'budget_amount', 'guests', 'attendees'), start, end
+        )),
+        'vendors': lambda: _vendor_analytics(user),
+    }
+
+
+async def build_event_analytics(event, user, granularity='month', start=None, end=None):
+    """Full analytics payload for one event, running its queries concurrently.
+
+    Raises ``ValueError`` when the requested timeline range is too large.
+    """
+    queries = _event_analytics_queries(event, user, start, end)
+    results = dict(zip(queries, await gather_queries(*queries.values())))
     
-    # Overall stats
-    overall_stats = {
-        'total_events': user_events.count(),
-        'active_events': user_events.filter(status__in=['planning', 'confirmed', 'active']).count(),
-        'completed_events': user_events.filter(status='completed').count(),
-        'total_budget': float(user_events.aggregate(Sum('budget'))['budget__sum'] or 0),
-        'total_expected_guests': user_events.aggregate(Sum('expected_guests'))['expected_guests__sum'] or 0
+    timeline = bucketed(results['daily'], granularity, ('budget_items', 'budget_amount', 'guests', 'attendees'), start, end)
+    
+    summary = _event_summary(
+        event, results['budget_stats'], results['budget_by_category'],
+        results['guest_stats'], results['guest_by_category']
+    )
+    summary['budget']['timeline'] = [
+        {granularity: point[granularity], 'amount': point['budget_amount'], 'count': point['budget_items']}
+        for point in timeline
+    ]
+    summary['guests']['timeline'] = [
+        {granularity: point[granularity], 'count': point['guests'], 'attendees': point['attendees']}
+        for point in timeline
+    ]
+    
+    return {
+        **summary,
+        'vendors': results['vendors'],
+        'granularity': granularity,
+        'generated_at': timezone.now().isoformat()
     }
+
+
+@async_api_view(throttle_scopes=('analytics',))
+async def event_analytics(request, event_id):
+    """Get comprehensive analytics for a specific event"""
+    try:
+        granularity, start, end = timeline_params(request.query_params)
+    except ValueError as e:
+        return api_response({'error': str(e)}, status=400)
     
-    # Events by category
-    events_by_category = user_events.values('category').annotate(
-        count=Count('id'),
-        total_budget=Sum('budget')
-    ).order_by('-count')
+    event = await owned_events(request.user).filter(id=event_id).afirst()
+    if event is None:
+        return api_response({'error': 'Event not found'}, status=404)
     
-    # Events by status
-    events_by_status = user_events.values('status').annotate(
-        count=Count('id')
-    ).order_by('-count')
+    try:
+        return api_response(await build_event_analytics(event, request.user, granularity, start, end))
+    except ValueError as e:
+        return api_response({'error': str(e)}, status=400)
+
+
+def _grouped_by_event(queryset):
+    grouped = {}
+    for row in queryset:
+        grouped.setdefault(row.pop('event_id'), []).append(row)
+    return grouped
+
+
+@async_api_view(throttle_scopes=('analytics',))
+async def events_analytics(request):
+    """Budget and guest analytics for many events at once.
+
+    Select events with ``?ids=1,2,3`` or an event date window ``?start=&end=``.
+    Each metric is one ``GROUP BY event_id`` query and the vendor block is
+    computed once, so the query count doesn't grow with the number of events.
+    """
+    events = owned_events(request.user)
+    
+    ids = request.query_params.get('ids')
+    if ids:
+        try:
+            events = events.filter(id__in=[int(value) for value in ids.split(',') if value])
+        except ValueError:
+            return api_response({'error': 'ids must be a comma separated list of integers'}, status=400)
     
-    # Monthly event creation trend - using TruncMonth for cross-database compatibility
-    monthly_events = user_events.annotate(
-        month=TruncMonth('created_at')
-    ).values('month').annotate(
-        count=Count('id')
-    ).order_by('month')
+    for name, lookup in (('start', 'date__gte'), ('end', 'date__lte')):
+        value = request.query_params.get(name)
+        if value:
+            try:
+                parsed = parse_date(value)
+            except ValueError:
+                parsed = None
+            if parsed is None:
+                return api_response({'error': f'{name} must be a date in YYYY-MM-DD format'}, status=400)
+            events = events.filter(**{lookup: parsed})
     
-    # Recent events
-    recent_events = user_events.order_by('-created_at')[:5].values(
-        'id', 'name', 'date', 'status', 'category', 'budget'
+    if not ids and not request.query_params.get('start') and not request.query_params.get('end'):
+        return api_response({'error': 'Provide ids or a start/end date window'}, status=400)
+    
+    events = [event async for event in events.order_by('date', 'id')[:MAX_BATCH_EVENTS + 1]]
+    if len(events) > MAX_BATCH_EVENTS:
+        return api_response({'error': f'At most {MAX_BATCH_EVENTS} events can be compared at once'}, status=400)
+    event_ids = [event.id for event in events]
+    
+    budget_items = BudgetItem.objects.filter(event_id__in=event_ids)
+    guests = Guest.objects.filter(event_id__in=event_ids)
+    budget_stats, budget_by_category, guest_stats, guest_by_category, vendors = await gather_queries(
+        lambda: {
+            row.pop('event_id'): row
+            for row in budget_items.values('event_id').annotate(**_budget_aggregates()).order_by()
+        },
+        lambda: _grouped_by_event(budget_items.values('event_id', 'category').annotate(
+            **_budget_category_aggregates()
+        ).order_by('event_id', '-estimated')),
+        lambda: {
+            row.pop('event_id'): row
+            for row in guests.values('event_id').annotate(**_guest_aggregates()).order_by()
+        },
+        lambda: _grouped_by_event(guests.values('event_id', 'category').annotate(
+            **_guest_category_aggregates()
+        ).order_by('event_id', '-count')),
+        lambda: _vendor_analytics(request.user),
+    )
+    
+    empty_budget = dict.fromkeys(_budget_aggregates(), 0)
+    empty_guests = dict.fromkeys(_guest_aggregates(), 0)
+    
+    return api_response({
+        'events': [
+            _event_summary(
+                event,
+                budget_stats.get(event.id, empty_budget),
+                budget_by_category.get(event.id, []),
+                guest_stats.get(event.id, empty_guests),
+                guest_by_category.get(event.id, []),
+            )
+            for event in events
+        ],
+        'vendors': vendors,
+        'generated_at': timezone.now().isoformat()
+    })
+
+def _add_archived(rows, archived, key, fields):
+    """Add the archived events' ``fields`` to the per-``key`` rows, keeping the ``-count`` order"""
+    merged = {row[key]: dict(row) for row in rows}
+    for row in archived:
+        target = merged.setdefault(row[key], {key: row[key], **dict.fromkeys(fields, 0)})
+        for field in fields:
+            target[field] = (target[field] or 0) + (row[field] or 0)
+    return sorted(merged.values(), key=lambda row: row['count'], reverse=True)
+
+@async_api_view(throttle_scopes=('analytics',))
+async def overall_analytics(request):
+    """Get overall analytics across all user events"""
+    try:
+        granularity, start, end = timeline_params(request.query_params)
+    except ValueError as e:
+        return api_response({'error': str(e)}, status=400)
+    
+    user_events = owned_events(request.user)
+    
+    totals, events_by_category, events_by_status, daily, recent_events, archived = await gather_queries(
+        # Overall stats
+        lambda: user_events.aggregate(
+            total_events=Count('id'),
+            active_events=Count('id', filter=Q(status__in=['planning', 'confirmed', 'active'])),
+            completed_events=Count('id', filter=Q(status='completed')),
+            total_budget=Sum('budget'),
+            total_expected_guests=Sum('expected_guests'),
+        ),
+        # Events by category
+        lambda: list(user_events.values('category').annotate(
+            count=Count('id'),
+            total_budget=Sum('budget')
+        ).order_by('-count')),
+        # Events by status
+        lambda: list(user_events.values('status').annotate(
+            count=Count('id')
+        ).order_by('-count')),
+        # Event creation trend, served from the per-day rollup
+        lambda: list(daily_rows(UserDailyStats.objects.filter(user=request.user), ('events_created',), start, end)),
+        # Recent events
+        lambda: list(user_events.order_by('-created_at')[:5].values(
+            'id', 'name', 'date', 'status', 'category', 'budget'
+        )),
+        # Archived events count towards the totals, from their stored rows
+        lambda: list(ArchivedEvent.objects.filter(user=request.user).values('category', 'status').annotate(
+            count=Count('id'),
+            total_budget=Sum('budget'),
+            total_expected_guests=Sum('expected_guests')
+        ).order_by()),
     )
     
-    return Response({
+    archived_events = sum(row['count'] for row in archived)
+    overall_stats = {
+        'total_events': totals['total_events'] + archived_events,
+        'active_events': totals['active_events'],
+        'completed_events': totals['completed_events'] + sum(row['count'] for row in archived if row['status'] == 'completed'),
+        'archived_events': archived_events,
+        'total_budget': float((totals['total_budget'] or 0) + sum(row['total_budget'] for row in archived)),
+        'total_expected_guests': (totals['total_expected_guests'] or 0) + sum(row['total_expected_guests'] for row in archived)
+    }
+    events_by_category = _add_archived(events_by_category, archived, 'category', ('count', 'total_budget'))
+    events_by_status = _add_archived(events_by_status, archived, 'status', ('count',))
+    
+    try:
+        creation_trend = bucketed(daily, granularity, ('events_created',), start, end)
+    except ValueError as e:
+        return api_response({'error': str(e)}, status=400)
+    monthly_events = [
+        {granularity: point[granularity], 'count': point['events_created']}
+        for point in creation_trend
+    ]
+    
+    return api_response({
         'overall_stats': overall_stats,
-        'events_by_category': list(events_by_category),
-        'events_by_status': list(events_by_status),
-        'monthly_trend': list(monthly_events),
-        'recent_events': list(recent_events),
+        'events_by_category': events_by_category,
+        'events_by_status': events_by_status,
+        'monthly_trend': monthly_events,
+        'granularity': granularity,
+        'recent_events': recent_events,
         'generated_at': timezone.now().isoformat()
     })
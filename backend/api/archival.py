@@ -0,0 +1,139 @@
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+from rest_framework import generics, permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from .cloning import insert_select
+from .deletion import fast_delete
+from .models import Event, BudgetItem, Guest, ArchivedEvent, ArchivedBudgetItem, ArchivedGuest
+from .serializers import ArchivedEventSerializer
+from .timeseries import rebuild_event_stats
+
+ARCHIVABLE_STATUSES = ('completed',)
+
+
+def _moved_fields(source, target):
+    """``target`` field name -> ``F()`` of the same column on ``source``, for every concrete field they share"""
+    names = {field.name for field in source._meta.concrete_fields}
+    return {field.name: F(field.attname) for field in target._meta.concrete_fields if field.name in names}
+
+
+def archivable_events(older_than_days, statuses=ARCHIVABLE_STATUSES):
+    """Events in ``statuses`` whose date is more than ``older_than_days`` ago"""
+    cutoff = timezone.localdate() - timedelta(days=older_than_days)
+    return Event.objects.filter(status__in=statuses, date__lt=cutoff)
+
+
+def _event_summaries(event_ids):
+    summaries = {event_id: {} for event_id in event_ids}
+    budget_items = BudgetItem.objects.filter(event_id__in=event_ids).values('event_id').annotate(
+        budget_item_count=Count('id'),
+        estimated_total=Sum('estimated_cost'),
+        actual_total=Sum('actual_cost'),
+    ).order_by()
+    guests = Guest.objects.filter(event_id__in=event_ids).values('event_id').annotate(
+        guest_count=Count('id'),
+        attendee_count=Sum(F('plus_ones') + 1),
+        confirmed_count=Count('id', filter=Q(rsvp_status='confirmed')),
+        checked_in_count=Count('id', filter=Q(checked_in=True)),
+    ).order_by()
+    for row in [*budget_items, *guests]:
+        summaries[row.pop('event_id')].update(row)
+    return summaries
+
+
+def archive_events(event_ids):
+    """Move events, with their guests and budget items, into the archive tables.
+
+    Guests and budget items are copied with one ``INSERT ... SELECT`` each
+    and the events are stored with precomputed totals, so analytics never
+    need the archived rows. Seating plans and daily rollups are not kept.
+    Everything happens in one transaction. Returns the rows moved per kind.
+    """
+    event_ids = list(event_ids)
+    counts = {'events': 0, 'budget_items': 0, 'guests': 0}
+    if not event_ids:
+        return counts
+
+    event_fields = _moved_fields(Event, ArchivedEvent)
+    with transaction.atomic():
+        events = list(Event.objects.filter(id__in=event_ids).select_for_update().values(
+            *(expression.name for expression in event_fields.values())
+        ))
+        summaries = _event_summaries([event['id'] for event in events])
+        ArchivedEvent.objects.bulk_create([
+            ArchivedEvent(**event, **summaries[event['id']]) for event in events
+        ])
+        counts['events'] = len(events)
+        counts['budget_items'] = insert_select(
+            ArchivedBudgetItem, BudgetItem.objects.filter(event_id__in=event_ids), _moved_fields(BudgetItem, ArchivedBudgetItem),
+        )
+        counts['guests'] = insert_select(
+            ArchivedGuest, Guest.objects.filter(event_id__in=event_ids), _moved_fields(Guest, ArchivedGuest),
+        )
+        fast_delete(Event.objects.filter(id__in=event_ids))
+    return counts
+
+
+def restore_events(event_ids):
+    """Move archived events and their guests and budget items back, under their original ids"""
+    event_ids = list(event_ids)
+    with transaction.atomic():
+        counts = {
+            'events': insert_select(Event, ArchivedEvent.objects.filter(id__in=event_ids), _moved_fields(ArchivedEvent, Event)),
+            'budget_items': insert_select(
+                BudgetItem, ArchivedBudgetItem.objects.filter(event_id__in=event_ids), _moved_fields(ArchivedBudgetItem, BudgetItem),
+            ),
+            'guests': insert_select(
+                Guest, ArchivedGuest.objects.filter(event_id__in=event_ids), _moved_fields(ArchivedGuest, Guest),
+            ),
+        }
+        ArchivedEvent.objects.filter(id__in=event_ids).delete()
+        rebuild_event_stats(event_ids)
+    return counts
+
+
+class ArchivedEventListView(generics.ListAPIView):
+    """The user's archived events with their totals"""
+    serializer_class = ArchivedEventSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filterset_fields = ['category', 'status']
+    search_fields = ['name']
+
+    def get_queryset(self):
+        return ArchivedEvent.objects.filter(user=self.request.user)
+
+class ArchivedEventDetailView(generics.RetrieveAPIView):
+    serializer_class = ArchivedEventSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return ArchivedEvent.objects.filter(user=self.request.user)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def restore_archived_event(request, pk):
+    """Bring an archived event back into the event list with its guests and budget items"""
+    if not ArchivedEvent.objects.filter(id=pk, user=request.user).exists():
+        return Response({
+            'message': 'Archived event not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        counts = restore_events([pk])
+    except IntegrityError:
+        return Response({
+            'message': 'The event cannot be restored: its series already has an event on that date'
+        }, status=status.HTTP_409_CONFLICT)
+
+    return Response({
+        'message': 'Event restored',
+        'event_id': pk,
+        'budget_items': counts['budget_items'],
+        'guests': counts['guests']
+    })
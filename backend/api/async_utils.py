@@ -0,0 +1,78 @@
+import asyncio
+import contextvars
+import functools
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import JsonResponse
+from rest_framework.exceptions import Throttled
+from rest_framework.request import Request
+from rest_framework.utils.encoders import JSONEncoder
+
+from .authentication import aauthenticate
+from .throttling import DEFAULT_SCOPE, athrottle_wait
+
+
+def api_response(data, status=200):
+    """JSON response encoded the way DRF's ``Response`` would encode ``data``."""
+    return JsonResponse(data, status=status, encoder=JSONEncoder, safe=False)
+
+
+def async_api_view(methods=('GET',), allow_query_token=False, throttle_scopes=()):
+    """Decorator for async views that replaces DRF's ``@api_view``.
+
+    DRF views are synchronous, so async views authenticate with the same
+    JWT scheme here and receive a DRF ``Request`` (``query_params``,
+    ``user``) without going through ``APIView``. Only authenticated users
+    are let through, matching the default permission classes, and they are
+    throttled like DRF views: the default scope plus ``throttle_scopes``.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return api_response({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+            user = await aauthenticate(request, allow_query_token=allow_query_token)
+            if user is None:
+                return api_response({'detail': 'Authentication credentials were not provided.'}, status=401)
+            wait = await athrottle_wait(user, (DEFAULT_SCOPE, *throttle_scopes))
+            if wait is not None:
+                response = api_response({'detail': str(Throttled(wait).detail)}, status=429)
+                response['Retry-After'] = str(math.ceil(wait))
+                return response
+            drf_request = Request(request)
+            drf_request.user = user
+            return await view(drf_request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Long-lived, so each thread's connection is reused from one call to the next
+# (within CONN_MAX_AGE) and no more than this many are open for these queries.
+_query_executor = ThreadPoolExecutor(max_workers=settings.ASYNC_QUERY_WORKERS, thread_name_prefix='async-queries')
+
+
+def _on_worker_thread(func):
+    def run():
+        # Drops connections past CONN_MAX_AGE or left broken, as a request would
+        close_old_connections()
+        try:
+            return func()
+        finally:
+            close_old_connections()
+    context = contextvars.copy_context()
+    return asyncio.get_running_loop().run_in_executor(_query_executor, context.run, run)
+
+
+async def gather_queries(*calls):
+    """Run independent blocking ORM callables concurrently.
+
+    Calls run on a shared pool of worker threads, each with its own
+    database connection, instead of queueing behind one another on the
+    single thread the async ORM uses. So they run outside any transaction
+    of the caller and don't see its uncommitted writes. Calls must fully
+    evaluate their querysets.
+    """
+    return await asyncio.gather(*(_on_worker_thread(call) for call in calls))
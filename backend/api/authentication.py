@@ -0,0 +1,31 @@
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework.exceptions import AuthenticationFailed
+
+
+def authenticate(request, allow_query_token=False):
+    """Authenticate a plain Django request with the API's JWT scheme.
+
+    For views that don't go through DRF (async and streaming views). With
+    ``allow_query_token`` an access token may be passed as ``?token=``, for
+    clients like ``EventSource`` that can't set headers. Returns the user,
+    or ``None`` when the credentials are missing or invalid.
+    """
+    authenticator = JWTAuthentication()
+    try:
+        raw_token = None
+        header = authenticator.get_header(request)
+        if header is not None:
+            raw_token = authenticator.get_raw_token(header)
+        if raw_token is None and allow_query_token:
+            raw_token = request.GET.get('token')
+        if not raw_token:
+            return None
+        user = authenticator.get_user(authenticator.get_validated_token(raw_token))
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+    return user if user.is_active else None
+
+
+aauthenticate = sync_to_async(authenticate)
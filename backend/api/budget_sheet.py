@@ -0,0 +1,174 @@
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import permissions, serializers, status
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.response import Response
+
+from .deletion import fast_delete, owned_events
+from .models import Event, BudgetItem, Vendor
+from .serializers import BudgetItemListSerializer
+from .throttling import BulkRateThrottle, PlanRateThrottle
+from .timeseries import rebuild_event_stats
+
+MAX_SHEET_ROWS = 2000
+SHEET_FIELDS = ('category', 'item_name', 'estimated_cost', 'actual_cost', 'vendor', 'status', 'due_date', 'notes')
+
+
+class BudgetSheetRowSerializer(serializers.ModelSerializer):
+    """One sheet row; validation runs no queries, vendors are checked for the whole sheet at once"""
+    id = serializers.IntegerField(required=False)
+    updated_at = serializers.DateTimeField(required=False)
+    vendor = serializers.IntegerField(source='vendor_id', allow_null=True, required=False)
+
+    class Meta:
+        model = BudgetItem
+        fields = ('id', 'updated_at', *SHEET_FIELDS)
+
+
+class BudgetSheetDeleteSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    updated_at = serializers.DateTimeField()
+
+
+def _rendered(queryset):
+    return BudgetItemListSerializer.render(BudgetItemListSerializer.prepare(queryset))
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+@throttle_classes([PlanRateThrottle, BulkRateThrottle])
+def bulk_save_budget(request, event_id):
+    """Save a whole or partial budget sheet in one transaction.
+
+    Body: ``{"items": [...], "delete": [{"id", "updated_at"}, ...], "replace": false, "as_of": null}``.
+    Items without ``id`` are created; items with one must carry the
+    ``updated_at`` they were loaded with and only their changed fields are
+    written. With ``replace`` the sheet is complete and rows missing from it
+    are deleted, unless they changed after ``as_of``. Any row edited by
+    someone else meanwhile fails the whole save with 409 and its current
+    state. The query count doesn't depend on the number of rows.
+    """
+    try:
+        event = owned_events(request.user).get(id=event_id)
+    except Event.DoesNotExist:
+        return Response({
+            'message': 'Event not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    items = request.data.get('items', [])
+    deletions = request.data.get('delete', [])
+    if not isinstance(items, list) or not isinstance(deletions, list):
+        return Response({
+            'message': 'items and delete must be lists'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        # bool('false') is True; take the same spellings a BooleanField does
+        replace = serializers.BooleanField().to_internal_value(request.data.get('replace', False))
+    except serializers.ValidationError:
+        return Response({
+            'message': 'replace must be a boolean'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if len(items) + len(deletions) > MAX_SHEET_ROWS:
+        return Response({
+            'message': f'At most {MAX_SHEET_ROWS} rows can be saved at once'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    new_rows = [(index, row) for index, row in enumerate(items) if not (isinstance(row, dict) and row.get('id') is not None)]
+    changed_rows = [(index, row) for index, row in enumerate(items) if isinstance(row, dict) and row.get('id') is not None]
+    errors = {}
+    validated = {}
+    for rows, partial in ((new_rows, False), (changed_rows, True)):
+        for index, row in rows:
+            serializer = BudgetSheetRowSerializer(data=row, partial=partial)
+            if serializer.is_valid():
+                validated[index] = serializer.validated_data
+            else:
+                errors[index] = serializer.errors
+    for index, _ in changed_rows:
+        if index in validated and 'updated_at' not in validated[index]:
+            errors[index] = {'updated_at': ['Required when updating a row.']}
+    delete_serializer = BudgetSheetDeleteSerializer(data=deletions, many=True)
+    if not delete_serializer.is_valid():
+        errors['delete'] = delete_serializer.errors
+    as_of = serializers.DateTimeField(allow_null=True).run_validation(request.data.get('as_of')) if request.data.get('as_of') else None
+    if errors:
+        return Response({
+            'message': 'Invalid budget rows',
+            'errors': errors
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    updates = {validated[index]['id']: validated[index] for index, _ in changed_rows}
+    expected = {**{row['id']: row['updated_at'] for row in delete_serializer.validated_data},
+                **{item_id: row['updated_at'] for item_id, row in updates.items()}}
+    if len(updates) + len(delete_serializer.validated_data) != len(expected):
+        return Response({
+            'message': 'Each row can appear only once'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    vendor_ids = {row['vendor_id'] for row in validated.values() if row.get('vendor_id') is not None}
+    if vendor_ids:
+        unknown_vendors = vendor_ids - set(Vendor.objects.filter(user=request.user, id__in=vendor_ids).values_list('id', flat=True))
+        if unknown_vendors:
+            return Response({
+                'message': f'Unknown vendors: {", ".join(map(str, sorted(unknown_vendors)))}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+    with transaction.atomic():
+        current = {item.id: item for item in BudgetItem.objects.select_for_update().filter(event=event)}
+        unknown = sorted(set(expected) - set(current))
+        if unknown:
+            return Response({
+                'message': f'Budget items not found in this event: {", ".join(map(str, unknown))}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # Nothing is written until every row has passed these checks
+        deleted_ids = set(expected) - set(updates)
+        if replace:
+            deleted_ids |= set(current) - set(expected)
+        conflicts = [
+            item_id for item_id, item in current.items()
+            if (item_id in expected and item.updated_at != expected[item_id])
+            or (item_id not in expected and item_id in deleted_ids and as_of is not None and item.updated_at > as_of)
+        ]
+        if conflicts:
+            return Response({
+                'message': 'Some rows were changed by someone else; reload them and try again',
+                'conflicts': _rendered(BudgetItem.objects.filter(id__in=conflicts))
+            }, status=status.HTTP_409_CONFLICT)
+
+        now = timezone.now()
+        changed_items, changed_fields = [], set()
+        for item_id, row in updates.items():
+            item = current[item_id]
+            changed = False
+            for name, value in row.items():
+                if name in ('id', 'updated_at'):
+                    continue
+                if getattr(item, name) != value:
+                    setattr(item, name, value)
+                    changed_fields.add(name)
+                    changed = True
+            if changed:
+                item.updated_at = now
+                changed_items.append(item)
+        # One UPDATE over every column any row changed; the others keep the
+        # values just read under the row lock
+        if changed_items:
+            BudgetItem.objects.bulk_update(changed_items, [*sorted(changed_fields), 'updated_at'])
+
+        created = BudgetItem.objects.bulk_create([
+            BudgetItem(event=event, **validated[index]) for index, _ in new_rows
+        ])
+        if deleted_ids:
+            fast_delete(BudgetItem.objects.filter(id__in=deleted_ids))
+        rebuild_event_stats([event.id])
+
+    updated_ids = sorted(item.id for item in changed_items)
+    return Response({
+        'message': f'Budget saved: {len(created)} added, {len(updated_ids)} updated, {len(deleted_ids)} deleted',
+        'created': [item.id for item in created],
+        'updated': updated_ids,
+        'deleted': sorted(deleted_ids),
+        'unchanged': len(updates) - len(updated_ids),
+        'items': _rendered(BudgetItem.objects.filter(event=event))
+    })
@@ -0,0 +1,237 @@
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import F, Value
+from django.utils import timezone
+from rest_framework import generics, permissions, status
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.response import Response
+
+from .deletion import owned_events
+from .models import Event, BudgetItem, Guest, EventTemplate
+from .serializers import EventSerializer, EventTemplateSerializer
+from .throttling import BulkRateThrottle, PlanRateThrottle
+from .timeseries import rebuild_event_stats
+
+TEMPLATE_BUDGET_BATCH_SIZE = 500
+
+# Copied event fields; status starts over and the owner is whoever clones
+EVENT_COPY_FIELDS = (
+    'name', 'category', 'description', 'date', 'time', 'venue', 'address', 'budget',
+    'expected_guests', 'special_requirements', 'contact_person', 'contact_phone', 'contact_email',
+)
+BUDGET_RESET = {'actual_cost': Decimal('0'), 'status': 'pending'}
+GUEST_RESET = {
+    'rsvp_status': 'pending',
+    'invitation_sent': False,
+    'invitation_sent_date': None,
+    'checked_in': False,
+    'check_in_time': None,
+    'sync_seq': 0,
+}
+
+
+def _is_auto_timestamp(field):
+    return getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+
+
+def insert_select(model, queryset, values):
+    """Insert one ``model`` row per row of ``queryset`` in a single ``INSERT ... SELECT``.
+
+    ``values`` maps ``model`` field names to expressions over ``queryset``
+    (``F()`` references) or constants. Other fields get their default, or
+    now for ``auto_now``/``auto_now_add``; the primary key is left to the
+    database unless ``values`` sets it. No model signals are sent. Returns
+    the number of rows inserted.
+    """
+    now = timezone.now()
+    columns = {}
+    for field in model._meta.concrete_fields:
+        if field.primary_key and field.name not in values:
+            continue
+        if field.name in values:
+            value = values[field.name]
+        elif _is_auto_timestamp(field):
+            value = now
+        else:
+            value = field.get_default()
+        if not hasattr(value, 'resolve_expression'):
+            value = Value(value, output_field=field)
+        columns[field.column] = value
+
+    aliases = {f'insert_{index}': expression for index, expression in enumerate(columns.values())}
+    select_sql, params = (
+        queryset.order_by('pk').annotate(**aliases).values_list(*aliases).query.sql_with_params()
+    )
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) {}'.format(
+        quote(model._meta.db_table), ', '.join(quote(column) for column in columns), select_sql,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def copy_rows(queryset, overrides):
+    """Copy the rows of ``queryset`` in one statement, with ``overrides`` as constant field values for the copies"""
+    values = {
+        field.name: F(field.attname)
+        for field in queryset.model._meta.concrete_fields
+        if not field.primary_key and not _is_auto_timestamp(field)
+    }
+    values.update(overrides)
+    return insert_select(queryset.model, queryset, values)
+
+
+def clone_event(event, changes=None, include_budget=True, reset_budget=True, include_guests=False):
+    """Copy ``event`` with its budget items and, optionally, its guests.
+
+    ``changes`` overrides copied event fields (new name, date, ...). Budget
+    items keep their estimates; with ``reset_budget`` actual costs and
+    payment status start over. Copied guests are un-invited, un-RSVP'd and
+    not checked in. Returns ``(new_event, counts)``.
+    """
+    fields = {field: getattr(event, field) for field in EVENT_COPY_FIELDS}
+    fields.update(changes or {})
+    counts = {'budget_items': 0, 'guests': 0}
+    with transaction.atomic():
+        clone = Event.objects.create(user=event.user, status='planning', **fields)
+        if include_budget:
+            counts['budget_items'] = copy_rows(
+                BudgetItem.objects.filter(event=event),
+                {'event': clone.id, **(BUDGET_RESET if reset_budget else {})},
+            )
+        if include_guests:
+            counts['guests'] = copy_rows(Guest.objects.filter(event=event), {'event': clone.id, **GUEST_RESET})
+        if counts['budget_items'] or counts['guests']:
+            rebuild_event_stats([clone.id])
+    return clone, counts
+
+
+def event_from_template(template, fields):
+    """Create an event from ``template`` and its budget lines; ``fields`` fills in or overrides the defaults"""
+    defaults = {
+        field: getattr(template, field)
+        for field in ('name', 'category', 'description', 'venue', 'address', 'budget', 'expected_guests', 'special_requirements')
+    }
+    with transaction.atomic():
+        event = Event.objects.create(user=template.user, status='planning', **{**defaults, **fields})
+        items = BudgetItem.objects.bulk_create(
+            [
+                BudgetItem(
+                    event=event,
+                    category=item['category'],
+                    item_name=item['item_name'],
+                    estimated_cost=Decimal(item['estimated_cost']),
+                    notes=item.get('notes', ''),
+                )
+                for item in template.budget_items
+            ],
+            batch_size=TEMPLATE_BUDGET_BATCH_SIZE,
+        )
+        if items:
+            rebuild_event_stats([event.id])
+    return event, len(items)
+
+
+def _flag(data, name, default):
+    value = data.get(name, default)
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+
+def _event_changes(data):
+    """Validate the event fields a clone or template instantiation may set; raises ``ValueError``
+
+    Fields go through ``EventSerializer``, so they follow the same rules as
+    an event edit. Blank ones are left out.
+    """
+    given = {name: data[name] for name in ('name', 'venue', 'address', 'description', 'date', 'time') if data.get(name)}
+    serializer = EventSerializer(data=given, partial=True)
+    if not serializer.is_valid():
+        name, errors = next(iter(serializer.errors.items()))
+        raise ValueError(f'{name}: {errors[0]}')
+    return dict(serializer.validated_data)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+@throttle_classes([PlanRateThrottle, BulkRateThrottle])
+def clone_event_view(request, event_id):
+    """Copy an event with its budget and, with ``include_guests``, its guest list"""
+    try:
+        event = owned_events(request.user).get(id=event_id)
+    except Event.DoesNotExist:
+        return Response({
+            'message': 'Event not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        changes = _event_changes(request.data)
+    except ValueError as e:
+        return Response({
+            'message': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    changes.setdefault('name', f'Copy of {event.name}'[:200])
+
+    clone, counts = clone_event(
+        event,
+        changes,
+        include_budget=_flag(request.data, 'include_budget', True),
+        reset_budget=_flag(request.data, 'reset_budget', True),
+        include_guests=_flag(request.data, 'include_guests', False),
+    )
+
+    return Response({
+        'message': 'Event cloned successfully',
+        'event': EventSerializer(clone, context={'request': request}).data,
+        'copied': counts
+    }, status=status.HTTP_201_CREATED)
+
+
+class EventTemplateListCreateView(generics.ListCreateAPIView):
+    serializer_class = EventTemplateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return EventTemplate.objects.filter(user=self.request.user)
+
+class EventTemplateDetailView(generics.RetrieveUpdateDestroyAPIView):
+    serializer_class = EventTemplateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return EventTemplate.objects.filter(user=self.request.user)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+@throttle_classes([PlanRateThrottle, BulkRateThrottle])
+def create_event_from_template(request, template_id):
+    """Create an event from a template; ``date`` and ``time`` are required"""
+    try:
+        template = EventTemplate.objects.get(id=template_id, user=request.user)
+    except EventTemplate.DoesNotExist:
+        return Response({
+            'message': 'Template not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        fields = _event_changes(request.data)
+    except ValueError as e:
+        return Response({
+            'message': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if 'date' not in fields or 'time' not in fields:
+        return Response({
+            'message': 'date and time are required'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    event, budget_items = event_from_template(template, fields)
+
+    return Response({
+        'message': 'Event created from template',
+        'event': EventSerializer(event, context={'request': request}).data,
+        'copied': {'budget_items': budget_items}
+    }, status=status.HTTP_201_CREATED)
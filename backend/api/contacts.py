@@ -0,0 +1,124 @@
+from django.db import transaction
+from django.db.models import F, Prefetch
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import generics, permissions, status
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.response import Response
+
+from .cloning import insert_select
+from .live import resync_guest_counters
+from .deletion import owned_events
+from .models import Event, Guest, Contact, ContactGroup, next_guest_sync_seq
+from .normalize import normalize_phone, normalize_email
+from .serializers import ContactSerializer, ContactGroupSerializer
+from .throttling import BulkRateThrottle, PlanRateThrottle
+from .timeseries import rebuild_event_stats
+
+CATEGORY_VALUES = {value for value, _ in Guest.CATEGORY_CHOICES}
+
+
+def add_contacts_to_event(contacts, event, category=None):
+    """Add ``contacts`` to ``event`` as linked guests in one ``INSERT ... SELECT``.
+
+    Contacts already on the event are skipped. Guests take their name,
+    email, phone and dietary notes from the contact, and ``category`` or
+    the contact's own. Returns the number of guests added.
+    """
+    already_invited = Guest.objects.filter(event=event, contact__isnull=False).values('contact_id')
+    with transaction.atomic():
+        added = insert_select(
+            Guest,
+            contacts.exclude(id__in=already_invited),
+            {
+                'event': event.id,
+                'contact': F('id'),
+                'name': F('name'),
+                'email': F('email'),
+                'phone': F('phone'),
+                'category': category or F('category'),
+                'dietary_restrictions': F('dietary_restrictions'),
+                'sync_seq': next_guest_sync_seq(event.id),
+            },
+        )
+        if added:
+            rebuild_event_stats([event.id])
+            resync_guest_counters(event.id)
+    return added
+
+
+class ContactListCreateView(generics.ListCreateAPIView):
+    """The user's contact book; ``?phone=`` and ``?email=`` match on the normalized value"""
+    serializer_class = ContactSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['category', 'groups']
+
+    def get_queryset(self):
+        queryset = Contact.objects.filter(user=self.request.user)
+        phone = self.request.query_params.get('phone')
+        if phone:
+            queryset = queryset.filter(normalized_phone=normalize_phone(phone))
+        email = self.request.query_params.get('email')
+        if email:
+            queryset = queryset.filter(normalized_email=normalize_email(email))
+        return queryset
+
+class ContactDetailView(generics.RetrieveUpdateDestroyAPIView):
+    serializer_class = ContactSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return Contact.objects.filter(user=self.request.user)
+
+
+class ContactGroupListCreateView(generics.ListCreateAPIView):
+    serializer_class = ContactGroupSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return ContactGroup.objects.filter(user=self.request.user).prefetch_related(
+            Prefetch('contacts', queryset=Contact.objects.only('id'))
+        )
+
+class ContactGroupDetailView(generics.RetrieveUpdateDestroyAPIView):
+    serializer_class = ContactGroupSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return ContactGroup.objects.filter(user=self.request.user).prefetch_related(
+            Prefetch('contacts', queryset=Contact.objects.only('id'))
+        )
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+@throttle_classes([PlanRateThrottle, BulkRateThrottle])
+def add_group_to_event(request, pk):
+    """Invite every contact of a group to ``event``, optionally under one ``category``"""
+    try:
+        group = ContactGroup.objects.get(id=pk, user=request.user)
+    except ContactGroup.DoesNotExist:
+        return Response({
+            'message': 'Contact group not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        event = owned_events(request.user).get(id=request.data.get('event'))
+    except (Event.DoesNotExist, ValueError, TypeError):
+        return Response({
+            'message': 'Event not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    category = request.data.get('category') or None
+    if category is not None and category not in CATEGORY_VALUES:
+        return Response({
+            'message': f'category must be one of: {", ".join(sorted(CATEGORY_VALUES))}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    added = add_contacts_to_event(Contact.objects.filter(groups=group, user=request.user), event, category)
+
+    return Response({
+        'message': f'Added {added} guests from {group.name}',
+        'added': added,
+        'skipped': group.contacts.count() - added
+    }, status=status.HTTP_201_CREATED)
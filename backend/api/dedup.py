@@ -0,0 +1,304 @@
+import math
+from collections import Counter, defaultdict
+from itertools import combinations
+
+from django.db import transaction
+from rest_framework import permissions, serializers, status
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.response import Response
+
+from .deletion import in_owned_events
+from .models import Guest, SeatAssignment, SeatingConstraint
+from .normalize import normalize_phone, normalize_email, normalize_name
+from .throttling import BulkRateThrottle, PlanRateThrottle
+
+DEFAULT_MIN_SCORE = 0.6
+# Below this, name blocking keys on most trigrams and pairs up nearly everyone
+MIN_SCORE_FLOOR = 0.3
+DEFAULT_CLUSTER_LIMIT = 100
+MAX_CLUSTER_LIMIT = 1000
+# A phone, email or name shared by hundreds of guests is a switchboard or
+# a placeholder, not one person.
+MAX_EXACT_BLOCK = 256
+NGRAM_SIZE = 3
+
+EMAIL_WEIGHT = 0.6
+PHONE_WEIGHT = 0.45
+NAME_WEIGHT = 0.5
+
+RSVP_RANK = {'confirmed': 3, 'maybe': 2, 'pending': 1, 'declined': 0}
+
+
+def name_ngrams(name):
+    padded = f' {name} '
+    return {padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+
+class DuplicateIndex:
+    """Blocking index over guest records for duplicate detection.
+
+    Records land in blocks keyed by normalized phone, lowercased email,
+    token-sorted name and the rarest trigrams of the name. Only records
+    sharing a block are compared, so the number of comparisons grows with
+    the number of likely duplicates rather than with the square of the
+    guest count.
+    """
+
+    def __init__(self, rows):
+        # rows: (id, event_id, name, phone, email)
+        self.records = {}
+        self.exact_blocks = (defaultdict(list), defaultdict(list), defaultdict(list))
+        self.ngram_counts = Counter()
+        phones, emails, names = self.exact_blocks
+        for guest_id, event_id, name, phone, email in rows:
+            name = normalize_name(name)
+            record = {
+                'event_id': event_id,
+                'phone': normalize_phone(phone),
+                'email': normalize_email(email),
+                'ngrams': name_ngrams(name) if name else frozenset(),
+            }
+            self.records[guest_id] = record
+            if record['phone']:
+                phones[record['phone']].append(guest_id)
+            if record['email']:
+                emails[record['email']].append(guest_id)
+            if name:
+                names[' '.join(sorted(name.split()))].append(guest_id)
+                self.ngram_counts.update(record['ngrams'])
+
+    def prefix_blocks(self, threshold):
+        """Records keyed by the rarest trigrams of their names (prefix filtering).
+
+        With each name's trigrams ordered from rarest to most common, two
+        names whose trigram Jaccard similarity is at least ``threshold``
+        share one of their first ``n - ceil(threshold * n) + 1``, ``n``
+        being the number of trigrams. Keying on just those finds every such
+        pair, while common trigrams (think "ohn") key few records.
+        """
+        blocks = defaultdict(list)
+        for guest_id, record in self.records.items():
+            ngrams = sorted(record['ngrams'], key=lambda ngram: (self.ngram_counts[ngram], ngram))
+            # The epsilon keeps float error from shortening the prefix
+            for ngram in ngrams[:len(ngrams) - math.ceil(threshold * len(ngrams) - 1e-9) + 1]:
+                blocks[ngram].append(guest_id)
+        return blocks
+
+    def candidate_pairs(self, min_score=DEFAULT_MIN_SCORE):
+        pairs = set()
+        for blocks in self.exact_blocks:
+            for members in blocks.values():
+                if 1 < len(members) <= MAX_EXACT_BLOCK:
+                    pairs.update(combinations(members, 2))
+        # Pairs matching on neither email nor phone need this name similarity.
+        # A name alone scores at most NAME_WEIGHT, so above that (the default
+        # included) only pairs sharing an email or phone can qualify.
+        threshold = min_score / NAME_WEIGHT
+        if threshold <= 1:
+            for members in self.prefix_blocks(threshold).values():
+                pairs.update(combinations(members, 2))
+        return pairs
+
+    def score(self, first, second):
+        a, b = self.records[first], self.records[second]
+        union = len(a['ngrams'] | b['ngrams'])
+        name_similarity = len(a['ngrams'] & b['ngrams']) / union if union else 0
+        score = NAME_WEIGHT * name_similarity
+        if a['email'] and a['email'] == b['email']:
+            score += EMAIL_WEIGHT
+        if a['phone'] and a['phone'] == b['phone']:
+            score += PHONE_WEIGHT
+        return min(1.0, score)
+
+    def clusters(self, min_score=DEFAULT_MIN_SCORE):
+        """Groups of records linked by pairs scoring at least ``min_score``, each with its scored pairs"""
+        parent = {}
+
+        def find(guest_id):
+            parent.setdefault(guest_id, guest_id)
+            while parent[guest_id] != guest_id:
+                parent[guest_id] = parent[parent[guest_id]]
+                guest_id = parent[guest_id]
+            return guest_id
+
+        pairs = []
+        for first, second in self.candidate_pairs(min_score):
+            score = self.score(first, second)
+            if score >= min_score:
+                pairs.append((first, second, round(score, 3)))
+                parent[find(first)] = find(second)
+
+        grouped = defaultdict(lambda: {'members': set(), 'pairs': []})
+        for first, second, score in pairs:
+            cluster = grouped[find(first)]
+            cluster['members'].update((first, second))
+            cluster['pairs'].append({'guests': sorted((first, second)), 'score': score})
+        clusters = []
+        for cluster in grouped.values():
+            scores = [pair['score'] for pair in cluster['pairs']]
+            clusters.append({
+                'guests': sorted(cluster['members']),
+                'score': round(sum(scores) / len(scores), 3),
+                'same_event': len({self.records[guest_id]['event_id'] for guest_id in cluster['members']}) == 1,
+                'pairs': sorted(cluster['pairs'], key=lambda pair: -pair['score']),
+            })
+        clusters.sort(key=lambda cluster: (-cluster['score'], cluster['guests'][0]))
+        return clusters
+
+
+def _survivor_key(guest):
+    filled = sum(1 for value in (guest.email, guest.phone, guest.dietary_restrictions, guest.notes) if value)
+    return (guest.checked_in, RSVP_RANK.get(guest.rsvp_status, 0), guest.invitation_sent, filled, -guest.id)
+
+
+class MergeGroupSerializer(serializers.Serializer):
+    guests = serializers.ListField(child=serializers.IntegerField())
+    keep = serializers.IntegerField(required=False, allow_null=True)
+
+
+def merge_guests(guests, keep=None):
+    """Fold duplicate guests of one event into a single record and delete the rest.
+
+    The survivor is ``keep`` or the most advanced record (checked in, then
+    RSVP, then invitation, then most complete). Blank contact fields are
+    filled from the duplicates, flags and ``plus_ones`` take the furthest
+    value, and seats and seating constraints move to the survivor. Runs
+    through the ORM so the rollups and live counters follow.
+    """
+    guests = sorted(guests, key=_survivor_key, reverse=True)
+    survivor = next((guest for guest in guests if guest.id == keep), guests[0])
+    duplicates = [guest for guest in guests if guest.id != survivor.id]
+    duplicate_ids = [guest.id for guest in duplicates]
+
+    for guest in duplicates:
+        for field in ('email', 'phone', 'dietary_restrictions', 'notes'):
+            if not getattr(survivor, field) and getattr(guest, field):
+                setattr(survivor, field, getattr(guest, field))
+        if RSVP_RANK.get(guest.rsvp_status, 0) > RSVP_RANK.get(survivor.rsvp_status, 0):
+            survivor.rsvp_status = guest.rsvp_status
+        survivor.plus_ones = max(survivor.plus_ones, guest.plus_ones)
+        if guest.invitation_sent and not survivor.invitation_sent:
+            survivor.invitation_sent, survivor.invitation_sent_date = True, guest.invitation_sent_date
+        if guest.checked_in and not survivor.checked_in:
+            survivor.checked_in, survivor.check_in_time = True, guest.check_in_time
+
+    if not SeatAssignment.objects.filter(guest=survivor).exists():
+        seat = SeatAssignment.objects.filter(guest_id__in=duplicate_ids).order_by('-pinned', 'id').first()
+        if seat is not None:
+            seat.guest = survivor
+            SeatAssignment.objects.filter(guest_id__in=duplicate_ids).exclude(id=seat.id).delete()
+            seat.save(update_fields=['guest'])
+    SeatingConstraint.objects.filter(guest_id__in=duplicate_ids).update(guest=survivor)
+    SeatingConstraint.objects.filter(other_guest_id__in=duplicate_ids).update(other_guest=survivor)
+    SeatingConstraint.objects.filter(guest=survivor, other_guest=survivor).delete()
+
+    # Delete first so a duplicate's counters are gone before the survivor's grow
+    Guest.objects.filter(id__in=duplicate_ids).delete()
+    survivor.save()
+    return survivor, duplicate_ids
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def guest_duplicates(request):
+    """Likely duplicate guests across the user's events, or within ``?event=``.
+
+    Clusters are ordered by score. Only clusters with ``same_event`` can be
+    merged; the others are the same person invited to several events.
+    ``min_score`` runs from 0.3 to 1; a name match alone scores at most 0.5,
+    so name-only duplicates need ``min_score`` at or below that.
+    """
+    guests = in_owned_events(Guest.objects.all(), request.user)
+    try:
+        event_id = request.query_params.get('event')
+        if event_id:
+            guests = guests.filter(event_id=int(event_id))
+        min_score = float(request.query_params.get('min_score', DEFAULT_MIN_SCORE))
+        limit = max(1, min(int(request.query_params.get('limit', DEFAULT_CLUSTER_LIMIT)), MAX_CLUSTER_LIMIT))
+    except ValueError:
+        return Response({
+            'message': 'event and limit must be integers and min_score a number'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if not MIN_SCORE_FLOOR <= min_score <= 1:
+        return Response({
+            'message': f'min_score must be between {MIN_SCORE_FLOOR} and 1'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    index = DuplicateIndex(guests.values_list('id', 'event_id', 'name', 'phone', 'email').iterator(chunk_size=5000))
+    found = index.clusters(min_score)
+    clusters = found[:limit]
+    details = {
+        guest['id']: guest
+        for guest in Guest.objects.filter(id__in={guest_id for cluster in clusters for guest_id in cluster['guests']}).values(
+            'id', 'event_id', 'name', 'phone', 'email', 'category', 'rsvp_status', 'checked_in'
+        )
+    }
+
+    return Response({
+        'scanned_guests': len(index.records),
+        'total_clusters': len(found),
+        'clusters': [{**cluster, 'guests': [details[guest_id] for guest_id in cluster['guests']]} for cluster in clusters]
+    })
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+@throttle_classes([PlanRateThrottle, BulkRateThrottle])
+def merge_duplicate_guests(request):
+    """Merge groups of duplicate guests: ``{"groups": [{"guests": [ids], "keep": id}, ...]}``"""
+    groups = request.data.get('groups')
+    if not isinstance(groups, list) or not groups:
+        return Response({
+            'message': 'groups must be a non-empty list'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = MergeGroupSerializer(data=groups, many=True)
+    if not serializer.is_valid():
+        return Response({
+            'message': 'Invalid groups',
+            'errors': serializer.errors
+        }, status=status.HTTP_400_BAD_REQUEST)
+    requested = []
+    for group in serializer.validated_data:
+        if len(set(group['guests'])) < 2:
+            return Response({
+                'message': 'Each group needs at least two guest ids'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        requested.append((set(group['guests']), group.get('keep')))
+
+    all_ids = set().union(*(ids for ids, _ in requested))
+    if sum(len(ids) for ids, _ in requested) != len(all_ids):
+        return Response({
+            'message': 'A guest can only be in one group'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    with transaction.atomic():
+        guests = {
+            guest.id: guest
+            for guest in in_owned_events(Guest.objects.select_for_update(), request.user).filter(id__in=all_ids)
+        }
+        merged = []
+        for ids, keep in requested:
+            if not ids <= guests.keys():
+                transaction.set_rollback(True)
+                return Response({
+                    'message': f'Guests not found: {sorted(ids - guests.keys())}'
+                }, status=status.HTTP_404_NOT_FOUND)
+            group = [guests[guest_id] for guest_id in ids]
+            if len({guest.event_id for guest in group}) > 1:
+                transaction.set_rollback(True)
+                return Response({
+                    'message': 'Only guests of the same event can be merged'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            if keep is not None and keep not in ids:
+                transaction.set_rollback(True)
+                return Response({
+                    'message': "keep must be one of the group's guests"
+                }, status=status.HTTP_400_BAD_REQUEST)
+            survivor, removed = merge_guests(group, keep)
+            merged.append({'kept': survivor.id, 'removed': sorted(removed)})
+
+    return Response({
+        'message': f'Merged {len(merged)} duplicate groups',
+        'merged': merged
+    })
@@ -0,0 +1,193 @@
+import logging
+import threading
+from collections import Counter
+
+from django.apps import apps
+from django.db import connections, models, transaction
+from django.db.models import F, ProtectedError
+from django.dispatch import Signal
+from django.utils import timezone
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from .models import DeletionJob, Event
+
+logger = logging.getLogger(__name__)
+
+DELETE_BATCH_SIZE = 1000
+ACTIVE_STATUSES = ('pending', 'running')
+
+# Sent after each committed batch with ``pks``, the deleted primary keys of
+# ``sender``. fast_delete sends no pre_delete/post_delete signals, so
+# anything that mirrors rows elsewhere (counters, caches, search indexes)
+# listens here instead.
+bulk_deleted = Signal()
+
+# Sent with ``job`` once a ``DeletionJob`` has deleted its object, by the
+# object's model. A job that fails sends nothing.
+deletion_completed = Signal()
+
+
+def _cascade_relations(model):
+    """Reverse relations a delete of ``model`` has to handle, as Django's collector finds them"""
+    return [
+        field for field in model._meta.get_fields(include_hidden=True)
+        if field.auto_created and not field.concrete and (field.one_to_one or field.one_to_many)
+    ]
+
+
+def _children(relation, pks):
+    return relation.related_model._base_manager.filter(**{f'{relation.field.name}__in': pks})
+
+
+def _pk_batches(queryset, batch_size):
+    """Primary keys of ``queryset`` in batches, re-querying after each so deleted rows drop out"""
+    last = None
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    while True:
+        batch = list((pks if last is None else pks.filter(pk__gt=last))[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last = batch[-1]
+
+
+def cascade_count(queryset):
+    """How many rows deleting ``queryset`` removes, counting every cascade"""
+    total = queryset.count()
+    if not total:
+        return 0
+    for relation in _cascade_relations(queryset.model):
+        if relation.on_delete is models.CASCADE:
+            total += cascade_count(_children(relation, queryset.values('pk')))
+    return total
+
+
+def _delete_rows(model, pks, batch_size, counts, progress):
+    for relation in _cascade_relations(model):
+        on_delete = relation.on_delete
+        if on_delete is models.DO_NOTHING:
+            continue
+        children = _children(relation, pks)
+        if on_delete is models.CASCADE:
+            for batch in _pk_batches(children, batch_size):
+                _delete_rows(relation.related_model, batch, batch_size, counts, progress)
+        elif on_delete is models.SET_NULL:
+            children.update(**{relation.field.name: None})
+        elif on_delete is models.SET_DEFAULT:
+            children.update(**{relation.field.name: relation.field.get_default()})
+        elif children.exists():
+            raise ProtectedError(
+                f'Cannot fast-delete {model._meta.label} rows referenced through {relation.field}', children,
+            )
+
+    queryset = model._base_manager.filter(pk__in=pks)
+    with transaction.atomic(using=queryset.db):
+        deleted = queryset._raw_delete(queryset.db)
+    counts[model._meta.label] += deleted
+    bulk_deleted.send(sender=model, pks=pks)
+    if progress is not None:
+        progress(counts)
+
+
+def fast_delete(queryset, batch_size=DELETE_BATCH_SIZE, progress=None):
+    """Delete ``queryset`` and everything that cascades from it with set-based ``DELETE``s.
+
+    Unlike ``QuerySet.delete()`` no rows are loaded into memory: each
+    relation is walked by primary key, ``batch_size`` rows at a time,
+    children before parents, each batch in its own transaction unless the
+    caller holds one. ``SET_NULL`` and ``SET_DEFAULT`` become one ``UPDATE``,
+    ``PROTECT`` and ``RESTRICT`` raise ``ProtectedError`` if rows exist.
+
+    Model delete signals are not sent; ``bulk_deleted`` is, per batch.
+    Rollups of parents that survive are not adjusted, so callers deleting
+    guests or budget items directly must call ``rebuild_event_stats``.
+    ``progress`` is called with the running per-model counts after every
+    batch. Returns those counts.
+    """
+    counts = Counter()
+    for batch in _pk_batches(queryset, batch_size):
+        _delete_rows(queryset.model, batch, batch_size, counts, progress)
+    return counts
+
+
+def being_deleted(model):
+    """Primary keys of ``model`` rows a deletion job is still working on, as a subquery"""
+    return DeletionJob.objects.filter(model=model._meta.label, status__in=ACTIVE_STATUSES).values('object_id')
+
+
+def owned_events(user):
+    """``user``'s events, without those being deleted: they are gone for the user as soon as the job is queued"""
+    return Event.objects.filter(user=user).exclude(id__in=being_deleted(Event))
+
+
+def in_owned_events(queryset, user):
+    """Rows of ``queryset``, a model with an ``event``, belonging to ``user``'s events and not being deleted with them"""
+    return queryset.filter(event__user=user).exclude(event_id__in=being_deleted(Event))
+
+
+def start_deletion(instance, user):
+    """Queue ``instance`` for deletion by a background thread once the current transaction commits.
+
+    Returns ``(job, created)``. If a job for it is already pending or
+    running that job is returned instead, so repeated requests don't start
+    deletions racing each other. Callers should hold a lock on ``instance``
+    for that check to be safe.
+    """
+    job = DeletionJob.objects.filter(
+        model=instance._meta.label, object_id=instance.pk, status__in=ACTIVE_STATUSES,
+    ).first()
+    if job is not None:
+        return job, False
+    job = DeletionJob.objects.create(
+        user=user, model=instance._meta.label, object_id=instance.pk, object_repr=str(instance)[:200],
+    )
+    transaction.on_commit(lambda: threading.Thread(
+        target=run_deletion_job, args=(job.id,), name=f'deletion-job-{job.id}', daemon=True,
+    ).start())
+    return job, True
+
+
+def run_deletion_job(job_id, progress=None):
+    """Run a ``DeletionJob``, recording progress on it; also resumes jobs interrupted by a restart"""
+    jobs = DeletionJob.objects.filter(id=job_id)
+    try:
+        job = jobs.get()
+        queryset = apps.get_model(job.model)._base_manager.filter(pk=job.object_id)
+        total_rows = cascade_count(queryset)
+        jobs.update(status='running', started_at=timezone.now(), total_rows=job.deleted_rows + total_rows)
+
+        def record(counts):
+            deleted = job.deleted_rows + sum(counts.values())
+            jobs.update(deleted_rows=deleted)
+            if progress is not None:
+                progress(deleted, job.deleted_rows + total_rows)
+
+        fast_delete(queryset, progress=record)
+        # cascade_count counts rows reachable by two paths twice
+        jobs.update(status='completed', finished_at=timezone.now(), total_rows=F('deleted_rows'))
+    except Exception as exc:
+        logger.exception('Deletion job %s failed', job_id)
+        jobs.update(status='failed', error=str(exc), finished_at=timezone.now())
+    else:
+        deletion_completed.send(sender=queryset.model, job=job)
+    finally:
+        if threading.current_thread() is not threading.main_thread():
+            connections.close_all()
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def deletion_job_detail(request, pk):
+    """Progress of a background deletion started by the user"""
+    try:
+        job = DeletionJob.objects.get(id=pk, user=request.user)
+    except DeletionJob.DoesNotExist:
+        return Response({
+            'message': 'Deletion job not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    # Not at the top: the serializers scope their querysets with owned_events
+    from .serializers import DeletionJobSerializer
+    return Response(DeletionJobSerializer(job).data)
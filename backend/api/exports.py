@@ -0,0 +1,76 @@
+import csv
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils.text import slugify
+
+from .async_utils import async_api_view, api_response
+from .deletion import owned_events
+from .models import Event, BudgetItem, Guest
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_COLUMNS = {
+    'guests': (Guest, (
+        # ``id`` comes first, it is the keyset for chunked reads
+        'id', 'name', 'email', 'phone', 'category', 'rsvp_status', 'plus_ones',
+        'dietary_restrictions', 'checked_in', 'check_in_time', 'notes', 'created_at',
+    )),
+    'budget': (BudgetItem, (
+        'id', 'item_name', 'category', 'estimated_cost', 'actual_cost',
+        'vendor__name', 'status', 'due_date', 'notes', 'created_at',
+    )),
+}
+
+
+class Echo:
+    """File-like object whose ``write`` hands the formatted row back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def _sync_rows(queryset, columns):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in queryset.values_list(*columns).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield writer.writerow(row)
+
+
+async def _rows(queryset, columns):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    last_id = 0
+    while True:
+        # Keyset pages keep each query short instead of holding one cursor open
+        # for as long as the client takes to download the file.
+        chunk = [row async for row in queryset.filter(id__gt=last_id).values_list(*columns)[:EXPORT_CHUNK_SIZE]]
+        for row in chunk:
+            yield writer.writerow(row)
+        if len(chunk) < EXPORT_CHUNK_SIZE:
+            return
+        last_id = chunk[-1][0]
+
+
+@async_api_view(throttle_scopes=('exports',))
+async def export_event_data(request, event_id, kind):
+    """Stream an event's guests or budget items as CSV.
+
+    Rows are fetched in chunks and written as they arrive, so large events
+    neither hold a worker for the whole export under ASGI nor build the
+    file in memory.
+    """
+    if kind not in EXPORT_COLUMNS:
+        return api_response({'error': f"Unknown export, choose one of: {', '.join(EXPORT_COLUMNS)}"}, status=404)
+
+    event = await owned_events(request.user).filter(id=event_id).afirst()
+    if event is None:
+        return api_response({'error': 'Event not found'}, status=404)
+
+    model, columns = EXPORT_COLUMNS[kind]
+    queryset = model.objects.filter(event=event).order_by('id')
+    # WSGI servers can only drain a synchronous iterator
+    rows = _rows if isinstance(request._request, ASGIRequest) else _sync_rows
+    response = StreamingHttpResponse(rows(queryset, columns), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{slugify(event.name) or event.id}-{kind}.csv"'
+    return response
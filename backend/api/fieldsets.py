@@ -0,0 +1,81 @@
+def requested_fields(serializer_class, query_params):
+    """Resolve ``?fields=`` / ``?exclude=`` into the set of serializer fields to keep.
+
+    ``fields`` accepts field names and presets declared on the serializer's
+    ``Meta.field_presets`` (e.g. ``?fields=compact`` or ``?fields=compact,notes``).
+    Returns ``None`` when the client didn't ask for a sparse fieldset.
+    """
+    fields_param = query_params.get('fields')
+    exclude_param = query_params.get('exclude')
+    if not fields_param and not exclude_param:
+        return None
+
+    meta = serializer_class.Meta
+    presets = getattr(meta, 'field_presets', {})
+    available = set(serializer_class().fields)
+
+    if fields_param:
+        selected = set()
+        for name in fields_param.split(','):
+            name = name.strip()
+            selected.update(presets.get(name, (name,)))
+    else:
+        selected = set(available)
+
+    if exclude_param:
+        selected -= {name.strip() for name in exclude_param.split(',')}
+
+    selected.add('id')
+    return selected & available
+
+
+def prune_columns(queryset, serializer_class, fields):
+    """Restrict ``queryset`` to the columns needed to render ``fields``.
+
+    Serializer fields that are computed from other columns declare them in
+    ``Meta.field_dependencies`` so they are loaded too.
+    """
+    dependencies = getattr(serializer_class.Meta, 'field_dependencies', {})
+    model_fields = {f.name: f for f in queryset.model._meta.concrete_fields}
+
+    columns = {'id'}
+    for name in fields:
+        if name in model_fields:
+            columns.add(name)
+        columns.update(dependencies.get(name, ()))
+
+    return queryset.only(*sorted(columns))
+
+
+class SparseFieldsetMixin:
+    """Serializer mixin dropping fields the client didn't ask for on reads."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+
+        selected = requested_fields(self.__class__, request.query_params)
+        if selected is None:
+            return
+
+        for name in set(self.fields) - selected:
+            self.fields.pop(name)
+
+
+class SparseFieldsetViewMixin:
+    """View mixin pushing the requested sparse fieldset down into the queryset,
+    so unused (often large TEXT) columns are never read from the database."""
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method != 'GET':
+            return queryset
+
+        serializer_class = self.get_serializer_class()
+        selected = requested_fields(serializer_class, self.request.query_params)
+        if selected is None:
+            return queryset
+        return prune_columns(queryset, serializer_class, selected)
+
@@ -0,0 +1,34 @@
+from django.db import models
+from django.db.models import OrderBy
+from django.db.models.functions import Collate, Upper
+from django.db.models.indexes import IndexExpression
+
+
+class SearchIndex(models.Index):
+    """Index for the admin's case-insensitive ``^field`` and ``=field`` searches.
+
+    Django runs those as ``UPPER(field) LIKE UPPER('term%')`` and
+    ``UPPER(field) = UPPER('term')``, which a plain index on the column
+    can't serve. This one is on ``UPPER(field)``, and on PostgreSQL gets the
+    ``text_pattern_ops`` operator class so prefix matches can use it under
+    any collation; other databases get the plain expression index.
+    """
+
+    def __init__(self, field, *, name):
+        self.field = field
+        super().__init__(Upper(field), name=name)
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        if schema_editor.connection.vendor == 'postgresql':
+            from django.contrib.postgres.indexes import OpClass
+
+            # What django.contrib.postgres does when installed, so the operator
+            # class lands outside the expression's parentheses
+            IndexExpression.register_wrappers(OrderBy, OpClass, Collate)
+            index = models.Index(OpClass(Upper(self.field), name='text_pattern_ops'), name=self.name)
+            return index.create_sql(model, schema_editor, using=using, **kwargs)
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
+
+    def deconstruct(self):
+        path, _, _ = super().deconstruct()
+        return path, (self.field,), {'name': self.name}
@@ -0,0 +1,208 @@
+import asyncio
+import json
+import threading
+import time
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import StreamingHttpResponse
+
+from .async_utils import async_api_view, api_response
+from .deletion import owned_events
+from .models import Event, Guest
+from .views import guest_list_stats
+
+HEARTBEAT_SECONDS = 15
+# Streams end after this long and EventSource reconnects on its own, which
+# bounds how long a subscriber can outlive a client that vanished silently.
+MAX_STREAM_SECONDS = 300
+RETRY_MILLISECONDS = 2000
+SUBSCRIBER_QUEUE_SIZE = 256
+
+RESYNC = object()
+
+
+def guest_counters(rsvp_status, checked_in, plus_ones):
+    """One guest's contribution to the counters returned by ``guest_list_stats``."""
+    attendees = 1 + plus_ones
+    confirmed = rsvp_status == 'confirmed'
+    return {
+        'total_guests': 1,
+        'total_attendees': attendees,
+        'confirmed_guests': int(confirmed),
+        'pending_guests': int(rsvp_status == 'pending'),
+        'declined_guests': int(rsvp_status == 'declined'),
+        'checked_in_guests': int(bool(checked_in)),
+        'confirmed_attendees': attendees if confirmed else 0,
+    }
+
+
+def counter_delta(old, new):
+    """Difference between two guest states, each ``(rsvp_status, checked_in, plus_ones)`` or ``None``."""
+    before = guest_counters(*old) if old else {}
+    after = guest_counters(*new) if new else {}
+    delta = {key: after.get(key, 0) - before.get(key, 0) for key in before.keys() | after.keys()}
+    return {key: value for key, value in delta.items() if value}
+
+
+class Subscription:
+    def __init__(self, event_id):
+        self.event_id = event_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def offer(self, message):
+        # Runs on the subscriber's loop. A subscriber that falls this far
+        # behind drops its backlog and re-reads a snapshot instead.
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+class CounterBroker:
+    """In-process pub/sub carrying guest counter deltas to live subscribers.
+
+    Publishers are guest writes on any thread; subscribers are coroutines
+    on the worker's event loop. Only writes made by this process are seen,
+    so deployments need sticky routing per event, or a single ASGI worker
+    per host, for the stream to reflect every write. Each delta carries
+    the guest change number of the write that made it, so a subscriber can
+    tell whether its snapshot already counts it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, event_id):
+        subscription = Subscription(event_id)
+        with self._lock:
+            self._subscribers[event_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.event_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.event_id]
+
+    def has_subscribers(self, event_id):
+        return event_id in self._subscribers
+
+    def publish(self, event_id, change, delta):
+        self._deliver(event_id, {'change': change, 'delta': delta})
+
+    def resync(self, event_id):
+        """Make subscribers re-read a snapshot, for bulk writes that bypass the model signals"""
+        self._deliver(event_id, RESYNC)
+
+    def _deliver(self, event_id, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(event_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, message)
+            except RuntimeError:
+                # The subscriber's loop is closed; it unsubscribes on its way out.
+                pass
+
+
+broker = CounterBroker()
+
+
+def publish_guest_change(event_id, change, old, new):
+    """Queue a counter delta for ``event_id``, sent once the write commits.
+
+    ``change`` is the guest change number the write took (``Guest.sync_seq``
+    or a tombstone's), which must be taken before this is called.
+    """
+    if not broker.has_subscribers(event_id):
+        return
+    delta = counter_delta(old, new)
+    if delta:
+        transaction.on_commit(lambda: broker.publish(event_id, change, delta))
+
+
+def resync_guest_counters(event_id):
+    """Refresh live subscribers of ``event_id`` once the current bulk write commits"""
+    if broker.has_subscribers(event_id):
+        transaction.on_commit(lambda: broker.resync(event_id))
+
+
+def _sse(event, data):
+    return f'event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n'
+
+
+@sync_to_async
+def _snapshot(event_id):
+    """The event's guest counters and the last guest change number they include.
+
+    Guest writes take their change number under a lock on the event row
+    and hold it until they commit, so with that lock held every numbered
+    change is either committed, and counted, or not yet made.
+    """
+    with transaction.atomic():
+        change = Event.objects.select_for_update().filter(id=event_id).values_list('guest_sync_seq', flat=True).first()
+        stats = guest_list_stats(Guest.objects.filter(event_id=event_id))
+    return change or 0, {key: value or 0 for key, value in stats.items()}
+
+
+async def _stream(event_id, streaming):
+    yield f'retry: {RETRY_MILLISECONDS}\n\n'
+    if not streaming:
+        # Under WSGI a stream would pin a worker thread; send a snapshot and
+        # let the client reconnect, which degrades to polling.
+        _, counters = await _snapshot(event_id)
+        yield _sse('snapshot', counters)
+        return
+
+    subscription = broker.subscribe(event_id)
+    try:
+        # Subscribed first, so deltas of changes after the snapshot's arrive
+        snapshot_change, counters = await _snapshot(event_id)
+        yield _sse('snapshot', counters)
+
+        deadline = time.monotonic() + MAX_STREAM_SECONDS
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                message = await asyncio.wait_for(subscription.queue.get(), timeout=min(HEARTBEAT_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+
+            if message is RESYNC:
+                snapshot_change, counters = await _snapshot(event_id)
+                yield _sse('snapshot', counters)
+            elif message['change'] > snapshot_change:
+                yield _sse('delta', message['delta'])
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@async_api_view(allow_query_token=True)
+async def event_live_counters(request, event_id):
+    """Server-Sent Events stream of an event's guest counters.
+
+    Sends a ``snapshot`` with the same counters as the guest list ``stats``,
+    then ``delta`` events as guests RSVP or check in. Accepts the access
+    token as ``?token=`` since ``EventSource`` can't send headers. Each
+    (re)connection counts against the default throttle.
+    """
+    if not await owned_events(request.user).filter(id=event_id).aexists():
+        return api_response({'error': 'Event not found'}, status=404)
+
+    response = StreamingHttpResponse(
+        _stream(event_id, streaming=isinstance(request._request, ASGIRequest)),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.archival import ARCHIVABLE_STATUSES, archivable_events, archive_events
+
+
+class Command(BaseCommand):
+    help = 'Move completed events older than ARCHIVE_AFTER_DAYS, with their guests and budget items, into the archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=settings.ARCHIVE_AFTER_DAYS,
+                            help='Archive events dated more than this many days ago')
+        parser.add_argument('--include-cancelled', action='store_true', help='Archive cancelled events too')
+        parser.add_argument('--batch-size', type=int, default=200, help='Events moved per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many events would be archived')
+
+    def handle(self, *args, **options):
+        statuses = (*ARCHIVABLE_STATUSES, 'cancelled') if options['include_cancelled'] else ARCHIVABLE_STATUSES
+        events = archivable_events(options['older_than_days'], statuses)
+        if options['dry_run']:
+            self.stdout.write(f'{events.count()} events would be archived')
+            return
+
+        totals = {'events': 0, 'budget_items': 0, 'guests': 0}
+        while True:
+            batch = list(events.order_by('id').values_list('id', flat=True)[:options['batch_size']])
+            if not batch:
+                break
+            for kind, moved in archive_events(batch).items():
+                totals[kind] += moved
+            self.stdout.write(f'Archived {totals["events"]} events...', ending='\r')
+            self.stdout.flush()
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {totals["events"]} events with {totals["guests"]} guests and {totals["budget_items"]} budget items'
+        ))
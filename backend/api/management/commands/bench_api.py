@@ -0,0 +1,528 @@
+import contextvars
+import json
+import platform
+import statistics
+import threading
+import time
+from datetime import timedelta
+from itertools import count
+from types import SimpleNamespace
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.backends.signals import connection_created
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api import urls as api_urls
+from api.models import (
+    User, Event, BudgetItem, Guest, Vendor, SubscriptionPlan, PaymentRequest, EventTemplate, EventSeries,
+    Contact, ContactGroup, Table, SeatAssignment, SeatingConstraint, UserSettings, RequestProfile,
+    ArchivedEvent, DeletionJob,
+)
+from api.series import materialize_due
+from api.sync import sync_token
+
+BENCH_PREFIX = 'bench-api'
+TRANSACTION_STATEMENTS = ('BEGIN', 'COMMIT', 'ROLLBACK')
+
+
+class Scenario:
+    """One request shape against one route.
+
+    ``args`` and ``data`` take the fixtures namespace and return the URL
+    arguments and request body. ``budget`` is the most SQL queries a single
+    request may run; it must not depend on the size of the dataset, which
+    is what catches N+1 regressions. Writes run on one client inside a
+    transaction that is rolled back, so the dataset is the same every run.
+    """
+
+    def __init__(self, name, method='get', args=None, query='', data=None, budget=None,
+                 role='tenant', statuses=(200,), label=None):
+        self.name = name
+        self.method = method
+        self.args = args or (lambda fx: [])
+        self.query = query
+        self.data = data
+        self.budget = budget
+        self.role = role
+        self.statuses = statuses
+        self.label = label or f'{method.upper()} {name}'
+
+    @property
+    def write(self):
+        return self.method != 'get'
+
+    def path(self, fx):
+        path = reverse(self.name, args=self.args(fx))
+        return f'{path}?{self.query.format(fx=fx)}' if self.query else path
+
+    def body(self, fx):
+        return self.data(fx) if callable(self.data) else self.data
+
+
+_signups = count()
+
+
+def _signup(fx):
+    n = next(_signups)
+    return {
+        'first_name': 'Bench', 'last_name': 'User', 'email': f'{BENCH_PREFIX}-signup-{n}@example.com',
+        'password': 'bench-Passw0rd!', 'confirm_password': 'bench-Passw0rd!',
+        'business_name': 'Bench', 'business_type': 'Other', 'city': 'Dhaka',
+    }
+
+
+def _event_body(fx):
+    return {
+        'name': 'Bench event', 'category': 'wedding', 'date': str(fx.today + timedelta(days=60)), 'time': '18:00',
+        'venue': 'Bench Hall', 'budget': '100000.00', 'expected_guests': 100,
+    }
+
+
+def _budget_sheet(fx):
+    return {
+        'items': [
+            {'id': fx.budget_item.id, 'updated_at': fx.budget_item.updated_at.isoformat(), 'notes': 'bench sheet'},
+            {'category': 'venue', 'item_name': 'Bench sheet row', 'estimated_cost': '10.00'},
+        ],
+    }
+
+
+event = lambda fx: [fx.event.id]
+
+SCENARIOS = [
+    # Authentication
+    Scenario('signup', 'post', data=_signup, budget=4, role='anonymous', statuses=(201,)),
+    Scenario('signin', 'post', data=lambda fx: {'email': fx.user.email, 'password': fx.password}, budget=1, role='anonymous'),
+    Scenario('user-profile', budget=1),
+    Scenario('user-profile', 'put', data={'city': 'Sylhet'}, budget=2),
+
+    # Events
+    Scenario('event-list-create', budget=3),
+    Scenario('event-list-create', query='fields=id,name,date&page_size=100', budget=3, label='GET event-list-create sparse'),
+    Scenario('event-list-create', 'post', data=_event_body, budget=6, statuses=(201,)),
+    Scenario('event-detail', args=event, budget=2),
+    Scenario('event-detail', 'patch', args=event, data={'venue': 'Bench Hall'}, budget=3),
+    Scenario('event-workspace', args=event, budget=13),
+    Scenario('event-live-counters', args=event, budget=4),
+    # Streams in keyset pages, so its query count grows with the guest list by design
+    Scenario('event-export', args=lambda fx: [fx.event.id, 'guests']),
+    Scenario('deletion-job-detail', args=lambda fx: [fx.deletion_job.id], budget=2),
+    Scenario('event-clone', 'post', args=event, data={'include_guests': True}, budget=18, statuses=(201,)),
+    Scenario('event-template-list-create', budget=3),
+    Scenario('event-template-detail', args=lambda fx: [fx.template.id], budget=2),
+    Scenario('event-template-create-event', 'post', args=lambda fx: [fx.template.id],
+             data=lambda fx: {'date': str(fx.today + timedelta(days=30)), 'time': '18:00'}, budget=17, statuses=(201,)),
+    Scenario('event-series-list-create', budget=3),
+    Scenario('event-series-detail', args=lambda fx: [fx.series.id], budget=2),
+    Scenario('event-calendar', query='start={fx.today}&end={fx.month_end}', budget=4),
+    Scenario('archived-event-list', budget=3),
+    Scenario('archived-event-detail', args=lambda fx: [fx.archived_event.id], budget=2),
+    Scenario('archived-event-restore', 'post', args=lambda fx: [fx.archived_event.id], budget=16),
+
+    # Budget
+    Scenario('budget-list-create', query='event={fx.event.id}', budget=4),
+    Scenario('budget-detail', args=lambda fx: [fx.budget_item.id], budget=2),
+    Scenario('budget-detail', 'patch', args=lambda fx: [fx.budget_item.id], data={'notes': 'bench'}, budget=3),
+    Scenario('event-budget-bulk', 'post', args=event, data=_budget_sheet, budget=14),
+
+    # Guests
+    Scenario('guest-list-create', query='event={fx.event.id}', budget=5),
+    Scenario('guest-list-create', query='event={fx.event.id}&fields=id,name,rsvp_status&page_size=100', budget=5,
+             label='GET guest-list-create sparse'),
+    Scenario('guest-list-create', 'post', data=lambda fx: {'event': fx.event.id, 'name': 'Bench Guest', 'category': 'family'},
+             budget=8, statuses=(201,)),
+    Scenario('guest-detail', args=lambda fx: [fx.guest.id], budget=2),
+    Scenario('guest-detail', 'patch', args=lambda fx: [fx.guest.id], data={'rsvp_status': 'confirmed'}, budget=7),
+    Scenario('guest-duplicates', query='event={fx.event.id}', budget=3),
+    Scenario('guest-merge', 'post', data=lambda fx: {'groups': [{'guests': fx.merge_guests}]}, budget=23),
+    Scenario('event-guest-sync', args=event, query='limit=1000', budget=3, label='GET event-guest-sync full'),
+    Scenario('event-guest-sync', args=event, query='token={fx.sync_token}', budget=4),
+    Scenario('event-guest-sync', 'post', args=event, data=lambda fx: {
+        'mutations': [{'guest': fx.guest.id, 'checked_in': not fx.guest.checked_in, 'base_seq': fx.guest.sync_seq}],
+    }, budget=9),
+
+    # Contact book
+    Scenario('contact-list-create', budget=3),
+    Scenario('contact-detail', args=lambda fx: [fx.contact.id], budget=2),
+    Scenario('contact-group-list-create', budget=4),
+    Scenario('contact-group-detail', args=lambda fx: [fx.contact_group.id], budget=3),
+    Scenario('contact-group-add-to-event', 'post', args=lambda fx: [fx.contact_group.id],
+             data=lambda fx: {'event': fx.event.id}, budget=15, statuses=(201,)),
+
+    # Seating
+    Scenario('table-list-create', query='event={fx.event.id}', budget=4),
+    Scenario('table-detail', args=lambda fx: [fx.table.id], budget=2),
+    Scenario('seat-assignment-list-create', query='event={fx.event.id}', budget=4),
+    Scenario('seat-assignment-detail', args=lambda fx: [fx.seat_assignment.id], budget=2),
+    Scenario('seating-constraint-list-create', budget=3),
+    Scenario('seating-constraint-detail', args=lambda fx: [fx.seating_constraint.id], budget=2),
+    Scenario('event-seating', args=event, budget=4),
+    Scenario('event-seating-optimize', 'post', args=event, data={'apply': False, 'time_budget': 0.2}, budget=4),
+
+    # Vendors
+    Scenario('vendor-list-create', budget=3),
+    Scenario('vendor-detail', args=lambda fx: [fx.vendor.id], budget=2),
+
+    # Analytics
+    Scenario('event-analytics', args=event, budget=9),
+    Scenario('events-analytics', query='start={fx.year_start}&end={fx.today}', budget=8),
+    Scenario('overall-analytics', budget=7),
+
+    # WhatsApp
+    Scenario('create-whatsapp-group', 'post', data=lambda fx: {'event_id': fx.event.id}, budget=4),
+    Scenario('get-event-contacts', args=event, budget=4),
+
+    Scenario('user-settings', budget=2),
+    Scenario('user-settings', 'put', data={'sms_notifications': True}, budget=3),
+
+    # Billing & Subscriptions
+    Scenario('subscription_plans', budget=1, role='anonymous'),
+    Scenario('user_subscription', budget=2),
+    Scenario('create_payment_request', 'post', data=lambda fx: {'plan_id': fx.plan.id, 'payment_method': 'bank_transfer'},
+             budget=3, statuses=(201,)),
+    Scenario('payment_requests', budget=2),
+    Scenario('cancel_subscription', 'post', budget=5, statuses=(200, 404)),
+    Scenario('payment_history', budget=2),
+
+    # Admin billing
+    Scenario('admin_payment_requests', budget=3, role='staff'),
+    Scenario('bulk_review_payment_requests', 'post', data=lambda fx: {'ids': [fx.payment_request.id], 'action': 'reject'},
+             budget=5, role='staff'),
+    Scenario('approve_payment_request', 'post', args=lambda fx: [fx.payment_request.id], budget=9, role='staff'),
+    Scenario('reject_payment_request', 'post', args=lambda fx: [fx.payment_request.id], budget=5, role='staff'),
+    Scenario('admin_revenue_analytics', budget=10, role='staff'),
+
+    # Admin request profiling
+    Scenario('admin_request_profiles', budget=3, role='staff'),
+    Scenario('admin_request_profile_token', 'post', budget=1, role='staff', statuses=(201,)),
+    Scenario('admin_request_profile_detail', args=lambda fx: [fx.request_profile.id], budget=2, role='staff'),
+    Scenario('admin_request_profile_download', args=lambda fx: [fx.request_profile.id], budget=2, role='staff'),
+]
+
+
+# The statements of the request in flight; a context variable rather than
+# the connection's query log so queries the view runs on other threads
+# (``gather_queries``) are counted too, since each of those has its own connection
+_statements = contextvars.ContextVar('bench_api_statements', default=None)
+
+
+def _count_statement(execute, sql, params, many, context):
+    statements = _statements.get()
+    if statements is not None:
+        statements.append(sql)
+    return execute(sql, params, many, context)
+
+
+def _instrument_connection(sender, connection, **kwargs):
+    if _count_statement not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_statement)
+
+
+def _percentile(quantiles, n):
+    return round(quantiles[n - 1] * 1000, 2)
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark every API route against the current (ideally generate_synthetic_data-sized) dataset: '
+        'latency percentiles, throughput and per-request SQL query budgets, written as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Tenant to benchmark as (email); defaults to the owner of the largest event')
+        parser.add_argument('--password', default='synthetic-password', help="The tenant's password, for the signin scenario")
+        parser.add_argument('--requests', type=int, default=50, help='Requests per read scenario')
+        parser.add_argument('--write-requests', type=int, default=10, help='Requests per write scenario')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients for read scenarios')
+        parser.add_argument('--only', action='append', help='Only run scenarios for this URL name (repeatable)')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--baseline', help='Earlier --output file to compare p95 latency and query counts against')
+        parser.add_argument('--max-regression', type=float, default=25.0, help='Allowed p95 slowdown against --baseline, in percent')
+
+    def handle(self, *args, **options):
+        self._check_coverage()
+        scenarios = [scenario for scenario in SCENARIOS if not options['only'] or scenario.name in options['only']]
+        if not scenarios:
+            raise CommandError(f'No scenarios for {", ".join(options["only"])}')
+
+        connection_created.connect(_instrument_connection, dispatch_uid='bench_api')
+        fx, created = self._fixtures(options)
+        try:
+            # The benchmark fires far more requests than any plan allows
+            with override_settings(THROTTLE_ENABLED=False):
+                results = [self._run(scenario, fx, options) for scenario in scenarios]
+        finally:
+            self._cleanup(created)
+
+        report = {
+            'started_at': fx.started_at.isoformat(),
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'concurrency': options['concurrency'],
+            },
+            'dataset': {
+                model._meta.model_name: model.objects.count() for model in (User, Event, Guest, BudgetItem, Vendor)
+            },
+            'tenant': {'user': fx.user.id, 'event': fx.event.id, 'event_guests': fx.event_guests},
+            'results': results,
+        }
+        failures = [result for result in results if result['errors'] or result['over_budget']]
+        if options['baseline']:
+            failures += self._compare(results, options['baseline'], options['max_regression'])
+        report['passed'] = not failures
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+        if failures:
+            raise CommandError(f'{len(failures)} scenario(s) failed; see above')
+        self.stdout.write(self.style.SUCCESS(f'{len(results)} scenarios within budget'))
+
+    def _check_coverage(self):
+        covered = {scenario.name for scenario in SCENARIOS}
+        missing = [pattern.name for pattern in api_urls.urlpatterns if pattern.name not in covered]
+        if missing:
+            raise CommandError(f'Routes without a benchmark scenario: {", ".join(missing)}')
+
+    def _fixtures(self, options):
+        """The tenant and its largest event, plus the rows the detail routes need, created where missing"""
+        users = User.objects.all()
+        if options['user']:
+            users = users.filter(email=options['user'])
+        event = (
+            Event.objects.filter(user__in=users).annotate(guest_count=Count('guests'))
+            .order_by('-guest_count').select_related('user').first()
+        )
+        if event is None or not event.guest_count:
+            raise CommandError('No event with guests to benchmark; run generate_synthetic_data first')
+        user = event.user
+        staff = User.objects.filter(is_staff=True).exclude(id=user.id).first()
+        today = timezone.localdate()
+        created = []
+
+        def ensure(queryset, factory):
+            instance = queryset.first()
+            if instance is None:
+                instance = factory()
+                created.append(instance)
+            return instance
+
+        guests = list(Guest.objects.filter(event=event).order_by('id')[:4])
+        table = ensure(Table.objects.filter(event=event), lambda: Table.objects.create(event=event, name=f'{BENCH_PREFIX} table', capacity=10))
+        plan = ensure(SubscriptionPlan.objects.filter(is_active=True), lambda: SubscriptionPlan.objects.create(
+            name=f'{BENCH_PREFIX}-plan', display_name='Bench', description='', price_monthly=10, price_yearly=100,
+            max_events=10, max_guests_per_event=100, max_vendors=10,
+        ))
+        contact = ensure(Contact.objects.filter(user=user), lambda: Contact.objects.create(
+            user=user, name=guests[0].name, phone=guests[0].phone, email=guests[0].email,
+        ))
+        contact_group = ContactGroup.objects.filter(user=user).first()
+        if contact_group is None:
+            contact_group = ContactGroup.objects.create(user=user, name=f'{BENCH_PREFIX} group')
+            contact_group.contacts.add(contact)
+            created.append(contact_group)
+        fx = SimpleNamespace(
+            started_at=timezone.now(),
+            today=today,
+            month_end=today + timedelta(days=30),
+            year_start=today - timedelta(days=365),
+            user=user,
+            staff=staff,
+            password=options['password'],
+            event=event,
+            event_guests=event.guest_count,
+            guest=guests[0],
+            merge_guests=[guest.id for guest in guests[2:4]],
+            plan=plan,
+            table=table,
+            contact=contact,
+            contact_group=contact_group,
+            budget_item=ensure(BudgetItem.objects.filter(event=event), lambda: BudgetItem.objects.create(
+                event=event, category='venue', item_name=f'{BENCH_PREFIX} item', estimated_cost=100,
+            )),
+            vendor=ensure(Vendor.objects.filter(user=user), lambda: Vendor.objects.create(
+                user=user, name=f'{BENCH_PREFIX} vendor', category='other', phone='01700000000', address='', price_range='budget', services='',
+            )),
+            template=ensure(EventTemplate.objects.filter(user=user), lambda: EventTemplate.objects.create(
+                user=user, name=f'{BENCH_PREFIX} template', category='wedding', budget_items=[
+                    {'category': 'venue', 'item_name': 'Hall', 'estimated_cost': '1000.00'},
+                ],
+            )),
+            # Starts beyond the materialization window so it adds no events
+            series=ensure(EventSeries.objects.filter(user=user), lambda: EventSeries.objects.create(
+                user=user, name=f'{BENCH_PREFIX} series', category='other', time='18:00', venue='Bench Hall',
+                frequency='monthly', start_date=today + timedelta(days=365 * 5), count=1,
+            )),
+            seat_assignment=ensure(SeatAssignment.objects.filter(event=event), lambda: SeatAssignment.objects.create(
+                event=event, table=table, guest=guests[0],
+            )),
+            seating_constraint=ensure(SeatingConstraint.objects.filter(event=event), lambda: SeatingConstraint.objects.create(
+                event=event, guest=guests[0], other_guest=guests[1], kind='together',
+            )),
+            payment_request=ensure(PaymentRequest.objects.filter(user=user, status='submitted'), lambda: PaymentRequest.objects.create(
+                user=user, plan=plan, billing_cycle='monthly', amount=plan.price_monthly,
+                payment_method='bank_transfer', status='submitted', submitted_at=timezone.now(),
+            )),
+            # Past the highest event id, so a restore never collides
+            archived_event=ensure(ArchivedEvent.objects.filter(user=user), lambda: ArchivedEvent.objects.create(
+                id=Event.objects.order_by('-id').values_list('id', flat=True).first() + 1_000_000, user=user,
+                name=f'{BENCH_PREFIX} archived', category='other', date=today - timedelta(days=800), time='18:00',
+                venue='Bench Hall', budget=1000, expected_guests=10, status='completed',
+                created_at=timezone.now(), updated_at=timezone.now(),
+            )),
+            sync_token=sync_token(event.id, (event.guest_sync_seq, 0)),
+            deletion_job=ensure(DeletionJob.objects.filter(user=user), lambda: DeletionJob.objects.create(
+                user=user, model='api.Event', object_id=0, object_repr=f'{BENCH_PREFIX} event', status='completed',
+            )),
+            request_profile=ensure(RequestProfile.objects.all(), lambda: RequestProfile.objects.create(
+                method='GET', path=f'/{BENCH_PREFIX}/', status_code=200, duration_ms=0, stats=b'',
+            )),
+        )
+        # Reads must not write: settle the lazy first-visit writes up front
+        ensure(UserSettings.objects.filter(user=user), lambda: UserSettings.objects.create(user=user))
+        materialize_due(user)
+        fx.headers = {
+            'tenant': {'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'},
+            'staff': {'Authorization': f'Bearer {RefreshToken.for_user(staff).access_token}'} if staff else None,
+            'anonymous': {},
+        }
+        fx.can_sign_in = user.check_password(options['password'])
+        return fx, created
+
+    def _cleanup(self, created):
+        for instance in reversed(created):
+            type(instance).objects.filter(pk=instance.pk).delete()
+
+    def _skip(self, scenario, fx):
+        if fx.headers[scenario.role] is None:
+            return 'no staff user to run admin routes as'
+        if scenario.name == 'signin' and not fx.can_sign_in:
+            return "--password is not the tenant's password"
+        return None
+
+    def _run(self, scenario, fx, options):
+        path = scenario.path(fx)
+        result = {'label': scenario.label, 'name': scenario.name, 'method': scenario.method.upper(), 'path': path}
+        reason = self._skip(scenario, fx)
+        if reason:
+            self.stdout.write(f'{scenario.label:<44} skipped: {reason}')
+            return {**result, 'skipped': reason, 'errors': [], 'over_budget': False}
+
+        total = options['write_requests'] if scenario.write else options['requests']
+        # SQLite has a single writer, and writes are rolled back anyway
+        concurrency = 1 if scenario.write else max(1, min(options['concurrency'], total))
+        samples, errors = [], []
+        lock = threading.Lock()
+        remaining = [total]
+
+        def worker():
+            client = Client()
+            try:
+                while True:
+                    with lock:
+                        if not remaining[0]:
+                            return
+                        remaining[0] -= 1
+                    try:
+                        sample = self._request(client, scenario, path, fx)
+                    except Exception as e:
+                        with lock:
+                            errors.append(f'{type(e).__name__}: {e}')
+                        continue
+                    with lock:
+                        samples.append(sample)
+                        if sample['status'] not in scenario.statuses:
+                            errors.append(f'status {sample["status"]}')
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        if not samples:
+            self.stdout.write(self.style.ERROR(f'{scenario.label:<44} failed: {", ".join(sorted(set(errors)))}'))
+            return {**result, 'errors': sorted(set(errors)), 'over_budget': False}
+        latencies = sorted(sample['seconds'] for sample in samples)
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        queries = max(sample['queries'] for sample in samples)
+        result.update({
+            'requests': len(samples),
+            'concurrency': concurrency,
+            'p50_ms': _percentile(quantiles, 50),
+            'p95_ms': _percentile(quantiles, 95),
+            'p99_ms': _percentile(quantiles, 99),
+            'mean_ms': round(statistics.fmean(latencies) * 1000, 2),
+            'max_ms': round(latencies[-1] * 1000, 2),
+            'throughput_rps': round(len(samples) / elapsed, 1),
+            'queries': queries,
+            'query_budget': scenario.budget,
+            'over_budget': scenario.budget is not None and queries > scenario.budget,
+            'errors': sorted(set(errors)),
+        })
+        style = self.style.ERROR if result['errors'] or result['over_budget'] else (lambda text: text)
+        self.stdout.write(style(
+            f'{scenario.label:<44} p50 {result["p50_ms"]:8.1f} ms  p95 {result["p95_ms"]:8.1f} ms  '
+            f'{result["throughput_rps"]:7.1f} req/s  queries {queries:>3}/{scenario.budget if scenario.budget is not None else "-":<3}'
+            + (f'  {", ".join(result["errors"])}' if result['errors'] else '')
+        ))
+        return result
+
+    def _request(self, client, scenario, path, fx):
+        headers = fx.headers[scenario.role]
+        body = scenario.body(fx)
+        _instrument_connection(None, connection)
+        token = _statements.set([])
+        try:
+            started = time.perf_counter()
+            if scenario.write:
+                with transaction.atomic():
+                    response = getattr(client, scenario.method)(path, body, content_type='application/json', headers=headers)
+                    transaction.set_rollback(True)
+            else:
+                response = client.get(path, headers=headers)
+            if response.streaming:
+                b''.join(response)
+            seconds = time.perf_counter() - started
+            statements = _statements.get()
+        finally:
+            _statements.reset(token)
+        # The transaction around writes is the harness's, not the endpoint's
+        statements = [sql for sql in statements if sql not in TRANSACTION_STATEMENTS]
+        return {'status': response.status_code, 'seconds': seconds, 'queries': len(statements)}
+
+    def _compare(self, results, baseline_path, max_regression):
+        try:
+            with open(baseline_path) as baseline_file:
+                baseline = {result['label']: result for result in json.load(baseline_file)['results']}
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f'Cannot read baseline {baseline_path}: {e}')
+
+        regressions = []
+        for result in results:
+            before = baseline.get(result['label'])
+            # Skipped and failed scenarios have no samples to compare
+            if not before or 'p95_ms' not in result or 'p95_ms' not in before:
+                continue
+            slowdown = (result['p95_ms'] / before['p95_ms'] - 1) * 100 if before['p95_ms'] else 0
+            result['baseline'] = {'p95_ms': before['p95_ms'], 'queries': before['queries'], 'p95_change_percent': round(slowdown, 1)}
+            if slowdown > max_regression or result['queries'] > before['queries']:
+                regressions.append(result)
+                self.stdout.write(self.style.ERROR(
+                    f'{result["label"]:<44} regressed: p95 {before["p95_ms"]} -> {result["p95_ms"]} ms, '
+                    f'queries {before["queries"]} -> {result["queries"]}'
+                ))
+        return regressions
@@ -0,0 +1,118 @@
+import asyncio
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.models import Event
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare latency and throughput of the I/O-heavy endpoints served through the '
+        'WSGI handler on a thread pool and through the ASGI handler on one event loop'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--event', type=int, help='Event to load; defaults to the event with the most guests')
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--requests', type=int, default=400)
+
+    def handle(self, *args, **options):
+        event = self._event(options['event'])
+        token = str(RefreshToken.for_user(event.user).access_token)
+        paths = [
+            reverse('event-analytics', args=[event.id]),
+            reverse('overall-analytics'),
+            reverse('event-workspace', args=[event.id]),
+            reverse('get-event-contacts', args=[event.id]),
+            reverse('event-export', args=[event.id, 'guests']),
+        ]
+        schedule = [paths[i % len(paths)] for i in range(options['requests'])]
+        headers = {'Authorization': f'Bearer {token}'}
+
+        self.stdout.write(
+            f'event {event.id}: {len(schedule)} requests over {len(paths)} endpoints, '
+            f'concurrency {options["concurrency"]}'
+        )
+        for label, run in (('wsgi', self._run_wsgi), ('asgi', self._run_asgi)):
+            started = time.perf_counter()
+            # Throughput is the point here, not any plan's rate limit
+            with override_settings(THROTTLE_ENABLED=False):
+                latencies = run(schedule, headers, options['concurrency'])
+            elapsed = time.perf_counter() - started
+            self._report(label, latencies, elapsed)
+
+    def _event(self, event_id):
+        events = Event.objects.select_related('user')
+        if event_id is not None:
+            event = events.filter(id=event_id).first()
+        else:
+            event = events.annotate(guest_count=Count('guests')).order_by('-guest_count').first()
+        if event is None:
+            raise CommandError('No event to benchmark')
+        return event
+
+    def _run_wsgi(self, schedule, headers, concurrency):
+        latencies = []
+        lock = threading.Lock()
+        queue = list(reversed(schedule))
+
+        def worker():
+            client = Client()
+            while True:
+                with lock:
+                    if not queue:
+                        return
+                    path = queue.pop()
+                started = time.perf_counter()
+                response = client.get(path, headers=headers)
+                b''.join(response)
+                elapsed = time.perf_counter() - started
+                self._check(path, response)
+                with lock:
+                    latencies.append(elapsed)
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return latencies
+
+    def _run_asgi(self, schedule, headers, concurrency):
+        async def run():
+            client = AsyncClient()
+            limit = asyncio.Semaphore(concurrency)
+
+            async def fetch(path):
+                async with limit:
+                    started = time.perf_counter()
+                    response = await client.get(path, headers=headers)
+                    if response.streaming:
+                        async for _ in response.streaming_content:
+                            pass
+                    elapsed = time.perf_counter() - started
+                    self._check(path, response)
+                    return elapsed
+
+            return await asyncio.gather(*(fetch(path) for path in schedule))
+
+        return asyncio.run(run())
+
+    def _check(self, path, response):
+        if response.status_code != 200:
+            raise CommandError(f'{path} returned {response.status_code}')
+
+    def _report(self, label, latencies, elapsed):
+        quantiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f'{label}  p50 {quantiles[49] * 1000:8.1f} ms   p95 {quantiles[94] * 1000:8.1f} ms   '
+            f'p99 {quantiles[98] * 1000:8.1f} ms   {len(latencies) / elapsed:8.1f} req/s'
+        )
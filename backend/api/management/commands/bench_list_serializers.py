@@ -0,0 +1,112 @@
+import random
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api.models import BudgetItem, Guest
+from api.serializers import (
+    BudgetItemSerializer, GuestSerializer, BudgetItemListSerializer, GuestListSerializer,
+)
+
+
+class Command(BaseCommand):
+    help = 'Compare per-row serialization cost of the full list serializers and the values() fast path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        rows = options['rows']
+
+        cases = [
+            ('guests', GuestSerializer, GuestListSerializer, self._guests(rng, rows), {'total_attendees': lambda g: 1 + g.plus_ones}),
+            ('budget', BudgetItemSerializer, BudgetItemListSerializer, self._budget_items(rng, rows), {}),
+        ]
+        for label, serializer_class, fast_serializer, instances, computed in cases:
+            values = [self._values_row(instance, fast_serializer.field_names, computed) for instance in instances]
+
+            full = serializer_class(instances, many=True).data
+            fast = fast_serializer.render(values)
+            if [dict(item) for item in full] != fast:
+                raise CommandError(f'{label}: fast path output differs from {serializer_class.__name__}')
+
+            before = self._per_row(lambda: serializer_class(instances, many=True).data, rows, options['repeat'])
+            after = self._per_row(lambda: fast_serializer.render(values), rows, options['repeat'])
+            self.stdout.write(
+                f'{label:<8} {serializer_class.__name__:<22} {before:8.2f} us/row   '
+                f'values() fast path {after:8.2f} us/row   speedup {before / after:5.1f}x'
+            )
+
+    def _per_row(self, func, rows, repeat):
+        best = min(self._timed(func) for _ in range(repeat))
+        return best / rows * 1e6
+
+    def _timed(self, func):
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+
+    def _values_row(self, instance, names, computed):
+        row = {}
+        for name in names:
+            if name in computed:
+                row[name] = computed[name](instance)
+            else:
+                field = instance._meta.get_field(name)
+                row[name] = getattr(instance, field.attname)
+        return row
+
+    def _timestamp(self, rng):
+        return timezone.make_aware(datetime(2024, 1, 1)) + timedelta(seconds=rng.randrange(60 * 60 * 24 * 365))
+
+    def _guests(self, rng, rows):
+        categories = [choice for choice, _ in Guest.CATEGORY_CHOICES]
+        statuses = [choice for choice, _ in Guest.RSVP_CHOICES]
+        guests = []
+        for pk in range(1, rows + 1):
+            created_at = self._timestamp(rng)
+            guests.append(Guest(
+                id=pk,
+                event_id=rng.randrange(1, 50),
+                name=f'Guest {pk}',
+                email=f'guest{pk}@example.com' if rng.random() < 0.7 else None,
+                phone=f'01{rng.randrange(10**8, 10**9)}',
+                category=rng.choice(categories),
+                rsvp_status=rng.choice(statuses),
+                plus_ones=rng.randrange(4),
+                dietary_restrictions='Vegetarian' if rng.random() < 0.1 else '',
+                notes='',
+                invitation_sent=rng.random() < 0.5,
+                checked_in=False,
+                created_at=created_at,
+                updated_at=created_at,
+            ))
+        return guests
+
+    def _budget_items(self, rng, rows):
+        categories = [choice for choice, _ in BudgetItem.CATEGORY_CHOICES]
+        statuses = [choice for choice, _ in BudgetItem.STATUS_CHOICES]
+        items = []
+        for pk in range(1, rows + 1):
+            created_at = self._timestamp(rng)
+            items.append(BudgetItem(
+                id=pk,
+                event_id=rng.randrange(1, 50),
+                category=rng.choice(categories),
+                item_name=f'Item {pk}',
+                estimated_cost=Decimal(rng.randrange(100, 100000)) / 100,
+                actual_cost=Decimal(rng.randrange(0, 100000)) / 100,
+                vendor_id=rng.choice([None, rng.randrange(1, 20)]),
+                status=rng.choice(statuses),
+                due_date=date(2025, 1, 1) + timedelta(days=rng.randrange(365)),
+                notes='',
+                created_at=created_at,
+                updated_at=created_at,
+            ))
+        return items
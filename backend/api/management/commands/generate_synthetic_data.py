@@ -0,0 +1,411 @@
+import math
+import random
+from bisect import bisect
+from itertools import accumulate
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from api.models import User, Event, BudgetItem, Guest, Vendor
+from api.timeseries import rebuild_event_stats, rebuild_user_stats
+
+GENERATED_MODELS = (User, Vendor, Event, BudgetItem, Guest)
+ROLLUP_CHUNK_SIZE = 500
+
+# Relative frequencies; choices missing here get weight 1, so new model
+# choices are generated without touching this command.
+EVENT_CATEGORY_WEIGHTS = {'wedding': 30, 'corporate': 15, 'birthday': 15, 'social': 10, 'community': 8, 'anniversary': 7, 'conference': 6, 'seminar': 4, 'other': 5}
+UPCOMING_EVENT_STATUS_WEIGHTS = {'planning': 60, 'confirmed': 35, 'active': 5, 'completed': 0, 'cancelled': 3}
+PAST_EVENT_STATUS_WEIGHTS = {'planning': 0, 'confirmed': 0, 'active': 0, 'completed': 90, 'cancelled': 10}
+GUEST_CATEGORY_WEIGHTS = {'family': 35, 'friends': 30, 'colleagues': 15, 'vip': 4, 'vendors': 3, 'other': 13}
+UPCOMING_RSVP_WEIGHTS = {'pending': 45, 'confirmed': 35, 'declined': 8, 'maybe': 12}
+PAST_RSVP_WEIGHTS = {'pending': 8, 'confirmed': 72, 'declined': 15, 'maybe': 5}
+BUDGET_CATEGORY_WEIGHTS = {'venue': 12, 'catering': 15, 'decoration': 10, 'photography': 9, 'entertainment': 7, 'transportation': 6, 'flowers': 6, 'invitations': 5, 'gifts': 4, 'miscellaneous': 8}
+UPCOMING_BUDGET_STATUS_WEIGHTS = {'pending': 65, 'paid': 10, 'partial': 20, 'overdue': 5}
+PAST_BUDGET_STATUS_WEIGHTS = {'pending': 2, 'paid': 85, 'partial': 8, 'overdue': 5}
+VENDOR_CATEGORY_WEIGHTS = {'catering': 15, 'photography': 12, 'decoration': 12, 'venue': 10, 'makeup': 8}
+PRICE_RANGE_WEIGHTS = {'budget': 30, 'mid_range': 40, 'premium': 22, 'luxury': 8}
+BUSINESS_TYPE_WEIGHTS = {'Wedding Planner': 35, 'Event Management Company': 25, 'Individual Planner': 20}
+
+FIRST_NAMES = (
+    'Abdul', 'Aisha', 'Amina', 'Anika', 'Arif', 'Ayesha', 'Farhan', 'Farzana', 'Habib', 'Hasan',
+    'Imran', 'Jamal', 'Karim', 'Laila', 'Mahmud', 'Mariam', 'Mehedi', 'Nabila', 'Nadia', 'Nasrin',
+    'Omar', 'Rahim', 'Rafiq', 'Rina', 'Sabbir', 'Sadia', 'Shahid', 'Sumaiya', 'Tanvir', 'Zara',
+)
+LAST_NAMES = (
+    'Ahmed', 'Akter', 'Alam', 'Begum', 'Chowdhury', 'Das', 'Haque', 'Hossain', 'Islam', 'Kabir',
+    'Khan', 'Mahmud', 'Miah', 'Rahman', 'Roy', 'Saha', 'Sarker', 'Siddique', 'Talukder', 'Uddin',
+)
+CITIES = ('Dhaka', 'Chattogram', 'Sylhet', 'Khulna', 'Rajshahi', 'Barishal', 'Rangpur', 'Cumilla')
+VENUES = ('Convention Hall', 'Community Centre', 'Rooftop Garden', 'Hotel Ballroom', 'Banquet Hall', 'Resort Lawn')
+DIETARY = ('Vegetarian', 'Halal only', 'No beef', 'Nut allergy', 'Diabetic', 'Gluten free')
+# Share of a user's guests who were already invited to one of their
+# earlier events, which is what the contact book and dedup deal with
+REPEAT_GUEST_RATE = 0.3
+MAX_GUEST_POOL = 2000
+
+
+GUEST_COLUMNS = (
+    'id', 'event_id', 'name', 'email', 'phone', 'category', 'rsvp_status', 'plus_ones', 'dietary_restrictions',
+    'notes', 'invitation_sent', 'invitation_sent_date', 'checked_in', 'check_in_time', 'sync_seq', 'created_at', 'updated_at',
+)
+BUDGET_ITEM_COLUMNS = (
+    'id', 'event_id', 'category', 'item_name', 'estimated_cost', 'actual_cost', 'vendor_id', 'status', 'due_date',
+    'notes', 'created_at', 'updated_at',
+)
+PLUS_ONES = (0, 1, 2, 3, 4), (55, 25, 12, 5, 3)
+SUBSCRIPTION_PLANS = ('free', 'basic', 'pro', 'enterprise'), (70, 18, 10, 2)
+
+
+def _weighted(choices, weights):
+    values = [value for value, _ in choices]
+    return _cumulative(values, [weights.get(value, 1) for value in values])
+
+
+def _cumulative(values, weights):
+    cumulative = list(accumulate(weights))
+    return values, cumulative, cumulative[-1]
+
+
+def _pareto_count(rng, mean, cap, alpha=1.5):
+    """Heavy-tailed count averaging roughly ``mean``: most tenants are small, a few are huge"""
+    return min(cap, round(mean * (rng.paretovariate(alpha) - 1) * (alpha - 1)))
+
+
+def _lognormal_count(rng, mean, sigma, cap):
+    return min(cap, round(rng.lognormvariate(math.log(max(mean, 1)) - sigma * sigma / 2, sigma)))
+
+
+def _between(rng, start, end, skew=1.0):
+    """A moment between ``start`` and ``end``; ``skew`` above 1 crowds it toward ``start``"""
+    return start + (end - start) * (rng.random() ** skew)
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let ``bulk_create`` keep the ``created_at``/``updated_at`` set on the instances"""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class RowInserter:
+    """Batched ``executemany`` of plain tuples into ``model``'s table.
+
+    Used for the guest and budget tables, which hold nearly all the rows:
+    ``bulk_create`` prepares every value through the field API and, on
+    SQLite, splits batches at the bound-parameter limit, which made it the
+    bottleneck. Rows are built as tuples in ``attnames`` order; only
+    date/time and decimal columns go through the backend's adapters.
+    """
+
+    def __init__(self, model, attnames):
+        fields = [model._meta.get_field(attname) for attname in attnames]
+        quote = connection.ops.quote_name
+        self.sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            quote(model._meta.db_table),
+            ', '.join(quote(field.column) for field in fields),
+            ', '.join(['%s'] * len(fields)),
+        )
+        self.adapters = [
+            (index, adapter) for index, adapter in enumerate(self._adapter(field) for field in fields) if adapter
+        ]
+        self.rows = []
+
+    def _adapter(self, field):
+        ops = connection.ops
+        internal_type = field.get_internal_type()
+        if internal_type == 'DateTimeField':
+            return ops.adapt_datetimefield_value
+        if internal_type == 'DateField':
+            return ops.adapt_datefield_value
+        if internal_type == 'DecimalField':
+            return lambda value: ops.adapt_decimalfield_value(value, field.max_digits, field.decimal_places)
+        return None
+
+    def add(self, row):
+        if self.adapters:
+            row = list(row)
+            # created_at, updated_at and the like are often the same object
+            adapted = {}
+            for index, adapter in self.adapters:
+                value = row[index]
+                if value is not None:
+                    if id(value) not in adapted:
+                        adapted[id(value)] = adapter(value)
+                    row[index] = adapted[id(value)]
+        self.rows.append(row)
+
+    def flush(self, batch_size):
+        count = len(self.rows)
+        with connection.cursor() as cursor:
+            for start in range(0, count, batch_size):
+                cursor.executemany(self.sql, self.rows[start:start + batch_size])
+        self.rows = []
+        return count
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate a reproducible synthetic tenant population (users, events, guests, budget items, '
+        'vendors) with skewed sizes and spread-out timestamps, for reproducing performance problems'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--events-per-user', type=float, default=8, help='Mean; the distribution is heavy-tailed')
+        parser.add_argument('--guests-per-event', type=float, default=120, help='Mean; log-normally distributed')
+        parser.add_argument('--budget-items-per-event', type=float, default=12, help='Mean')
+        parser.add_argument('--vendors-per-user', type=float, default=10, help='Mean; heavy-tailed')
+        parser.add_argument('--days', type=int, default=730, help='How far back account creation is spread')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=20000, help='Rows per transaction and per insert batch')
+        parser.add_argument('--email-prefix', default='synthetic', help='Users are <prefix><n>@example.com')
+        parser.add_argument('--password', default='synthetic-password', help='Shared by every generated user')
+        parser.add_argument('--skip-rollups', action='store_true', help='Leave the daily analytics rollups for rebuild_daily_stats')
+
+    def handle(self, *args, **options):
+        prefix = options['email_prefix']
+        if User.objects.filter(email=f'{prefix}0@example.com').exists():
+            raise CommandError(f'Users with the "{prefix}" prefix already exist; pass another --email-prefix')
+
+        self.options = options
+        self.now = timezone.now()
+        # Hashing is deliberately slow, so every user shares one hash
+        self.password = make_password(options['password'])
+        self.next_ids = {
+            model: (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1 for model in GENERATED_MODELS
+        }
+        self.pending = {User: [], Vendor: [], Event: []}
+        self.inserters = {Guest: RowInserter(Guest, GUEST_COLUMNS), BudgetItem: RowInserter(BudgetItem, BUDGET_ITEM_COLUMNS)}
+        self.counts = dict.fromkeys(GENERATED_MODELS, 0)
+        self.choices = {
+            'event_category': _weighted(Event.CATEGORY_CHOICES, EVENT_CATEGORY_WEIGHTS),
+            'upcoming_event_status': _weighted(Event.STATUS_CHOICES, UPCOMING_EVENT_STATUS_WEIGHTS),
+            'past_event_status': _weighted(Event.STATUS_CHOICES, PAST_EVENT_STATUS_WEIGHTS),
+            'guest_category': _weighted(Guest.CATEGORY_CHOICES, GUEST_CATEGORY_WEIGHTS),
+            'upcoming_rsvp': _weighted(Guest.RSVP_CHOICES, UPCOMING_RSVP_WEIGHTS),
+            'past_rsvp': _weighted(Guest.RSVP_CHOICES, PAST_RSVP_WEIGHTS),
+            'budget_category': _weighted(BudgetItem.CATEGORY_CHOICES, BUDGET_CATEGORY_WEIGHTS),
+            'upcoming_budget_status': _weighted(BudgetItem.STATUS_CHOICES, UPCOMING_BUDGET_STATUS_WEIGHTS),
+            'past_budget_status': _weighted(BudgetItem.STATUS_CHOICES, PAST_BUDGET_STATUS_WEIGHTS),
+            'vendor_category': _weighted(Vendor.CATEGORY_CHOICES, VENDOR_CATEGORY_WEIGHTS),
+            'price_range': _weighted(Vendor.PRICE_RANGE_CHOICES, PRICE_RANGE_WEIGHTS),
+            'business_type': _weighted(User.BUSINESS_TYPE_CHOICES, BUSINESS_TYPE_WEIGHTS),
+            'plus_ones': _cumulative(*PLUS_ONES),
+            'subscription_plan': _cumulative(*SUBSCRIPTION_PLANS),
+        }
+
+        started = time.perf_counter()
+        first_ids = dict(self.next_ids)
+        with explicit_timestamps(User, Vendor, Event):
+            for index in range(options['users']):
+                # One generator per user, so the first N users are the same whatever --users is
+                self._user(random.Random(f'{options["seed"]}:{index}'), index)
+                if sum(len(inserter.rows) for inserter in self.inserters.values()) >= options['batch_size']:
+                    self._flush()
+            self._flush()
+        self._reset_sequences()
+        generated = time.perf_counter() - started
+
+        if not options['skip_rollups']:
+            self._rebuild_rollups(first_ids)
+
+        self.stdout.write(self.style.SUCCESS(
+            ', '.join(f'{self.counts[model]} {model._meta.verbose_name_plural}' for model in GENERATED_MODELS)
+            + f' in {generated:.1f}s ({self.counts[Guest] / max(generated, 1e-9):,.0f} guests/s)'
+        ))
+
+    def _pick(self, rng, name):
+        values, cumulative, total = self.choices[name]
+        return values[bisect(cumulative, rng.random() * total)]
+
+    def _id(self, model):
+        pk = self.next_ids[model]
+        self.next_ids[model] += 1
+        return pk
+
+    def _person(self, rng):
+        return f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}', f'01{rng.randrange(3, 10)}{rng.randrange(10 ** 7, 10 ** 8)}'
+
+    def _user(self, rng, index):
+        options = self.options
+        # Sign-ups accelerate toward the present
+        created_at = self.now - timedelta(days=options['days'] * rng.random() ** 1.5)
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        email = f'{options["email_prefix"]}{index}@example.com'
+        user = User(
+            id=self._id(User),
+            username=email,
+            email=email,
+            password=self.password,
+            first_name=first_name,
+            last_name=last_name,
+            phone=self._person(rng)[1],
+            business_name=f'{last_name} Events {index}',
+            business_type=self._pick(rng, 'business_type'),
+            city=rng.choice(CITIES),
+            subscription_plan=self._pick(rng, 'subscription_plan'),
+            date_joined=created_at,
+            created_at=created_at,
+            updated_at=created_at,
+        )
+        self.pending[User].append(user)
+
+        vendor_ids = [self._vendor(rng, user) for _ in range(_pareto_count(rng, options['vendors_per_user'], 500))]
+        pool = []
+        for _ in range(_pareto_count(rng, options['events_per_user'], 1000)):
+            self._event(rng, user, vendor_ids, pool)
+
+    def _vendor(self, rng, user):
+        created_at = _between(rng, user.created_at, self.now)
+        vendor = Vendor(
+            id=self._id(Vendor),
+            user_id=user.id,
+            name=f'{rng.choice(LAST_NAMES)} {rng.choice(("Caterers", "Studio", "Decor", "Services", "House"))}',
+            category=self._pick(rng, 'vendor_category'),
+            email='',
+            phone=self._person(rng)[1],
+            address=rng.choice(CITIES),
+            rating=Decimal(rng.randrange(250, 501)) / 100,
+            price_range=self._pick(rng, 'price_range'),
+            services='',
+            is_preferred=rng.random() < 0.2,
+            created_at=created_at,
+            updated_at=created_at,
+        )
+        self.pending[Vendor].append(vendor)
+        return vendor.id
+
+    def _event(self, rng, user, vendor_ids, pool):
+        options = self.options
+        created_at = _between(rng, user.created_at, self.now)
+        starts_at = created_at + timedelta(days=rng.randrange(14, 300), hours=rng.randrange(-6, 6))
+        starts_at = starts_at.replace(minute=0, second=0, microsecond=0)
+        past = starts_at < self.now
+        guest_count = _lognormal_count(rng, options['guests_per_event'], 1.0, 5000)
+        event = Event(
+            id=self._id(Event),
+            user_id=user.id,
+            name=f'{rng.choice(LAST_NAMES)} {rng.choice(("Wedding", "Reception", "Gala", "Meetup", "Celebration"))}',
+            category=self._pick(rng, 'event_category'),
+            date=timezone.localdate(starts_at),
+            time=timezone.localtime(starts_at).time(),
+            venue=f'{rng.choice(CITIES)} {rng.choice(VENUES)}',
+            budget=Decimal(rng.randrange(50, 5000) * 1000),
+            expected_guests=max(1, round(guest_count * rng.uniform(0.9, 1.3))),
+            status=self._pick(rng, 'past_event_status' if past else 'upcoming_event_status'),
+            # The whole guest list is written as one change
+            guest_sync_seq=1 if guest_count else 0,
+            created_at=created_at,
+            updated_at=created_at,
+        )
+        self.pending[Event].append(event)
+
+        # Most of a guest list is imported early on
+        guests_until = min(starts_at, self.now)
+        rsvp = 'past_rsvp' if past else 'upcoming_rsvp'
+        invite_rate = 0.9 if past else 0.5
+        guests = self.inserters[Guest]
+        for _ in range(guest_count):
+            if pool and rng.random() < REPEAT_GUEST_RATE:
+                name, phone, email = rng.choice(pool)
+            else:
+                name, phone = self._person(rng)
+                email = f'{name.replace(" ", ".").lower()}{rng.randrange(1000)}@example.net' if rng.random() < 0.6 else None
+                if len(pool) < MAX_GUEST_POOL:
+                    pool.append((name, phone, email))
+            guest_created = _between(rng, created_at, guests_until, skew=2.5)
+            rsvp_status = self._pick(rng, rsvp)
+            invited = rng.random() < invite_rate
+            checked_in = past and rsvp_status == 'confirmed' and rng.random() < 0.85
+            guests.add((
+                self._id(Guest),
+                event.id,
+                name,
+                email,
+                phone,
+                self._pick(rng, 'guest_category'),
+                rsvp_status,
+                self._pick(rng, 'plus_ones'),
+                rng.choice(DIETARY) if rng.random() < 0.08 else '',
+                '',
+                invited,
+                guest_created if invited else None,
+                checked_in,
+                starts_at + timedelta(minutes=rng.randrange(-30, 120)) if checked_in else None,
+                event.guest_sync_seq,
+                guest_created,
+                guest_created,
+            ))
+
+        status = 'past_budget_status' if past else 'upcoming_budget_status'
+        budget_items = self.inserters[BudgetItem]
+        for _ in range(_lognormal_count(rng, options['budget_items_per_event'], 0.5, 200)):
+            item_created = _between(rng, created_at, guests_until, skew=1.5)
+            estimated = Decimal(rng.randrange(5, 2000) * 100)
+            item_status = self._pick(rng, status)
+            actual = {
+                'paid': estimated * rng.randrange(85, 120) / 100,
+                'partial': estimated * rng.randrange(10, 80) / 100,
+            }.get(item_status, Decimal('0'))
+            budget_items.add((
+                self._id(BudgetItem),
+                event.id,
+                self._pick(rng, 'budget_category'),
+                f'Item {rng.randrange(1, 100)}',
+                estimated,
+                actual,
+                rng.choice(vendor_ids) if vendor_ids and rng.random() < 0.5 else None,
+                item_status,
+                event.date - timedelta(days=rng.randrange(0, 30)),
+                '',
+                item_created,
+                item_created,
+            ))
+
+    def _flush(self):
+        batch_size = self.options['batch_size']
+        with transaction.atomic():
+            # Parents first; ids are assigned up front so no rows are read back
+            for model, rows in self.pending.items():
+                model.objects.bulk_create(rows, batch_size=batch_size)
+                self.counts[model] += len(rows)
+                self.pending[model] = []
+            for model, inserter in self.inserters.items():
+                self.counts[model] += inserter.flush(batch_size)
+        if self.options['verbosity'] >= 2:
+            self.stdout.write(f'{self.counts[User]} users, {self.counts[Event]} events, {self.counts[Guest]} guests')
+
+    def _reset_sequences(self):
+        # Explicit ids don't advance sequences on backends that have them
+        statements = connection.ops.sequence_reset_sql(no_style(), GENERATED_MODELS)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    def _rebuild_rollups(self, first_ids):
+        started = time.perf_counter()
+        for model, rebuild in ((Event, rebuild_event_stats), (User, rebuild_user_stats)):
+            ids = range(first_ids[model], self.next_ids[model])
+            for start in range(0, len(ids), ROLLUP_CHUNK_SIZE):
+                rebuild(ids[start:start + ROLLUP_CHUNK_SIZE])
+        self.stdout.write(f'Rebuilt daily analytics rollups in {time.perf_counter() - started:.1f}s')
@@ -0,0 +1,17 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.series import MATERIALIZE_DAYS, materialize_due
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming occurrences of recurring event series within the rolling window'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=MATERIALIZE_DAYS, help='How far ahead of today to materialize')
+
+    def handle(self, *args, **options):
+        created = materialize_due(until=timezone.localdate() + timedelta(days=options['days']))
+        self.stdout.write(self.style.SUCCESS(f'Created {created} occurrences'))
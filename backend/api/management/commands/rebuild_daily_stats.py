@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from api.timeseries import rebuild_event_stats, rebuild_user_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-day analytics rollups (EventDailyStats, UserDailyStats) from source tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--event', type=int, action='append', dest='events', help='Only rebuild this event (repeatable)')
+
+    def handle(self, *args, **options):
+        rebuild_event_stats(options['events'])
+        if not options['events']:
+            rebuild_user_stats()
+        self.stdout.write(self.style.SUCCESS('Daily analytics rollups rebuilt'))
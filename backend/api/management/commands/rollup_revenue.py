@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from api.revenue import rollup_revenue, rebuild_revenue
+
+
+class Command(BaseCommand):
+    help = 'Extend the daily revenue and MRR rollups (run nightly), or rebuild them from scratch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Regenerate all rollup rows')
+        parser.add_argument('--since', help='Recompute from this date (YYYY-MM-DD) instead of the last rolled-up day')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            payments, recurring = rebuild_revenue()
+        else:
+            since = None
+            if options['since']:
+                since = parse_date(options['since'])
+                if since is None:
+                    raise CommandError('--since must be a date in YYYY-MM-DD format')
+            payments, recurring = rollup_revenue(start=since)
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {payments} revenue and {recurring} recurring revenue rollup rows'
+        ))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from api.deletion import run_deletion_job
+from api.models import DeletionJob
+
+
+class Command(BaseCommand):
+    help = 'Run background deletion jobs left pending or interrupted by a restart, reporting progress'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retry-failed', action='store_true', help='Also rerun jobs that failed')
+
+    def handle(self, *args, **options):
+        statuses = ['pending', 'running', *(['failed'] if options['retry_failed'] else [])]
+        for job in DeletionJob.objects.filter(status__in=statuses).order_by('id'):
+            self.stdout.write(f'{job}')
+
+            def progress(deleted, total):
+                self.stdout.write(f'  {deleted}/{total} rows', ending='\r')
+                self.stdout.flush()
+
+            run_deletion_job(job.id, progress=progress)
+            job.refresh_from_db()
+            style = self.style.SUCCESS if job.status == 'completed' else self.style.ERROR
+            self.stdout.write(style(f'  {job.status}: {job.deleted_rows} rows deleted{f" ({job.error})" if job.error else ""}'))
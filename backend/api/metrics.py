@@ -0,0 +1,285 @@
+import atexit
+import contextvars
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from rest_framework import permissions, serializers
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .fast_serializers import ValuesListSerializer
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Snapshots of workers that stopped writing this long ago are dropped
+STALE_SNAPSHOT_SECONDS = 3600
+
+# Per-series values, in this order
+COUNT, DURATION, DB_QUERIES, DB_SECONDS, SERIALIZER_SECONDS, RESPONSE_BYTES = range(6)
+FIRST_BUCKET = 6
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestSample:
+    """What one request spent, filled in by the DB wrapper and serializer timers."""
+
+    __slots__ = ('db_queries', 'db_seconds', 'serializer_seconds', 'serializer_depth')
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.serializer_depth = 0
+
+
+class Registry:
+    """Per-process request counters, keyed by ``(route, method, status class)``.
+
+    Updates take one lock and touch one flat list, so recording costs a few
+    microseconds. With ``METRICS_DIR`` set, each worker periodically writes
+    its totals to ``<pid>.json`` there, and ``collect`` sums every worker's
+    file, so a scrape sees the whole host whichever worker answers it.
+    """
+
+    def __init__(self, directory=None, flush_seconds=5):
+        self.directory = directory
+        self.flush_seconds = flush_seconds
+        self.lock = threading.Lock()
+        self.series = {}
+        self.last_flush = time.monotonic()
+
+    def record(self, key, seconds, sample, response_bytes):
+        with self.lock:
+            values = self.series.get(key)
+            if values is None:
+                values = self.series[key] = [0] * (FIRST_BUCKET + len(LATENCY_BUCKETS))
+            values[COUNT] += 1
+            values[DURATION] += seconds
+            values[DB_QUERIES] += sample.db_queries
+            values[DB_SECONDS] += sample.db_seconds
+            values[SERIALIZER_SECONDS] += sample.serializer_seconds
+            values[RESPONSE_BYTES] += response_bytes
+            bucket = bisect_left(LATENCY_BUCKETS, seconds)
+            if bucket < len(LATENCY_BUCKETS):
+                values[FIRST_BUCKET + bucket] += 1
+            due = self.directory and time.monotonic() - self.last_flush >= self.flush_seconds
+        if due:
+            self.flush()
+
+    def snapshot(self):
+        with self.lock:
+            return [[*key, *values] for key, values in self.series.items()]
+
+    def flush(self):
+        """Write this worker's totals to its file, atomically."""
+        if not self.directory:
+            return
+        self.last_flush = time.monotonic()
+        os.makedirs(self.directory, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(descriptor, 'w') as snapshot_file:
+            json.dump(self.snapshot(), snapshot_file)
+        os.replace(temporary, os.path.join(self.directory, f'{os.getpid()}.json'))
+
+    def collect(self):
+        """Totals across this process and every live worker's snapshot; returns ``(series, workers)``"""
+        snapshots = [self.snapshot()]
+        if self.directory and os.path.isdir(self.directory):
+            own = f'{os.getpid()}.json'
+            for name in os.listdir(self.directory):
+                if not name.endswith('.json') or name == own:
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    if time.time() - os.path.getmtime(path) > STALE_SNAPSHOT_SECONDS:
+                        os.remove(path)
+                        continue
+                    with open(path) as snapshot_file:
+                        snapshots.append(json.load(snapshot_file))
+                except (OSError, ValueError):
+                    # Removed or being replaced by its worker; it is counted next scrape
+                    continue
+
+        totals = {}
+        for snapshot in snapshots:
+            for row in snapshot:
+                key, values = tuple(row[:3]), row[3:]
+                if key in totals:
+                    totals[key] = [a + b for a, b in zip(totals[key], values)]
+                else:
+                    totals[key] = list(values)
+        return totals, len(snapshots)
+
+
+registry = Registry()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render(totals, workers):
+    """Prometheus text exposition format (0.0.4) of the collected totals"""
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        lines.extend(samples)
+
+    def labels(route, method, status=None, **extra):
+        pairs = {'route': route, 'method': method, **({'status': status} if status else {}), **extra}
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs.items()) + '}'
+
+    keys = sorted(totals)
+    family('eventflow_http_requests_total', 'counter', 'Requests handled, by route, method and status class.', [
+        f'eventflow_http_requests_total{labels(*key)} {totals[key][COUNT]}' for key in keys
+    ])
+
+    histogram = []
+    for key in keys:
+        values = totals[key]
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, values[FIRST_BUCKET:]):
+            cumulative += count
+            histogram.append(f'eventflow_http_request_duration_seconds_bucket{labels(*key, le=bound)} {cumulative}')
+        histogram.append(f'eventflow_http_request_duration_seconds_bucket{labels(*key, le="+Inf")} {values[COUNT]}')
+        histogram.append(f'eventflow_http_request_duration_seconds_sum{labels(*key)} {values[DURATION]:.6f}')
+        histogram.append(f'eventflow_http_request_duration_seconds_count{labels(*key)} {values[COUNT]}')
+    family('eventflow_http_request_duration_seconds', 'histogram', 'Time from the first middleware to the response.', histogram)
+
+    for name, index, help_text, float_value in (
+        ('eventflow_db_queries_total', DB_QUERIES, 'SQL statements executed while handling requests.', False),
+        ('eventflow_db_query_duration_seconds_total', DB_SECONDS, 'Time spent executing SQL while handling requests.', True),
+        ('eventflow_serializer_duration_seconds_total', SERIALIZER_SECONDS, 'Time spent building response data in serializers.', True),
+        ('eventflow_http_response_bytes_total', RESPONSE_BYTES, 'Response body bytes, excluding streamed responses.', False),
+    ):
+        family(name, 'counter', help_text, [
+            f'{name}{labels(*key)} {totals[key][index]:.6f}' if float_value else f'{name}{labels(*key)} {totals[key][index]}'
+            for key in keys
+        ])
+
+    family('eventflow_metrics_workers', 'gauge', 'Worker processes included in these totals.', [f'eventflow_metrics_workers {workers}'])
+    return '\n'.join(lines) + '\n'
+
+
+def _record_query(execute, sql, params, many, context):
+    sample = _current.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        sample.db_queries += 1
+        sample.db_seconds += time.perf_counter() - started
+
+
+def _instrument_connection(sender, connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def timed_serialization(func):
+    """Count the time in ``func`` as serializer time of the current request; nested calls count once"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        sample = _current.get()
+        if sample is None:
+            return func(*args, **kwargs)
+        sample.serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            sample.serializer_depth -= 1
+            if not sample.serializer_depth:
+                sample.serializer_seconds += time.perf_counter() - started
+    return wrapper
+
+
+def install():
+    """Set up the registry and instrumentation from settings; called from ``ApiConfig.ready``"""
+    if not getattr(settings, 'METRICS_ENABLED', False):
+        return
+    registry.directory = getattr(settings, 'METRICS_DIR', None) or None
+    registry.flush_seconds = getattr(settings, 'METRICS_FLUSH_SECONDS', 5)
+    connection_created.connect(_instrument_connection, dispatch_uid='api.metrics')
+    for serializer_class in (serializers.Serializer, serializers.ListSerializer):
+        serializer_class.data = property(timed_serialization(serializer_class.data.fget))
+    ValuesListSerializer.render = timed_serialization(ValuesListSerializer.render)
+    if registry.directory:
+        atexit.register(registry.flush)
+
+
+def _route(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else 'unmatched'
+
+
+class MetricsMiddleware:
+    """Record each request's latency, SQL and serializer time and response size by route.
+
+    Goes first in ``MIDDLEWARE`` so the latency covers the whole stack.
+    Works for both WSGI and ASGI; the per-request sample travels in a
+    context variable, which reaches the threads async views run ORM calls on.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        sample = RequestSample()
+        token = _current.set(sample)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._record(request, response, time.perf_counter() - started, sample)
+        return response
+
+    async def __acall__(self, request):
+        sample = RequestSample()
+        token = _current.set(sample)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._record(request, response, time.perf_counter() - started, sample)
+        return response
+
+    def _record(self, request, response, seconds, sample):
+        size = 0 if response.streaming else len(response.content)
+        key = (_route(request), request.method, f'{response.status_code // 100}xx')
+        registry.record(key, seconds, sample, size)
+
+
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication, SessionAuthentication])
+@permission_classes([permissions.IsAdminUser])
+def metrics_view(request):
+    """Request metrics of every worker on this host, in Prometheus text format"""
+    totals, workers = registry.collect()
+    return HttpResponse(render(totals, workers), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_remove_paymenthistory_stripe_payment_intent_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='budgetitem',
+            index=models.Index(fields=['item_name'], name='api_budget_item_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='budgetitem',
+            index=models.Index(fields=['created_at'], name='api_budget_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['name'], name='api_event_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['created_at'], name='api_event_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='guest',
+            index=models.Index(fields=['name'], name='api_guest_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='guest',
+            index=models.Index(fields=['email'], name='api_guest_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='guest',
+            index=models.Index(fields=['created_at'], name='api_guest_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vendor',
+            index=models.Index(fields=['name'], name='api_vendor_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vendor',
+            index=models.Index(fields=['created_at'], name='api_vendor_created_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='paymentrequest',
+            index=models.Index(fields=['status', 'created_at'], name='api_payreq_status_created_idx'),
+        ),
+    ]
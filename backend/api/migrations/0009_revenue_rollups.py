@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_paymentrequest_status_created_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRecurringRevenue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('plan', models.CharField(max_length=50)),
+                ('billing_cycle', models.CharField(max_length=10)),
+                ('active_subscriptions', models.PositiveIntegerField(default=0)),
+                ('mrr', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyRevenue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('plan', models.CharField(max_length=50)),
+                ('billing_cycle', models.CharField(max_length=10)),
+                ('payment_method', models.CharField(max_length=50)),
+                ('currency', models.CharField(max_length=3)),
+                ('payments', models.PositiveIntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailyrevenue',
+            constraint=models.UniqueConstraint(fields=('date', 'plan', 'billing_cycle', 'payment_method', 'currency'), name='api_dailyrevenue_unique_bucket'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyrecurringrevenue',
+            constraint=models.UniqueConstraint(fields=('date', 'plan', 'billing_cycle'), name='api_dailymrr_unique_bucket'),
+        ),
+    ]
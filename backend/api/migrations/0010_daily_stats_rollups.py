@@ -0,0 +1,81 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:54
+
+from django.conf import settings
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+import django.db.models.deletion
+
+
+def backfill_daily_stats(apps, schema_editor):
+    BudgetItem = apps.get_model('api', 'BudgetItem')
+    Guest = apps.get_model('api', 'Guest')
+    Event = apps.get_model('api', 'Event')
+    EventDailyStats = apps.get_model('api', 'EventDailyStats')
+    UserDailyStats = apps.get_model('api', 'UserDailyStats')
+
+    buckets = defaultdict(dict)
+    for row in (BudgetItem.objects.annotate(day=TruncDate('created_at')).values('event_id', 'day')
+                .annotate(count=Count('id'), amount=Sum('actual_cost')).order_by()):
+        buckets[row['event_id'], row['day']].update(budget_items=row['count'], budget_amount=row['amount'])
+    for row in (Guest.objects.annotate(day=TruncDate('created_at')).values('event_id', 'day')
+                .annotate(count=Count('id'), attendees=Sum(F('plus_ones') + 1)).order_by()):
+        buckets[row['event_id'], row['day']].update(guests=row['count'], attendees=row['attendees'])
+    EventDailyStats.objects.bulk_create(
+        [EventDailyStats(event_id=event_id, date=day, **values) for (event_id, day), values in buckets.items()],
+        batch_size=1000,
+    )
+
+    rows = Event.objects.annotate(day=TruncDate('created_at')).values('user_id', 'day').annotate(count=Count('id')).order_by()
+    UserDailyStats.objects.bulk_create(
+        [UserDailyStats(user_id=row['user_id'], date=row['day'], events_created=row['count']) for row in rows],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_revenue_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('events_created', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EventDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('budget_items', models.IntegerField(default=0)),
+                ('budget_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('guests', models.IntegerField(default=0)),
+                ('attendees', models.IntegerField(default=0)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='api.event')),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='userdailystats',
+            constraint=models.UniqueConstraint(fields=('user', 'date'), name='api_userdailystats_unique_day'),
+        ),
+        migrations.AddConstraint(
+            model_name='eventdailystats',
+            constraint=models.UniqueConstraint(fields=('event', 'date'), name='api_eventdailystats_unique_day'),
+        ),
+        migrations.RunPython(backfill_daily_stats, migrations.RunPython.noop),
+    ]
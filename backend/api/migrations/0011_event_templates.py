@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:04
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_daily_stats_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('category', models.CharField(choices=[('wedding', 'Wedding'), ('corporate', 'Corporate Event'), ('community', 'Community Event'), ('social', 'Social Event'), ('birthday', 'Birthday Party'), ('anniversary', 'Anniversary'), ('conference', 'Conference'), ('seminar', 'Seminar'), ('other', 'Other')], max_length=50)),
+                ('description', models.TextField(blank=True)),
+                ('venue', models.CharField(blank=True, max_length=200)),
+                ('address', models.TextField(blank=True)),
+                ('budget', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('expected_guests', models.PositiveIntegerField(default=0)),
+                ('special_requirements', models.TextField(blank=True)),
+                ('budget_items', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_templates', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+    ]
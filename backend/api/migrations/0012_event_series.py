@@ -0,0 +1,62 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_event_templates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('category', models.CharField(choices=[('wedding', 'Wedding'), ('corporate', 'Corporate Event'), ('community', 'Community Event'), ('social', 'Social Event'), ('birthday', 'Birthday Party'), ('anniversary', 'Anniversary'), ('conference', 'Conference'), ('seminar', 'Seminar'), ('other', 'Other')], max_length=50)),
+                ('description', models.TextField(blank=True)),
+                ('time', models.TimeField()),
+                ('venue', models.CharField(max_length=200)),
+                ('address', models.TextField(blank=True)),
+                ('budget', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('expected_guests', models.PositiveIntegerField(default=0)),
+                ('frequency', models.CharField(choices=[('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly')], max_length=10)),
+                ('interval', models.PositiveIntegerField(default=1)),
+                ('weekdays', models.JSONField(blank=True, default=list)),
+                ('start_date', models.DateField()),
+                ('until', models.DateField(blank=True, null=True)),
+                ('count', models.PositiveIntegerField(blank=True, null=True)),
+                ('materialized_until', models.DateField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'event series',
+                'ordering': ['start_date'],
+            },
+        ),
+        migrations.AddField(
+            model_name='eventseries',
+            name='template',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='series', to='api.eventtemplate'),
+        ),
+        migrations.AddField(
+            model_name='eventseries',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_series', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='series',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occurrences', to='api.eventseries'),
+        ),
+        migrations.AddConstraint(
+            model_name='event',
+            constraint=models.UniqueConstraint(fields=('series', 'date'), name='api_event_unique_series_date'),
+        ),
+    ]
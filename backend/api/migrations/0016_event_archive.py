@@ -0,0 +1,99 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:36
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_request_profile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedEvent',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=200)),
+                ('category', models.CharField(choices=[('wedding', 'Wedding'), ('corporate', 'Corporate Event'), ('community', 'Community Event'), ('social', 'Social Event'), ('birthday', 'Birthday Party'), ('anniversary', 'Anniversary'), ('conference', 'Conference'), ('seminar', 'Seminar'), ('other', 'Other')], max_length=50)),
+                ('description', models.TextField(blank=True)),
+                ('date', models.DateField()),
+                ('time', models.TimeField()),
+                ('venue', models.CharField(max_length=200)),
+                ('address', models.TextField(blank=True)),
+                ('budget', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('expected_guests', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('planning', 'Planning'), ('confirmed', 'Confirmed'), ('active', 'Active'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('special_requirements', models.TextField(blank=True)),
+                ('contact_person', models.CharField(blank=True, max_length=100)),
+                ('contact_phone', models.CharField(blank=True, max_length=20)),
+                ('contact_email', models.EmailField(blank=True, max_length=254)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('budget_item_count', models.IntegerField(default=0)),
+                ('estimated_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('actual_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('guest_count', models.IntegerField(default=0)),
+                ('attendee_count', models.IntegerField(default=0)),
+                ('confirmed_count', models.IntegerField(default=0)),
+                ('checked_in_count', models.IntegerField(default=0)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('series', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.eventseries')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedGuest',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=200)),
+                ('email', models.EmailField(blank=True, max_length=254, null=True)),
+                ('phone', models.CharField(blank=True, max_length=20)),
+                ('category', models.CharField(choices=[('family', 'Family'), ('friends', 'Friends'), ('colleagues', 'Colleagues'), ('vip', 'VIP'), ('vendors', 'Vendors'), ('other', 'Other')], max_length=50)),
+                ('rsvp_status', models.CharField(choices=[('pending', 'Pending'), ('confirmed', 'Confirmed'), ('declined', 'Declined'), ('maybe', 'Maybe')], max_length=20)),
+                ('plus_ones', models.PositiveIntegerField(default=0)),
+                ('dietary_restrictions', models.TextField(blank=True)),
+                ('notes', models.TextField(blank=True)),
+                ('invitation_sent', models.BooleanField(default=False)),
+                ('invitation_sent_date', models.DateTimeField(blank=True, null=True)),
+                ('checked_in', models.BooleanField(default=False)),
+                ('check_in_time', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('contact', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.contact')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='guests', to='api.archivedevent')),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedBudgetItem',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('category', models.CharField(choices=[('venue', 'Venue'), ('catering', 'Catering'), ('decoration', 'Decoration'), ('photography', 'Photography'), ('entertainment', 'Entertainment'), ('transportation', 'Transportation'), ('flowers', 'Flowers'), ('invitations', 'Invitations'), ('gifts', 'Gifts'), ('miscellaneous', 'Miscellaneous')], max_length=50)),
+                ('item_name', models.CharField(max_length=200)),
+                ('estimated_cost', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('actual_cost', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('paid', 'Paid'), ('partial', 'Partially Paid'), ('overdue', 'Overdue')], max_length=20)),
+                ('due_date', models.DateField(blank=True, null=True)),
+                ('notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='budget_items', to='api.archivedevent')),
+                ('vendor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.vendor')),
+            ],
+            options={
+                'ordering': ['due_date', 'category'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedevent',
+            index=models.Index(fields=['user', 'date'], name='api_archivedevent_user_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_deletion_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GuestTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('guest_id', models.BigIntegerField()),
+                ('sync_seq', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='guest_sync_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='guest',
+            name='sync_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='guest',
+            index=models.Index(fields=['event', 'sync_seq', 'id'], name='api_guest_sync_idx'),
+        ),
+        migrations.AddField(
+            model_name='guesttombstone',
+            name='event',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='guest_tombstones', to='api.event'),
+        ),
+        migrations.AddIndex(
+            model_name='guesttombstone',
+            index=models.Index(fields=['event', 'sync_seq', 'guest_id'], name='api_guest_tombstone_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='guesttombstone',
+            index=models.Index(fields=['deleted_at'], name='api_guest_tombstone_age_idx'),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:07
+
+import api.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_guest_sync'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='budgetitem',
+            name='api_budget_item_name_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='event',
+            name='api_event_name_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='guest',
+            name='api_guest_name_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='guest',
+            name='api_guest_email_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='vendor',
+            name='api_vendor_name_idx',
+        ),
+        migrations.AddIndex(
+            model_name='archivedevent',
+            index=api.indexes.SearchIndex('name', name='api_archived_name_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='budgetitem',
+            index=api.indexes.SearchIndex('item_name', name='api_budget_item_name_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=api.indexes.SearchIndex('name', name='api_contact_name_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=api.indexes.SearchIndex('normalized_email', name='api_contact_nemail_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=api.indexes.SearchIndex('normalized_phone', name='api_contact_nphone_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactgroup',
+            index=api.indexes.SearchIndex('name', name='api_group_name_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=api.indexes.SearchIndex('name', name='api_event_name_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=api.indexes.SearchIndex('venue', name='api_event_venue_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='guest',
+            index=api.indexes.SearchIndex('name', name='api_guest_name_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='guest',
+            index=api.indexes.SearchIndex('email', name='api_guest_email_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=api.indexes.SearchIndex('email', name='api_user_email_upper_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vendor',
+            index=api.indexes.SearchIndex('name', name='api_vendor_name_upper_idx'),
+        ),
+    ]
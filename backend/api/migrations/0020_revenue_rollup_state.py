@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_admin_search_upper_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevenueRollupState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_date', models.DateField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
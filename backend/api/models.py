@@ -1,6 +1,8 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from .indexes import SearchIndex
+from .normalize import normalize_phone, normalize_email
 
 # User Model
 class User(AbstractUser):
@@ -44,6 +46,9 @@ class User(AbstractUser):
     
     class Meta:
         db_table = 'auth_user'
+        indexes = [
+            SearchIndex('email', name='api_user_email_upper_idx'),
+        ]
 
 class SubscriptionPlan(models.Model):
     name = models.CharField(max_length=50, unique=True)
@@ -123,6 +128,11 @@ class PaymentRequest(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='api_payreq_status_created_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.user.email} - ${self.amount} - {self.status}"
 
@@ -200,11 +210,22 @@ class Event(models.Model):
     contact_person = models.CharField(max_length=100, blank=True)
     contact_phone = models.CharField(max_length=20, blank=True)
     contact_email = models.EmailField(blank=True)
+    series = models.ForeignKey('EventSeries', on_delete=models.SET_NULL, null=True, blank=True, related_name='occurrences')
+    # Last change number handed to this event's guests; see Guest.sync_seq
+    guest_sync_seq = models.BigIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            SearchIndex('name', name='api_event_name_upper_idx'),
+            SearchIndex('venue', name='api_event_venue_upper_idx'),
+            models.Index(fields=['created_at'], name='api_event_created_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['series', 'date'], name='api_event_unique_series_date'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.date}"
@@ -245,6 +266,10 @@ class BudgetItem(models.Model):
     
     class Meta:
         ordering = ['due_date', 'category']
+        indexes = [
+            SearchIndex('item_name', name='api_budget_item_name_upper_idx'),
+            models.Index(fields=['created_at'], name='api_budget_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.item_name} - {self.event.name}"
@@ -280,11 +305,30 @@ class Guest(models.Model):
     invitation_sent_date = models.DateTimeField(null=True, blank=True)
     checked_in = models.BooleanField(default=False)
     check_in_time = models.DateTimeField(null=True, blank=True)
+    contact = models.ForeignKey('Contact', on_delete=models.SET_NULL, null=True, blank=True, related_name='guests')
+    # Event-wide change number of the last write, for delta sync
+    sync_seq = models.BigIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['name']
+        indexes = [
+            SearchIndex('name', name='api_guest_name_upper_idx'),
+            SearchIndex('email', name='api_guest_email_upper_idx'),
+            models.Index(fields=['created_at'], name='api_guest_created_idx'),
+            models.Index(fields=['event', 'sync_seq', 'id'], name='api_guest_sync_idx'),
+        ]
+    
+    def save(self, *args, **kwargs):
+        # Numbering and writing in one transaction holds the event row lock
+        # until commit, so change numbers become visible in order
+        with transaction.atomic():
+            self.sync_seq = next_guest_sync_seq(self.event_id)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'sync_seq'}
+            super().save(*args, **kwargs)
     
     def __str__(self):
         return f"{self.name} - {self.event.name}"
@@ -294,6 +338,12 @@ class Guest(models.Model):
         """Returns total attendees for this guest (guest + plus ones)"""
         return 1 + self.plus_ones
 
+
+def next_guest_sync_seq(event_id):
+    """Take the next change number of ``event_id``'s guest list; call inside the transaction that writes the rows"""
+    Event.objects.filter(id=event_id).update(guest_sync_seq=models.F('guest_sync_seq') + 1)
+    return Event.objects.filter(id=event_id).values_list('guest_sync_seq', flat=True).get()
+
 # Vendor Model
 class Vendor(models.Model):
     CATEGORY_CHOICES = [
@@ -334,6 +384,417 @@ class Vendor(models.Model):
     
     class Meta:
         ordering = ['name']
+        indexes = [
+            SearchIndex('name', name='api_vendor_name_upper_idx'),
+            models.Index(fields=['created_at'], name='api_vendor_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.category}"
+
+# Contact Book
+class Contact(models.Model):
+    """A person in the user's address book, reusable across events; guests may link to one."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='contacts')
+    name = models.CharField(max_length=200)
+    email = models.EmailField(null=True, blank=True)
+    phone = models.CharField(max_length=20, blank=True)
+    # Maintained in save(); bulk writers must set them (see api.normalize)
+    normalized_email = models.CharField(max_length=254, blank=True, editable=False)
+    normalized_phone = models.CharField(max_length=32, blank=True, editable=False)
+    category = models.CharField(max_length=50, choices=Guest.CATEGORY_CHOICES, default='other')
+    dietary_restrictions = models.TextField(blank=True)
+    notes = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['name']
+        indexes = [
+            models.Index(fields=['user', 'normalized_phone'], name='api_contact_phone_idx'),
+            models.Index(fields=['user', 'normalized_email'], name='api_contact_email_idx'),
+            models.Index(fields=['user', 'name'], name='api_contact_name_idx'),
+            SearchIndex('name', name='api_contact_name_upper_idx'),
+            SearchIndex('normalized_email', name='api_contact_nemail_upper_idx'),
+            SearchIndex('normalized_phone', name='api_contact_nphone_upper_idx'),
+        ]
+    
+    def save(self, *args, **kwargs):
+        self.normalized_email = normalize_email(self.email)
+        self.normalized_phone = normalize_phone(self.phone)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'email', 'phone'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'normalized_email', 'normalized_phone'}
+        super().save(*args, **kwargs)
+    
+    def __str__(self):
+        return self.name
+
+class ContactGroup(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='contact_groups')
+    name = models.CharField(max_length=100)
+    contacts = models.ManyToManyField(Contact, blank=True, related_name='groups')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'name'], name='api_contactgroup_unique_name'),
+        ]
+        indexes = [
+            SearchIndex('name', name='api_group_name_upper_idx'),
+        ]
+    
+    def __str__(self):
+        return self.name
+
+# Seating Models
+class Table(models.Model):
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='tables')
+    name = models.CharField(max_length=100)
+    capacity = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['id']
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'name'], name='api_table_unique_name'),
+        ]
+    
+    def __str__(self):
+        return f"{self.event.name} - {self.name} ({self.capacity})"
+
+class SeatAssignment(models.Model):
+    """A guest's party seated at a table; pinned assignments are kept by the optimizer."""
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='seat_assignments')
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name='assignments')
+    guest = models.OneToOneField(Guest, on_delete=models.CASCADE, related_name='seat')
+    pinned = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['table', 'guest']
+    
+    def __str__(self):
+        return f"{self.guest.name} @ {self.table.name}"
+
+class SeatingConstraint(models.Model):
+    KIND_CHOICES = [
+        ('together', 'Seat Together'),
+        ('avoid', 'Keep Apart'),
+    ]
+    
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='seating_constraints')
+    guest = models.ForeignKey(Guest, on_delete=models.CASCADE, related_name='+')
+    other_guest = models.ForeignKey(Guest, on_delete=models.CASCADE, related_name='+')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['id']
+    
+    def __str__(self):
+        return f"{self.guest_id} {self.kind} {self.other_guest_id}"
+
+# Event Templates
+class EventTemplate(models.Model):
+    """Reusable event defaults and budget lines, created from scratch or from an existing event."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='event_templates')
+    name = models.CharField(max_length=200)
+    category = models.CharField(max_length=50, choices=Event.CATEGORY_CHOICES)
+    description = models.TextField(blank=True)
+    venue = models.CharField(max_length=200, blank=True)
+    address = models.TextField(blank=True)
+    budget = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    expected_guests = models.PositiveIntegerField(default=0)
+    special_requirements = models.TextField(blank=True)
+    # [{"category", "item_name", "estimated_cost", "notes"}, ...]
+    budget_items = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return f"{self.name} ({self.category})"
+
+# Recurring Event Series
+class EventSeries(models.Model):
+    """Recurrence rule for events that repeat; occurrences are materialized as ``Event`` rows a window ahead (see api.series)."""
+    FREQUENCY_CHOICES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+    ]
+    
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='event_series')
+    template = models.ForeignKey(EventTemplate, on_delete=models.SET_NULL, null=True, blank=True, related_name='series')
+    name = models.CharField(max_length=200)
+    category = models.CharField(max_length=50, choices=Event.CATEGORY_CHOICES)
+    description = models.TextField(blank=True)
+    time = models.TimeField()
+    venue = models.CharField(max_length=200)
+    address = models.TextField(blank=True)
+    budget = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    expected_guests = models.PositiveIntegerField(default=0)
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES)
+    interval = models.PositiveIntegerField(default=1)
+    # Weekly series only: weekday numbers, Monday is 0; defaults to the start date's weekday
+    weekdays = models.JSONField(default=list, blank=True)
+    start_date = models.DateField()
+    until = models.DateField(null=True, blank=True)
+    count = models.PositiveIntegerField(null=True, blank=True)
+    materialized_until = models.DateField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['start_date']
+        verbose_name_plural = 'event series'
+    
+    def __str__(self):
+        return f"{self.name} ({self.frequency})"
+
+# Revenue Rollups
+class DailyRevenue(models.Model):
+    """Completed payments per day, rolled up by the ``rollup_revenue`` command."""
+    date = models.DateField()
+    plan = models.CharField(max_length=50)
+    billing_cycle = models.CharField(max_length=10)
+    payment_method = models.CharField(max_length=50)
+    currency = models.CharField(max_length=3)
+    payments = models.PositiveIntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'plan', 'billing_cycle', 'payment_method', 'currency'],
+                name='api_dailyrevenue_unique_bucket',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} - {self.plan} - {self.amount} {self.currency}"
+
+class DailyRecurringRevenue(models.Model):
+    """Active subscriptions and their monthly recurring revenue at the end of each day."""
+    date = models.DateField()
+    plan = models.CharField(max_length=50)
+    billing_cycle = models.CharField(max_length=10)
+    active_subscriptions = models.PositiveIntegerField(default=0)
+    mrr = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'plan', 'billing_cycle'],
+                name='api_dailymrr_unique_bucket',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} - {self.plan} - MRR {self.mrr}"
+
+class RevenueRollupState(models.Model):
+    """The last day covered by the revenue rollups; a single row, kept by ``api.revenue``."""
+    last_date = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Revenue rolled up to {self.last_date}"
+
+# Analytics Rollups
+class EventDailyStats(models.Model):
+    """Budget and guest activity per event and day of creation, kept current on write (see api.signals)."""
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    budget_items = models.IntegerField(default=0)
+    budget_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    guests = models.IntegerField(default=0)
+    attendees = models.IntegerField(default=0)
+    
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'date'], name='api_eventdailystats_unique_day'),
+        ]
+    
+    def __str__(self):
+        return f"{self.event_id} - {self.date}"
+
+class UserDailyStats(models.Model):
+    """Events created per user and day that still exist, live or archived; kept current on write (see api.signals)."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    events_created = models.IntegerField(default=0)
+    
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='api_userdailystats_unique_day'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.date}"
+
+# Archive
+class ArchivedEvent(models.Model):
+    """A finished event moved out of ``Event`` with the totals analytics need (see api.archival); ids are kept."""
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_events')
+    name = models.CharField(max_length=200)
+    category = models.CharField(max_length=50, choices=Event.CATEGORY_CHOICES)
+    description = models.TextField(blank=True)
+    date = models.DateField()
+    time = models.TimeField()
+    venue = models.CharField(max_length=200)
+    address = models.TextField(blank=True)
+    budget = models.DecimalField(max_digits=12, decimal_places=2)
+    expected_guests = models.PositiveIntegerField()
+    status = models.CharField(max_length=20, choices=Event.STATUS_CHOICES)
+    special_requirements = models.TextField(blank=True)
+    contact_person = models.CharField(max_length=100, blank=True)
+    contact_phone = models.CharField(max_length=20, blank=True)
+    contact_email = models.EmailField(blank=True)
+    series = models.ForeignKey('EventSeries', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    # Computed when archived
+    budget_item_count = models.IntegerField(default=0)
+    estimated_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    actual_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    guest_count = models.IntegerField(default=0)
+    attendee_count = models.IntegerField(default=0)
+    confirmed_count = models.IntegerField(default=0)
+    checked_in_count = models.IntegerField(default=0)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-date']
+        indexes = [
+            models.Index(fields=['user', 'date'], name='api_archivedevent_user_idx'),
+            SearchIndex('name', name='api_archived_name_upper_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} - {self.date} (archived)"
+
+class ArchivedBudgetItem(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    event = models.ForeignKey(ArchivedEvent, on_delete=models.CASCADE, related_name='budget_items')
+    category = models.CharField(max_length=50, choices=BudgetItem.CATEGORY_CHOICES)
+    item_name = models.CharField(max_length=200)
+    estimated_cost = models.DecimalField(max_digits=10, decimal_places=2)
+    actual_cost = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    vendor = models.ForeignKey(Vendor, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    status = models.CharField(max_length=20, choices=BudgetItem.STATUS_CHOICES)
+    due_date = models.DateField(null=True, blank=True)
+    notes = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['due_date', 'category']
+    
+    def __str__(self):
+        return f"{self.item_name} (archived)"
+
+class ArchivedGuest(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    event = models.ForeignKey(ArchivedEvent, on_delete=models.CASCADE, related_name='guests')
+    name = models.CharField(max_length=200)
+    email = models.EmailField(null=True, blank=True)
+    phone = models.CharField(max_length=20, blank=True)
+    category = models.CharField(max_length=50, choices=Guest.CATEGORY_CHOICES)
+    rsvp_status = models.CharField(max_length=20, choices=Guest.RSVP_CHOICES)
+    plus_ones = models.PositiveIntegerField(default=0)
+    dietary_restrictions = models.TextField(blank=True)
+    notes = models.TextField(blank=True)
+    invitation_sent = models.BooleanField(default=False)
+    invitation_sent_date = models.DateTimeField(null=True, blank=True)
+    checked_in = models.BooleanField(default=False)
+    check_in_time = models.DateTimeField(null=True, blank=True)
+    contact = models.ForeignKey(Contact, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return f"{self.name} (archived)"
+
+# Diagnostics
+class RequestProfile(models.Model):
+    """One profiled request: SQL, EXPLAIN plans, N+1 suspects and cProfile stats (see api.profiling)."""
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='request_profiles')
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    query_count = models.IntegerField(default=0)
+    query_ms = models.FloatField(default=0)
+    report = models.JSONField(default=dict)
+    stats = models.BinaryField(help_text='marshalled pstats data, as written by cProfile.Profile.dump_stats')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
+
+class DeletionJob(models.Model):
+    """A large object being deleted in the background with set-based batches (see api.deletion)."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='deletion_jobs')
+    model = models.CharField(max_length=100, help_text='app_label.ModelName of the deleted object')
+    object_id = models.BigIntegerField()
+    object_repr = models.CharField(max_length=200)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    total_rows = models.IntegerField(null=True, blank=True)
+    deleted_rows = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status'], name='api_deletionjob_status_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Delete {self.object_repr} ({self.status})"
+
+
+# Offline Sync
+class GuestTombstone(models.Model):
+    """A guest that left an event's list, kept so delta syncs can remove it"""
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='guest_tombstones')
+    guest_id = models.BigIntegerField()
+    sync_seq = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['event', 'sync_seq', 'guest_id'], name='api_guest_tombstone_sync_idx'),
+            models.Index(fields=['deleted_at'], name='api_guest_tombstone_age_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Guest {self.guest_id} removed from event {self.event_id}"
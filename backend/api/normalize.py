@@ -0,0 +1,20 @@
+import re
+
+_NON_WORD = re.compile(r'[^\w\s]+')
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_phone(phone, country_code='880'):
+    """Digits only with the country code, assuming Bangladesh when it is missing; ``''`` without digits"""
+    digits = ''.join(filter(str.isdigit, phone or ''))
+    if digits and not digits.startswith(country_code):
+        digits = country_code + digits.lstrip('0')
+    return digits
+
+
+def normalize_email(email):
+    return (email or '').strip().lower()
+
+
+def normalize_name(name):
+    return _SPACES.sub(' ', _NON_WORD.sub(' ', (name or '').casefold())).strip()
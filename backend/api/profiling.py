@@ -0,0 +1,357 @@
+import contextvars
+import cProfile
+import logging
+import marshal
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from rest_framework import generics, permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from . import metrics
+from .authentication import aauthenticate, authenticate
+from .models import RequestProfile
+from .serializers import RequestProfileSerializer
+
+logger = logging.getLogger('api.slow_queries')
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+TOKEN_SALT = 'api.profiling'
+# Same statement from the same line of our code this many times in one request
+N_PLUS_ONE_THRESHOLD = 5
+MAX_CAPTURED_QUERIES = 5000
+MAX_EXPLAINED_QUERIES = 25
+TOP_FUNCTIONS = 40
+STACK_DEPTH = 8
+
+_IN_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+_SOURCE_ROOT = os.path.join(str(settings.BASE_DIR), '')
+# The execute wrappers themselves are never the call site
+_INSTRUMENTATION_FILES = {os.path.abspath(__file__), os.path.abspath(metrics.__file__)}
+
+_current = contextvars.ContextVar('request_profile', default=None)
+# cProfile hooks the running thread (the whole interpreter from Python
+# 3.12), so one request is profiled at a time and the others run as usual
+_profiling = threading.Lock()
+_slow_query_seconds = None
+_slow_stack_interval = 60
+_slow_stack_logged = {}
+
+
+def _app_stack():
+    """``file:line in function`` for the innermost project frames, outermost first, skipping libraries.
+
+    Walks frame objects directly rather than ``traceback.extract_stack``,
+    which also reads source lines and is several times slower.
+    """
+    frames = []
+    frame = sys._getframe(2)
+    while frame is not None and len(frames) < STACK_DEPTH:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_SOURCE_ROOT) and filename not in _INSTRUMENTATION_FILES and 'site-packages' not in filename:
+            frames.append(f'{os.path.relpath(filename, _SOURCE_ROOT)}:{frame.f_lineno} in {frame.f_code.co_name}')
+        frame = frame.f_back
+    return frames[::-1]
+
+
+def _template(sql):
+    return _IN_LIST.sub('(...)', sql)
+
+
+class QueryCapture:
+    """The SQL one profiled request ran, with timings and call sites."""
+
+    def __init__(self):
+        self.queries = []
+        self.total = 0
+        self.seconds = 0.0
+
+    def add(self, sql, params, many, seconds, alias):
+        self.total += 1
+        self.seconds += seconds
+        if len(self.queries) < MAX_CAPTURED_QUERIES:
+            self.queries.append((sql, None if many else params, many, alias, seconds * 1000, _app_stack()))
+
+    def report(self):
+        return [
+            {
+                'sql': sql,
+                'params': None if params is None else [repr(param) for param in params],
+                'many': many,
+                'ms': round(ms, 3),
+                'stack': stack,
+            }
+            for sql, params, many, alias, ms, stack in self.queries
+        ]
+
+    def n_plus_one(self):
+        """Statements repeated from one call site, the signature of a lazy relation in a loop"""
+        groups = defaultdict(list)
+        for sql, params, many, alias, ms, stack in self.queries:
+            groups[(_template(sql), tuple(stack))].append(ms)
+        suspects = [
+            {'sql': template, 'count': len(timings), 'total_ms': round(sum(timings), 3), 'stack': list(stack)}
+            for (template, stack), timings in groups.items()
+            if len(timings) >= N_PLUS_ONE_THRESHOLD
+        ]
+        return sorted(suspects, key=lambda suspect: suspect['count'], reverse=True)
+
+    def explain(self):
+        """Query plans of the slowest distinct SELECTs, run after the response so they are not timed"""
+        slowest = {}
+        for sql, params, many, alias, ms, stack in self.queries:
+            if many or not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            if sql not in slowest or ms > slowest[sql][2]:
+                slowest[sql] = (params, alias, ms)
+
+        plans = []
+        for sql, (params, alias, ms) in sorted(slowest.items(), key=lambda item: item[1][2], reverse=True)[:MAX_EXPLAINED_QUERIES]:
+            connection = connections[alias]
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+                    rows = cursor.fetchall()
+            except Exception as exc:
+                plan = f'EXPLAIN failed: {exc}'
+            else:
+                plan = '\n'.join(row if isinstance(row, str) else ' '.join(str(column) for column in row) for row in rows)
+            plans.append({'sql': sql, 'ms': round(ms, 3), 'plan': plan})
+        return plans
+
+
+def _log_slow_query(sql, params, seconds):
+    template = _template(sql)
+    now = time.monotonic()
+    # One stack per statement per interval keeps a hot slow query from
+    # paying for a stack walk, and flooding the log, on every call
+    if now - _slow_stack_logged.get(template, float('-inf')) >= _slow_stack_interval:
+        _slow_stack_logged[template] = now
+        logger.warning('Slow query (%.1f ms): %s\n  params: %r\n  %s', seconds * 1000, sql, params, '\n  '.join(_app_stack()))
+    else:
+        logger.warning('Slow query (%.1f ms): %s', seconds * 1000, sql)
+
+
+def _capture_query(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        seconds = time.perf_counter() - started
+        capture = _current.get()
+        if capture is not None:
+            capture.add(sql, params, many, seconds, context['connection'].alias)
+        if _slow_query_seconds is not None and seconds >= _slow_query_seconds:
+            _log_slow_query(sql, params, seconds)
+
+
+def _instrument_connection(sender, connection, **kwargs):
+    if _capture_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_capture_query)
+
+
+def install():
+    """Turn on the slow-query log and SQL capture from settings; called from ``ApiConfig.ready``"""
+    global _slow_query_seconds, _slow_stack_interval
+    threshold = getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 0)
+    _slow_query_seconds = threshold / 1000 if threshold > 0 else None
+    _slow_stack_interval = getattr(settings, 'SLOW_QUERY_STACK_INTERVAL', 60)
+    connection_created.connect(_instrument_connection, dispatch_uid='api.profiling')
+
+
+def profile_token(user):
+    """A value for the ``X-Profile`` header that profiles requests for the next ``PROFILING_TOKEN_MAX_AGE`` seconds"""
+    return signing.dumps({'user': user.id}, salt=TOKEN_SALT)
+
+
+def _token_user_id(request):
+    token = request.META.get(PROFILE_HEADER)
+    if not token:
+        return None
+    try:
+        return signing.loads(token, salt=TOKEN_SALT, max_age=settings.PROFILING_TOKEN_MAX_AGE)['user']
+    except (signing.BadSignature, KeyError, TypeError):
+        return None
+
+
+def _profiled_user(token_user_id, user):
+    """Whether a request authenticated as ``user`` may be profiled with a token issued to ``token_user_id``"""
+    return user is not None and user.id == token_user_id and user.is_staff
+
+
+def _start_profiler():
+    """A running profiler, or ``None`` when another request or tool is already profiling"""
+    if not _profiling.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+: another profiler (a debugger, coverage) holds the hook
+        _profiling.release()
+        return None
+    return profiler
+
+
+def _stop_profiler(profiler):
+    profiler.disable()
+    _profiling.release()
+
+
+def _top_functions(stats):
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:TOP_FUNCTIONS]
+    return [
+        {
+            'function': f'{os.path.relpath(filename, _SOURCE_ROOT) if filename.startswith(_SOURCE_ROOT) else filename}:{line}({name})',
+            'calls': calls,
+            'own_ms': round(own * 1000, 3),
+            'cumulative_ms': round(cumulative * 1000, 3),
+        }
+        for (filename, line, name), (_, calls, own, cumulative, _) in rows
+    ]
+
+
+def _save_profile(request, response, user_id, seconds, profiler, capture):
+    stats = pstats.Stats(profiler)
+    profile = RequestProfile.objects.create(
+        requested_by_id=user_id,
+        method=request.method,
+        path=request.get_full_path()[:500],
+        status_code=response.status_code,
+        duration_ms=seconds * 1000,
+        query_count=capture.total,
+        query_ms=capture.seconds * 1000,
+        report={
+            'queries': capture.report(),
+            'n_plus_one': capture.n_plus_one(),
+            'explain': capture.explain(),
+            'functions': _top_functions(stats),
+        },
+        stats=marshal.dumps(stats.stats),
+    )
+    return profile.id
+
+
+class ProfilingMiddleware:
+    """Profile requests that carry a valid signed ``X-Profile`` header.
+
+    The request must also be authenticated as the staff user the token was
+    issued to, so a leaked token profiles nobody else's requests. It runs
+    under cProfile with every SQL statement captured, and the report is
+    saved as a ``RequestProfile`` whose id comes back in the
+    ``X-Profile-Id`` response header. One request is profiled at a time;
+    one arriving while another is being profiled runs unprofiled. Under
+    ASGI cProfile only sees the event loop thread, so ORM work in
+    ``sync_to_async`` threads shows up as SQL but not as Python frames.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        user_id = _token_user_id(request)
+        if user_id is None or not _profiled_user(user_id, authenticate(request)):
+            return self.get_response(request)
+        profiler = _start_profiler()
+        if profiler is None:
+            return self.get_response(request)
+
+        capture = QueryCapture()
+        token = _current.set(capture)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _stop_profiler(profiler)
+            _current.reset(token)
+        seconds = time.perf_counter() - started
+        response['X-Profile-Id'] = _save_profile(request, response, user_id, seconds, profiler, capture)
+        return response
+
+    async def __acall__(self, request):
+        user_id = _token_user_id(request)
+        if user_id is None or not _profiled_user(user_id, await aauthenticate(request)):
+            return await self.get_response(request)
+        profiler = _start_profiler()
+        if profiler is None:
+            return await self.get_response(request)
+
+        capture = QueryCapture()
+        token = _current.set(capture)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _stop_profiler(profiler)
+            _current.reset(token)
+        seconds = time.perf_counter() - started
+        response['X-Profile-Id'] = await sync_to_async(_save_profile)(request, response, user_id, seconds, profiler, capture)
+        return response
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAdminUser])
+def create_profile_token(request):
+    """Issue a signed ``X-Profile`` header value; any request sent with it is profiled"""
+    return Response({
+        'header': 'X-Profile',
+        'token': profile_token(request.user),
+        'expires_in': settings.PROFILING_TOKEN_MAX_AGE
+    }, status=status.HTTP_201_CREATED)
+
+
+class RequestProfileListView(generics.ListAPIView):
+    """Saved profiles, newest first, without their reports"""
+    serializer_class = RequestProfileSerializer
+    permission_classes = [permissions.IsAdminUser]
+    queryset = RequestProfile.objects.defer('report', 'stats').select_related('requested_by')
+    filterset_fields = ['method', 'status_code']
+    search_fields = ['path']
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def request_profile_detail(request, pk):
+    """A saved profile with its SQL, EXPLAIN plans, N+1 suspects and hottest functions"""
+    try:
+        profile = RequestProfile.objects.defer('stats').select_related('requested_by').get(id=pk)
+    except RequestProfile.DoesNotExist:
+        return Response({
+            'message': 'Profile not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({**RequestProfileSerializer(profile).data, 'report': profile.report})
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def download_request_profile(request, pk):
+    """The raw cProfile stats as a ``.prof`` file, for ``pstats`` or snakeviz"""
+    stats = RequestProfile.objects.filter(id=pk).values_list('stats', flat=True).first()
+    if stats is None:
+        return Response({
+            'message': 'Profile not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    response = HttpResponse(bytes(stats), content_type='application/octet-stream')
+    response['Content-Disposition'] = f'attachment; filename="profile-{pk}.prof"'
+    return response
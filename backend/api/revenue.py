@@ -0,0 +1,223 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Sum, Count, Min, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from .models import PaymentHistory, UserSubscription, DailyRevenue, DailyRecurringRevenue, RevenueRollupState
+
+REVENUE_DIMENSIONS = ('plan', 'billing_cycle', 'payment_method', 'currency')
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _days(start, end):
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+def rollup_payments(start, end):
+    """Recompute ``DailyRevenue`` for the local dates ``start``..``end`` inclusive."""
+    rows = (
+        PaymentHistory.objects
+        .filter(status='completed', created_at__gte=_day_start(start), created_at__lt=_day_start(end + timedelta(days=1)))
+        .annotate(
+            day=TruncDate('created_at'),
+            plan_name=Coalesce('payment_request__plan__name', 'subscription__plan__name', Value('unknown')),
+            cycle=Coalesce('payment_request__billing_cycle', 'subscription__billing_cycle', Value('unknown')),
+        )
+        .values('day', 'plan_name', 'cycle', 'payment_method', 'currency')
+        .annotate(payments=Count('id'), amount=Sum('amount'))
+        .order_by()
+    )
+    buckets = [
+        DailyRevenue(
+            date=row['day'],
+            plan=row['plan_name'],
+            billing_cycle=row['cycle'],
+            payment_method=row['payment_method'],
+            currency=row['currency'],
+            payments=row['payments'],
+            amount=row['amount'],
+        )
+        for row in rows
+    ]
+    with transaction.atomic():
+        DailyRevenue.objects.filter(date__gte=start, date__lte=end).delete()
+        DailyRevenue.objects.bulk_create(buckets, batch_size=1000)
+    return len(buckets)
+
+
+def rollup_recurring_revenue(start, end):
+    """Recompute ``DailyRecurringRevenue`` for ``start``..``end`` inclusive.
+
+    A subscription counts towards a day when its current period covers the
+    end of that day. Only the current period of each subscription is known,
+    so rebuilding far into the past under-reports churned subscriptions.
+    """
+    subscriptions = (
+        UserSubscription.objects
+        .filter(status='active', current_period_start__lt=_day_start(end + timedelta(days=1)), current_period_end__gt=_day_start(start))
+        .values_list('plan__name', 'billing_cycle', 'plan__price_monthly', 'plan__price_yearly',
+                     'current_period_start', 'current_period_end')
+    )
+
+    # Sweep: each subscription adds itself on its first covered day and
+    # removes itself the day after its last one.
+    changes = defaultdict(lambda: defaultdict(lambda: [0, Decimal('0')]))
+    for plan, cycle, price_monthly, price_yearly, period_start, period_end in subscriptions:
+        monthly = price_monthly if cycle == 'monthly' else price_yearly / 12
+        first_day = max(start, timezone.localdate(period_start))
+        last_day = timezone.localdate(period_end) - timedelta(days=1)
+        if _day_start(last_day + timedelta(days=1)) == period_end:
+            last_day -= timedelta(days=1)
+        last_day = min(end, last_day)
+        if first_day > last_day:
+            continue
+        for day, sign in ((first_day, 1), (last_day + timedelta(days=1), -1)):
+            change = changes[day][(plan, cycle)]
+            change[0] += sign
+            change[1] += sign * monthly
+
+    running = defaultdict(lambda: [0, Decimal('0')])
+    buckets = []
+    for day in _days(start, end):
+        for key, (count, mrr) in changes.get(day, {}).items():
+            running[key][0] += count
+            running[key][1] += mrr
+        for (plan, cycle), (count, mrr) in running.items():
+            if count:
+                buckets.append(DailyRecurringRevenue(
+                    date=day, plan=plan, billing_cycle=cycle,
+                    active_subscriptions=count, mrr=mrr.quantize(Decimal('0.01')),
+                ))
+
+    with transaction.atomic():
+        DailyRecurringRevenue.objects.filter(date__gte=start, date__lte=end).delete()
+        DailyRecurringRevenue.objects.bulk_create(buckets, batch_size=1000)
+    return len(buckets)
+
+
+def _mark_rolled_up(end):
+    """Move the rollup watermark forward to ``end``; it never moves back."""
+    state = RevenueRollupState.objects.select_for_update().first()
+    if state is None:
+        RevenueRollupState.objects.create(last_date=end)
+    elif end > state.last_date:
+        state.last_date = end
+        state.save(update_fields=['last_date', 'updated_at'])
+
+
+def rollup_revenue(start=None, end=None):
+    """Extend the revenue rollups up to ``end`` (today by default).
+
+    Without ``start`` the last rolled-up day, as recorded in
+    ``RevenueRollupState``, is recomputed along with everything after it,
+    since it may have been rolled up mid-day. Without a record yet the
+    rollups are rebuilt.
+    """
+    end = end or timezone.localdate()
+    with transaction.atomic():
+        if start is None:
+            state = RevenueRollupState.objects.first()
+            if state is None:
+                return rebuild_revenue(end)
+            start = min(state.last_date, end)
+        rolled_up = rollup_payments(start, end), rollup_recurring_revenue(start, end)
+        _mark_rolled_up(end)
+    return rolled_up
+
+
+def rebuild_revenue(end=None):
+    """Regenerate the revenue rollups from the first payment or subscription."""
+    end = end or timezone.localdate()
+    first_payment = PaymentHistory.objects.aggregate(first=Min('created_at'))['first']
+    first_subscription = UserSubscription.objects.aggregate(first=Min('current_period_start'))['first']
+    firsts = [timezone.localdate(value) for value in (first_payment, first_subscription) if value]
+
+    with transaction.atomic():
+        DailyRevenue.objects.all().delete()
+        DailyRecurringRevenue.objects.all().delete()
+        RevenueRollupState.objects.all().delete()
+        # Empty rollups are up to date too, so the next run starts from here
+        RevenueRollupState.objects.create(last_date=end)
+        if not firsts:
+            return 0, 0
+        start = min(firsts)
+        return rollup_payments(start, end), rollup_recurring_revenue(start, end)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def revenue_analytics(request):
+    """Platform revenue and MRR/ARR, read from the daily rollup tables only"""
+    today = timezone.localdate()
+    try:
+        end = parse_date(request.query_params.get('end', '')) or today
+        start = parse_date(request.query_params.get('start', '')) or end - timedelta(days=29)
+    except ValueError:
+        return Response({'error': 'start and end must be valid dates in YYYY-MM-DD format'}, status=400)
+    group_by = request.query_params.get('group_by', 'plan')
+    if group_by not in REVENUE_DIMENSIONS:
+        return Response({'error': f"group_by must be one of {', '.join(REVENUE_DIMENSIONS)}"}, status=400)
+    if start > end:
+        return Response({'error': 'start must not be after end'}, status=400)
+
+    revenue = DailyRevenue.objects.filter(date__gte=start, date__lte=end)
+    totals = revenue.aggregate(payments=Coalesce(Sum('payments'), 0), amount=Coalesce(Sum('amount'), Decimal('0')))
+
+    daily = revenue.values('date').annotate(payments=Sum('payments'), amount=Sum('amount')).order_by('date')
+    by_dimension = {
+        dimension: list(
+            revenue.values(dimension).annotate(payments=Sum('payments'), amount=Sum('amount')).order_by('-amount')
+        )
+        for dimension in REVENUE_DIMENSIONS
+    }
+    series = (
+        revenue.values('date', group_by)
+        .annotate(payments=Sum('payments'), amount=Sum('amount'))
+        .order_by('date', group_by)
+    )
+
+    recurring = DailyRecurringRevenue.objects.filter(date__gte=start, date__lte=end)
+    mrr_series = list(
+        recurring.values('date').annotate(mrr=Sum('mrr'), active_subscriptions=Sum('active_subscriptions')).order_by('date')
+    )
+    current_mrr = mrr_series[-1]['mrr'] if mrr_series else Decimal('0')
+    mrr_by_plan = (
+        recurring.filter(date=mrr_series[-1]['date']).values('plan')
+        .annotate(mrr=Sum('mrr'), active_subscriptions=Sum('active_subscriptions')).order_by('-mrr')
+        if mrr_series else []
+    )
+
+    return Response({
+        'range': {'start': start, 'end': end},
+        'totals': {
+            'payments': totals['payments'],
+            'revenue': totals['amount'],
+            'mrr': current_mrr,
+            'arr': current_mrr * 12,
+        },
+        'daily': list(daily),
+        'series': {'group_by': group_by, 'points': list(series)},
+        'by_plan': by_dimension['plan'],
+        'by_billing_cycle': by_dimension['billing_cycle'],
+        'by_payment_method': by_dimension['payment_method'],
+        'by_currency': by_dimension['currency'],
+        'mrr': {
+            'timeline': mrr_series,
+            'by_plan': list(mrr_by_plan),
+        },
+        'generated_at': timezone.now().isoformat()
+    })
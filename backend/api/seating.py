@@ -0,0 +1,526 @@
+import math
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from django.db import close_old_connections, transaction
+from django.db.models import F, Sum
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import generics, permissions, status
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.response import Response
+
+from .deletion import in_owned_events, owned_events
+from .models import Event, Guest, Table, SeatAssignment, SeatingConstraint
+from .serializers import TableSerializer, SeatAssignmentSerializer, SeatingConstraintSerializer
+from .throttling import BulkRateThrottle, PlanRateThrottle
+
+DEFAULT_TIME_BUDGET = 2.0
+MAX_TIME_BUDGET = 10.0
+# Leaving a person unseated costs more than any amount of category mixing
+UNSEATED_PENALTY = 1000
+ASSIGNMENT_BATCH_SIZE = 1000
+
+# Plans are CPU-bound; a small dedicated pool keeps a burst of optimize
+# requests from occupying every request worker at once.
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='seating')
+# Plans running or queued on the pool; past this, requests are turned away
+# rather than left waiting on the queue.
+MAX_PENDING_PLANS = 4
+_pending = threading.BoundedSemaphore(MAX_PENDING_PLANS)
+
+
+class PlannerBusy(Exception):
+    """The seating pool is full, or the plan did not finish in time"""
+
+
+class SeatingPlanner:
+    """Packs parties into tables: greedy placement, then local search until the deadline.
+
+    A party is a guest plus their ``plus_ones``. Parties linked by
+    ``together`` constraints form one cluster that is always seated as a
+    unit; ``avoid`` constraints are never violated by a move. The cost of a
+    plan is the number of people not in their table's majority category,
+    plus a large penalty per unseated person, so the search keeps
+    categories (and the families in them) at as few tables as possible.
+    """
+
+    def __init__(self, parties, tables, pins=None, together=(), avoid=(), seed=0):
+        # parties: {guest_id: (size, category)}; tables: {table_id: capacity}
+        self.rng = random.Random(seed)
+        self.capacity = dict(tables)
+        self.problems = []
+
+        parent = {guest_id: guest_id for guest_id in parties}
+
+        def find(guest_id):
+            while parent[guest_id] != guest_id:
+                parent[guest_id] = parent[parent[guest_id]]
+                guest_id = parent[guest_id]
+            return guest_id
+
+        pins = {guest_id: table_id for guest_id, table_id in (pins or {}).items() if guest_id in parties and table_id in self.capacity}
+        cluster_pins = dict(pins)
+        for guest_id, other_id in together:
+            if guest_id not in parties or other_id not in parties:
+                continue
+            root, other_root = find(guest_id), find(other_id)
+            if root == other_root:
+                continue
+            pinned, other_pinned = cluster_pins.get(root), cluster_pins.get(other_root)
+            if pinned is not None and other_pinned is not None and pinned != other_pinned:
+                self.problems.append({'together': [guest_id, other_id], 'reason': 'pinned to different tables'})
+                continue
+            parent[other_root] = root
+            if pinned is None and other_pinned is not None:
+                cluster_pins[root] = other_pinned
+
+        members = defaultdict(list)
+        for guest_id in parties:
+            members[find(guest_id)].append(guest_id)
+
+        self.clusters = list(members)
+        self.members = {root: sorted(guest_ids) for root, guest_ids in members.items()}
+        self.size = {}
+        self.people = {}
+        self.category = {}
+        for root, guest_ids in members.items():
+            people = Counter()
+            for guest_id in guest_ids:
+                size, category = parties[guest_id]
+                people[category] += size
+            self.people[root] = people
+            self.size[root] = sum(people.values())
+            self.category[root] = people.most_common(1)[0][0]
+        self.pinned = {root: cluster_pins[root] for root in self.clusters if root in cluster_pins}
+
+        self.avoid = defaultdict(set)
+        for guest_id, other_id in avoid:
+            if guest_id not in parties or other_id not in parties:
+                continue
+            root, other_root = find(guest_id), find(other_id)
+            if root == other_root:
+                self.problems.append({'avoid': [guest_id, other_id], 'reason': 'also required to sit together'})
+                continue
+            self.avoid[root].add(other_root)
+            self.avoid[other_root].add(root)
+
+        largest = max(self.capacity.values(), default=0)
+        for root in self.clusters:
+            if self.size[root] > largest and root not in self.pinned:
+                self.problems.append({'guests': self.members[root], 'reason': 'party is larger than any table'})
+
+        self.table_of = dict.fromkeys(self.clusters)
+        self.remaining = dict(self.capacity)
+        self.counts = {table_id: Counter() for table_id in self.capacity}
+        self.seated = {table_id: set() for table_id in self.capacity}
+        self.by_category = defaultdict(list)
+        for root in self.clusters:
+            self.by_category[self.category[root]].append(root)
+
+    # State updates
+
+    def _place(self, root, table_id):
+        self.table_of[root] = table_id
+        if table_id is not None:
+            self.remaining[table_id] -= self.size[root]
+            self.counts[table_id].update(self.people[root])
+            self.seated[table_id].add(root)
+
+    def _unplace(self, root):
+        table_id = self.table_of[root]
+        if table_id is not None:
+            self.remaining[table_id] += self.size[root]
+            self.counts[table_id].subtract(self.people[root])
+            self.seated[table_id].discard(root)
+        self.table_of[root] = None
+        return table_id
+
+    def _table_cost(self, table_id):
+        if table_id is None:
+            return 0
+        counts = self.counts[table_id]
+        return sum(counts.values()) - max(counts.values(), default=0)
+
+    def _unseated_cost(self):
+        return sum(self.size[root] for root in self.clusters if self.table_of[root] is None) * UNSEATED_PENALTY
+
+    def cost(self):
+        return sum(self._table_cost(table_id) for table_id in self.capacity) + self._unseated_cost()
+
+    def _allowed(self, root, table_id, ignoring=None):
+        return not any(self.table_of[other] == table_id for other in self.avoid[root] if other != ignoring)
+
+    # Greedy construction
+
+    def _greedy(self):
+        for root, table_id in self.pinned.items():
+            self._place(root, table_id)
+            if self.remaining[table_id] < 0:
+                self.problems.append({'table': table_id, 'reason': 'pinned parties exceed capacity'})
+
+        category_people = Counter()
+        for root in self.clusters:
+            category_people[self.category[root]] += self.size[root]
+        pending = sorted(
+            (root for root in self.clusters if root not in self.pinned),
+            key=lambda root: (-category_people[self.category[root]], self.category[root], -self.size[root]),
+        )
+
+        open_tables = defaultdict(set)
+        for root in self.pinned:
+            open_tables[self.category[root]].add(self.pinned[root])
+        empty = sorted((table_id for table_id in self.capacity if not self.seated[table_id]), key=lambda table_id: -self.capacity[table_id])
+
+        for root in pending:
+            size, category = self.size[root], self.category[root]
+            # Best fit among tables already holding the category
+            fits = [table_id for table_id in open_tables[category] if self.remaining[table_id] >= size and self._allowed(root, table_id)]
+            if fits:
+                table_id = min(fits, key=lambda table_id: self.remaining[table_id])
+            else:
+                # Start the category on the largest free table so it stays together
+                while empty and self.seated[empty[0]]:
+                    empty.pop(0)
+                if empty and self.capacity[empty[0]] >= size:
+                    table_id = empty.pop(0)
+                else:
+                    fits = [table_id for table_id in self.capacity if self.remaining[table_id] >= size and self._allowed(root, table_id)]
+                    table_id = min(fits, key=self._mixing_after(root), default=None)
+            self._place(root, table_id)
+            if table_id is not None:
+                open_tables[category].add(table_id)
+
+    def _mixing_after(self, root):
+        def cost(table_id):
+            counts = self.counts[table_id] + self.people[root]
+            return sum(counts.values()) - max(counts.values())
+        return cost
+
+    # Local search
+
+    def _try_move(self, root, target):
+        source = self.table_of[root]
+        if self.remaining[target] < self.size[root] or not self._allowed(root, target):
+            return False
+        before = self._table_cost(source) + self._table_cost(target) + (self.size[root] * UNSEATED_PENALTY if source is None else 0)
+        self._unplace(root)
+        self._place(root, target)
+        after = self._table_cost(source) + self._table_cost(target)
+        if after < before or (after == before and self.rng.random() < 0.05):
+            return True
+        self._unplace(root)
+        self._place(root, source)
+        return False
+
+    def _try_swap(self, root, other):
+        """Exchange two parties' tables; an unseated ``root`` may bump a smaller party out instead"""
+        source, target = self.table_of[root], self.table_of[other]
+        if other in self.pinned:
+            return False
+        size, other_size = self.size[root], self.size[other]
+        if self.remaining[target] + other_size < size:
+            return False
+        if source is not None and self.remaining[source] + size < other_size:
+            return False
+        if source is None and other_size >= size:
+            return False
+        if not self._allowed(root, target, ignoring=other) or (source is not None and not self._allowed(other, source, ignoring=root)):
+            return False
+        before = self._table_cost(source) + self._table_cost(target) + (size * UNSEATED_PENALTY if source is None else 0)
+        self._unplace(root)
+        self._unplace(other)
+        self._place(root, target)
+        self._place(other, source)
+        after = self._table_cost(source) + self._table_cost(target) + (other_size * UNSEATED_PENALTY if source is None else 0)
+        if after < before:
+            return True
+        self._unplace(root)
+        self._unplace(other)
+        self._place(root, source)
+        self._place(other, target)
+        return False
+
+    def _try_make_room(self, root, target, tables):
+        """Seat an unseated party by moving one of ``target``'s parties to a table with room"""
+        size = self.size[root]
+        if not self._allowed(root, target):
+            return False
+        for other in list(self.seated[target]):
+            if other in self.pinned or self.remaining[target] + self.size[other] < size:
+                continue
+            for _ in range(8):
+                elsewhere = self.rng.choice(tables)
+                if elsewhere == target or self.remaining[elsewhere] < self.size[other] or not self._allowed(other, elsewhere):
+                    continue
+                before = self._table_cost(target) + self._table_cost(elsewhere) + size * UNSEATED_PENALTY
+                self._unplace(other)
+                self._place(other, elsewhere)
+                self._place(root, target)
+                after = self._table_cost(target) + self._table_cost(elsewhere)
+                if after < before:
+                    return True
+                self._unplace(root)
+                self._unplace(other)
+                self._place(other, target)
+        return False
+
+    def _search(self, deadline):
+        movable = [root for root in self.clusters if root not in self.pinned]
+        tables = list(self.capacity)
+        if not movable or not tables:
+            return 0
+        iterations = 0
+        while True:
+            if iterations % 256 == 0 and (time.monotonic() >= deadline or self.cost() == 0):
+                return iterations
+            iterations += 1
+            root = self.rng.choice(movable)
+            if self.rng.random() < 0.8:
+                # Aim for a table that already seats the party's category
+                anchor = self.rng.choice(self.by_category[self.category[root]])
+                target = self.table_of[anchor]
+            else:
+                target = self.rng.choice(tables)
+            if target is None or target == self.table_of[root]:
+                continue
+            if self._try_move(root, target) or not self.seated[target]:
+                continue
+            if self.table_of[root] is None and self._try_make_room(root, target, tables):
+                continue
+            other = self.rng.choice(tuple(self.seated[target]))
+            self._try_swap(root, other)
+
+    def solve(self, time_budget):
+        started = time.monotonic()
+        self._greedy()
+        greedy_cost = self.cost()
+        iterations = self._search(started + time_budget)
+        assignments = {
+            guest_id: self.table_of[root]
+            for root in self.clusters if self.table_of[root] is not None
+            for guest_id in self.members[root]
+        }
+        unseated = sorted(guest_id for root in self.clusters if self.table_of[root] is None for guest_id in self.members[root])
+        mixed = sum(self._table_cost(table_id) for table_id in self.capacity)
+        return {
+            'assignments': assignments,
+            'unseated': unseated,
+            'problems': self.problems,
+            'stats': {
+                'parties': sum(len(guest_ids) for guest_ids in self.members.values()),
+                'clusters': len(self.clusters),
+                'attendees': sum(self.size.values()),
+                'seated_attendees': sum(self.size[root] for root in self.clusters if self.table_of[root] is not None),
+                'capacity': sum(self.capacity.values()),
+                'mixed_seats': mixed,
+                'greedy_cost': greedy_cost,
+                'final_cost': self.cost(),
+                'iterations': iterations,
+                'elapsed': round(time.monotonic() - started, 3),
+            },
+        }
+
+
+def load_planner(event):
+    """Build a planner for the event's confirmed parties, plus any guests pinned to a table"""
+    pins = dict(SeatAssignment.objects.filter(event=event, pinned=True).values_list('guest_id', 'table_id'))
+    parties = {
+        guest_id: (plus_ones + 1, category)
+        for guest_id, plus_ones, category, rsvp_status in Guest.objects.filter(event=event).values_list(
+            'id', 'plus_ones', 'category', 'rsvp_status'
+        )
+        if rsvp_status == 'confirmed' or guest_id in pins
+    }
+    tables = dict(Table.objects.filter(event=event).values_list('id', 'capacity'))
+    constraints = defaultdict(list)
+    for guest_id, other_id, kind in SeatingConstraint.objects.filter(event=event).values_list('guest_id', 'other_guest_id', 'kind'):
+        constraints[kind].append((guest_id, other_id))
+    return SeatingPlanner(parties, tables, pins, together=constraints['together'], avoid=constraints['avoid'], seed=event.id), pins
+
+
+def optimize(event, time_budget=DEFAULT_TIME_BUDGET):
+    """Compute a plan on the seating worker pool; returns the planner result and the pins it kept.
+
+    Raises ``PlannerBusy`` when the pool already holds ``MAX_PENDING_PLANS``
+    plans or this one doesn't finish in time.
+    """
+    if not _pending.acquire(blocking=False):
+        raise PlannerBusy
+
+    def run():
+        # A worker thread keeps its connection between plans, like a request thread
+        close_old_connections()
+        try:
+            planner, pins = load_planner(event)
+            return planner.solve(time_budget), pins
+        finally:
+            close_old_connections()
+            _pending.release()
+
+    # Loading and saving add a little on top of the search budget
+    try:
+        return _executor.submit(run).result(timeout=time_budget + 30)
+    except FutureTimeoutError:
+        raise PlannerBusy from None
+
+
+def apply_plan(event, assignments, pins):
+    """Replace the event's unpinned seat assignments with ``assignments``"""
+    with transaction.atomic():
+        SeatAssignment.objects.filter(event=event, pinned=False).delete()
+        SeatAssignment.objects.bulk_create(
+            [
+                SeatAssignment(event=event, table_id=table_id, guest_id=guest_id)
+                for guest_id, table_id in assignments.items() if guest_id not in pins
+            ],
+            batch_size=ASSIGNMENT_BATCH_SIZE,
+        )
+
+
+def seating_plan(event):
+    """Tables with their seated guests, as stored"""
+    tables = {
+        table['id']: {**table, 'seated': 0, 'guests': []}
+        for table in Table.objects.filter(event=event).values('id', 'name', 'capacity')
+    }
+    for assignment in SeatAssignment.objects.filter(event=event).values(
+        'table_id', 'pinned', 'guest_id', 'guest__name', 'guest__category', 'guest__plus_ones'
+    ).order_by('table_id', 'guest__category', 'guest__name'):
+        table = tables[assignment['table_id']]
+        table['seated'] += assignment['guest__plus_ones'] + 1
+        table['guests'].append({
+            'id': assignment['guest_id'],
+            'name': assignment['guest__name'],
+            'category': assignment['guest__category'],
+            'party_size': assignment['guest__plus_ones'] + 1,
+            'pinned': assignment['pinned'],
+        })
+    return list(tables.values())
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def event_seating(request, event_id):
+    try:
+        event = owned_events(request.user).get(id=event_id)
+    except Event.DoesNotExist:
+        return Response({
+            'message': 'Event not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({'tables': seating_plan(event)})
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+@throttle_classes([PlanRateThrottle, BulkRateThrottle])
+def optimize_seating(request, event_id):
+    """Seat the event's confirmed parties at its tables.
+
+    ``time_budget`` (seconds, default 2, at most 10) bounds the local
+    search. With ``apply`` false the plan is returned without replacing
+    the stored assignments. Pinned assignments are always kept.
+    """
+    try:
+        event = owned_events(request.user).get(id=event_id)
+    except Event.DoesNotExist:
+        return Response({
+            'message': 'Event not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        time_budget = min(float(request.data.get('time_budget', DEFAULT_TIME_BUDGET)), MAX_TIME_BUDGET)
+    except (TypeError, ValueError):
+        return Response({
+            'message': 'time_budget must be a number of seconds'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    # nan and inf would never reach the search deadline
+    if not math.isfinite(time_budget) or time_budget < 0:
+        return Response({
+            'message': 'time_budget must be a number of seconds'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        result, pins = optimize(event, time_budget)
+    except PlannerBusy:
+        return Response({
+            'message': 'The seating planner is busy, try again shortly'
+        }, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': str(math.ceil(MAX_TIME_BUDGET))})
+    apply = request.data.get('apply', True)
+    if isinstance(apply, str):
+        apply = apply.strip().lower() in ('1', 'true', 'yes', 'on')
+
+    if apply:
+        apply_plan(event, result['assignments'], pins)
+        tables = seating_plan(event)
+    else:
+        tables = {table['id']: {**table, 'seated': 0, 'guests': []} for table in Table.objects.filter(event=event).values('id', 'name', 'capacity')}
+        sizes = dict(Guest.objects.filter(id__in=result['assignments']).values_list('id', 'plus_ones'))
+        for guest_id, table_id in result['assignments'].items():
+            tables[table_id]['seated'] += sizes[guest_id] + 1
+            tables[table_id]['guests'].append({'id': guest_id, 'party_size': sizes[guest_id] + 1, 'pinned': guest_id in pins})
+        tables = list(tables.values())
+
+    return Response({
+        'applied': bool(apply),
+        'tables': tables,
+        'unseated': result['unseated'],
+        'problems': result['problems'],
+        'stats': result['stats']
+    })
+
+
+class TableListCreateView(generics.ListCreateAPIView):
+    serializer_class = TableSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['event']
+
+    def get_queryset(self):
+        return in_owned_events(Table.objects.all(), self.request.user).annotate(
+            seated_attendees=Sum(F('assignments__guest__plus_ones') + 1)
+        ).order_by('id')
+
+class TableDetailView(generics.RetrieveUpdateDestroyAPIView):
+    serializer_class = TableSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return in_owned_events(Table.objects.all(), self.request.user).annotate(
+            seated_attendees=Sum(F('assignments__guest__plus_ones') + 1)
+        ).order_by('id')
+
+class SeatAssignmentListCreateView(generics.ListCreateAPIView):
+    serializer_class = SeatAssignmentSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['event', 'table', 'pinned']
+
+    def get_queryset(self):
+        return in_owned_events(SeatAssignment.objects.all(), self.request.user)
+
+class SeatAssignmentDetailView(generics.RetrieveUpdateDestroyAPIView):
+    serializer_class = SeatAssignmentSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return in_owned_events(SeatAssignment.objects.all(), self.request.user)
+
+class SeatingConstraintListCreateView(generics.ListCreateAPIView):
+    serializer_class = SeatingConstraintSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['event', 'kind']
+
+    def get_queryset(self):
+        return in_owned_events(SeatingConstraint.objects.all(), self.request.user)
+
+class SeatingConstraintDetailView(generics.RetrieveUpdateDestroyAPIView):
+    serializer_class = SeatingConstraintSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return in_owned_events(SeatingConstraint.objects.all(), self.request.user)
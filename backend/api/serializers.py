@@ -1,7 +1,11 @@
 from rest_framework import serializers
+from django.db.models import F
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
-from .models import User, Event, BudgetItem, Guest, Vendor, SubscriptionPlan, UserSubscription, PaymentHistory, UserSettings, PaymentRequest
+from .models import User, Event, BudgetItem, Guest, Vendor, SubscriptionPlan, UserSubscription, PaymentHistory, UserSettings, PaymentRequest, EventTemplate, EventSeries, Contact, ContactGroup, Table, SeatAssignment, SeatingConstraint, RequestProfile, ArchivedEvent, DeletionJob
+from .deletion import in_owned_events, owned_events
+from .fieldsets import SparseFieldsetMixin
+from .fast_serializers import ValuesListSerializer
 
 # User Serializers
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -61,37 +65,266 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'subscription_plan']
 
 # Event Serializers
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Event
         fields = '__all__'
-        read_only_fields = ['user', 'created_at', 'updated_at']
+        read_only_fields = ['user', 'series', 'created_at', 'updated_at']
+        field_presets = {
+            'compact': ('id', 'name', 'category', 'date', 'time', 'venue', 'budget', 'expected_guests', 'status'),
+        }
     
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
         return super().create(validated_data)
 
 # Budget Serializers
-class BudgetItemSerializer(serializers.ModelSerializer):
+class BudgetItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = BudgetItem
         fields = '__all__'
         read_only_fields = ['created_at', 'updated_at']
+        field_presets = {
+            'compact': ('id', 'event', 'category', 'item_name', 'estimated_cost', 'actual_cost', 'vendor', 'status', 'due_date'),
+        }
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is not None:
+            fields['event'].queryset = owned_events(request.user)
+        return fields
 
 # Guest Serializers
-class GuestSerializer(serializers.ModelSerializer):
+class GuestSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     total_attendees = serializers.ReadOnlyField()
     class Meta:
         model = Guest
         fields = '__all__'
         read_only_fields = ['created_at', 'updated_at', 'total_attendees']
+        field_presets = {
+            'compact': ('id', 'event', 'name', 'email', 'phone', 'category', 'rsvp_status', 'plus_ones', 'total_attendees', 'invitation_sent', 'checked_in'),
+        }
+        field_dependencies = {
+            'total_attendees': ('plus_ones',),
+        }
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is not None:
+            fields['event'].queryset = owned_events(request.user)
+            if 'contact' in fields:
+                fields['contact'].queryset = Contact.objects.filter(user=request.user)
+        return fields
+
+# Read-only list renderers for the high-volume list endpoints
+BudgetItemListSerializer = ValuesListSerializer(BudgetItemSerializer)
+GuestListSerializer = ValuesListSerializer(
+    GuestSerializer,
+    annotations={'total_attendees': F('plus_ones') + 1},
+)
+
+# Contact Book Serializers
+class ContactSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Contact
+        fields = '__all__'
+        read_only_fields = ['user', 'created_at', 'updated_at']
+    
+    def create(self, validated_data):
+        validated_data['user'] = self.context['request'].user
+        return super().create(validated_data)
+
+class ContactGroupSerializer(serializers.ModelSerializer):
+    contact_count = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ContactGroup
+        fields = '__all__'
+        read_only_fields = ['user', 'created_at', 'updated_at']
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is not None:
+            fields['contacts'].child_relation.queryset = Contact.objects.filter(user=request.user)
+        return fields
+    
+    def get_contact_count(self, obj):
+        return len(obj.contacts.all())
+    
+    def create(self, validated_data):
+        validated_data['user'] = self.context['request'].user
+        return super().create(validated_data)
+
+# Seating Serializers
+class TableSerializer(serializers.ModelSerializer):
+    seated = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Table
+        fields = '__all__'
+        read_only_fields = ['created_at', 'updated_at']
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is not None:
+            fields['event'].queryset = owned_events(request.user)
+        return fields
+    
+    def get_seated(self, obj):
+        # Annotated by the table views; a table that was just created is empty
+        return getattr(obj, 'seated_attendees', None) or 0
+
+class SeatAssignmentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SeatAssignment
+        fields = '__all__'
+        read_only_fields = ['event', 'created_at']
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is not None:
+            fields['table'].queryset = in_owned_events(Table.objects.all(), request.user)
+            fields['guest'].queryset = in_owned_events(Guest.objects.all(), request.user)
+        return fields
+    
+    def validate(self, attrs):
+        table = attrs.get('table', getattr(self.instance, 'table', None))
+        guest = attrs.get('guest', getattr(self.instance, 'guest', None))
+        if table.event_id != guest.event_id:
+            raise serializers.ValidationError({"table": "Table and guest belong to different events"})
+        attrs['event'] = table.event
+        return attrs
+
+class SeatingConstraintSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SeatingConstraint
+        fields = '__all__'
+        read_only_fields = ['event', 'created_at']
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is not None:
+            fields['guest'].queryset = in_owned_events(Guest.objects.all(), request.user)
+            fields['other_guest'].queryset = in_owned_events(Guest.objects.all(), request.user)
+        return fields
+    
+    def validate(self, attrs):
+        guest = attrs.get('guest', getattr(self.instance, 'guest', None))
+        other_guest = attrs.get('other_guest', getattr(self.instance, 'other_guest', None))
+        if guest.event_id != other_guest.event_id:
+            raise serializers.ValidationError({"other_guest": "Guests belong to different events"})
+        if guest.id == other_guest.id:
+            raise serializers.ValidationError({"other_guest": "A constraint needs two different guests"})
+        attrs['event'] = guest.event
+        return attrs
+
+# Event Template Serializers
+class TemplateBudgetItemSerializer(serializers.Serializer):
+    category = serializers.ChoiceField(choices=BudgetItem.CATEGORY_CHOICES)
+    item_name = serializers.CharField(max_length=200)
+    estimated_cost = serializers.DecimalField(max_digits=10, decimal_places=2, coerce_to_string=True)
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+
+class EventTemplateSerializer(serializers.ModelSerializer):
+    budget_items = serializers.ListField(child=TemplateBudgetItemSerializer(), required=False)
+    source_event = serializers.PrimaryKeyRelatedField(
+        queryset=Event.objects.all(), write_only=True, required=False,
+        help_text='Copy defaults and budget lines from this event',
+    )
+    
+    class Meta:
+        model = EventTemplate
+        fields = '__all__'
+        read_only_fields = ['user', 'created_at', 'updated_at']
+        extra_kwargs = {
+            'name': {'required': False},
+            'category': {'required': False},
+        }
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is not None:
+            fields['source_event'].queryset = owned_events(request.user)
+        return fields
+    
+    def validate(self, attrs):
+        source = attrs.pop('source_event', None)
+        if source is not None:
+            for field in ('name', 'category', 'description', 'venue', 'address', 'budget', 'expected_guests', 'special_requirements'):
+                attrs.setdefault(field, getattr(source, field))
+            if 'budget_items' not in attrs:
+                attrs['budget_items'] = list(source.budget_items.order_by('id').values(
+                    'category', 'item_name', 'estimated_cost', 'notes'
+                ))
+        if self.instance is None:
+            missing = {field: 'This field is required.' for field in ('name', 'category') if not attrs.get(field)}
+            if missing:
+                raise serializers.ValidationError(missing)
+        if 'budget_items' in attrs:
+            # JSONField storage: keep costs as exact decimal strings
+            attrs['budget_items'] = [
+                {**item, 'estimated_cost': str(item['estimated_cost'])} for item in attrs['budget_items']
+            ]
+        return attrs
+    
+    def create(self, validated_data):
+        validated_data['user'] = self.context['request'].user
+        return super().create(validated_data)
+
+# Event Series Serializers
+class EventSeriesSerializer(serializers.ModelSerializer):
+    weekdays = serializers.ListField(child=serializers.IntegerField(min_value=0, max_value=6), required=False)
+    
+    class Meta:
+        model = EventSeries
+        fields = '__all__'
+        read_only_fields = ['user', 'materialized_until', 'created_at', 'updated_at']
+        extra_kwargs = {
+            'interval': {'min_value': 1},
+            'count': {'min_value': 1},
+        }
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is not None:
+            fields['template'].queryset = EventTemplate.objects.filter(user=request.user)
+        return fields
+    
+    def validate(self, attrs):
+        frequency = attrs.get('frequency', getattr(self.instance, 'frequency', None))
+        start_date = attrs.get('start_date', getattr(self.instance, 'start_date', None))
+        until = attrs.get('until', getattr(self.instance, 'until', None))
+        if attrs.get('weekdays') and frequency != 'weekly':
+            raise serializers.ValidationError({"weekdays": "Only weekly series repeat on weekdays"})
+        if until and start_date and until < start_date:
+            raise serializers.ValidationError({"until": "Must be on or after the start date"})
+        if self.instance is not None and self.instance.materialized_until and (
+            {'frequency', 'interval', 'weekdays', 'start_date'} & attrs.keys()
+        ):
+            raise serializers.ValidationError("The recurrence of a series with materialized occurrences can't change; end it with until and start a new series")
+        return attrs
+    
+    def create(self, validated_data):
+        validated_data['user'] = self.context['request'].user
+        return super().create(validated_data)
 
 # Vendor Serializers
-class VendorSerializer(serializers.ModelSerializer):
+class VendorSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Vendor
         fields = '__all__'
         read_only_fields = ['user', 'created_at', 'updated_at']
+        field_presets = {
+            'compact': ('id', 'name', 'category', 'email', 'phone', 'rating', 'price_range', 'is_preferred'),
+        }
     
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
@@ -123,6 +356,7 @@ class UserSubscriptionSerializer(serializers.ModelSerializer):
 
 class PaymentRequestSerializer(serializers.ModelSerializer):
     plan_name = serializers.CharField(source='plan.display_name', read_only=True)
+    user_email = serializers.EmailField(source='user.email', read_only=True)
     
     class Meta:
         model = PaymentRequest
@@ -140,4 +374,24 @@ class UserSettingsSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserSettings
         fields = '__all__'
-        read_only_fields = ['user', 'created_at', 'updated_at']
\ No newline at end of file
+        read_only_fields = ['user', 'created_at', 'updated_at']
+
+# Archive Serializers
+class ArchivedEventSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedEvent
+        fields = '__all__'
+        read_only_fields = [field.name for field in ArchivedEvent._meta.fields]
+
+class DeletionJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DeletionJob
+        exclude = ['user']
+
+# Diagnostics Serializers
+class RequestProfileSerializer(serializers.ModelSerializer):
+    requested_by = serializers.EmailField(source='requested_by.email', read_only=True, default=None)
+    
+    class Meta:
+        model = RequestProfile
+        exclude = ['report', 'stats']
@@ -0,0 +1,245 @@
+import calendar
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import generics, permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from .deletion import owned_events
+from .models import Event, BudgetItem, EventSeries
+from .serializers import EventSeriesSerializer
+from .timeseries import rebuild_event_stats, rebuild_user_stats
+
+# Occurrences are stored as Event rows this far ahead of today; anything
+# later is expanded on the fly by calendar queries.
+MATERIALIZE_DAYS = 90
+MAX_CALENDAR_DAYS = 400
+OCCURRENCE_BATCH_SIZE = 500
+
+
+def _add_months(day, months):
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def _weekdays(series):
+    return sorted(set(series.weekdays)) if series.weekdays else [series.start_date.weekday()]
+
+
+def _period_dates(series, period):
+    """Candidate dates in the ``period``-th repetition of the rule, in order"""
+    if series.frequency == 'daily':
+        return [series.start_date + timedelta(days=period * series.interval)]
+    if series.frequency == 'weekly':
+        week = series.start_date - timedelta(days=series.start_date.weekday()) + timedelta(weeks=period * series.interval)
+        return [week + timedelta(days=weekday) for weekday in _weekdays(series)]
+    # Monthly on the start date's day; short months use their last day
+    return [_add_months(series.start_date, period * series.interval)]
+
+
+def _period_before(series, day):
+    """Index of a period that ends before ``day``, as late as can be computed directly"""
+    start = series.start_date
+    if series.frequency == 'daily':
+        days = (day - start).days
+    elif series.frequency == 'weekly':
+        days = (day - (start - timedelta(days=start.weekday()))).days // 7
+    else:
+        days = (day.year - start.year) * 12 + day.month - start.month
+    return max(0, days // series.interval - 1)
+
+
+def occurrences(series, start, end):
+    """Dates on which ``series`` occurs between ``start`` and ``end`` inclusive.
+
+    Jumps straight to the period containing ``start`` instead of walking
+    the rule from the series start, so far-future ranges cost the same as
+    near ones. ``count`` limits are honoured by counting the skipped
+    occurrences arithmetically.
+    """
+    start = max(start, series.start_date)
+    if series.until:
+        end = min(end, series.until)
+    if start > end:
+        return
+
+    first = _period_before(series, start)
+    seen = 0
+    if first:
+        per_period = len(_period_dates(series, 1))
+        seen = len([day for day in _period_dates(series, 0) if day >= series.start_date]) + (first - 1) * per_period
+
+    period = first
+    while True:
+        for day in _period_dates(series, period):
+            if day < series.start_date:
+                continue
+            seen += 1
+            if series.count and seen > series.count:
+                return
+            if day > end:
+                return
+            if day >= start:
+                yield day
+        period += 1
+
+
+def _occurrence_fields(series):
+    return {
+        'user_id': series.user_id,
+        'series': series,
+        'name': series.name,
+        'category': series.category,
+        'description': series.description,
+        'time': series.time,
+        'venue': series.venue,
+        'address': series.address,
+        'budget': series.budget,
+        'expected_guests': series.expected_guests,
+    }
+
+
+def materialize(series, until=None):
+    """Create the ``Event`` rows for ``series`` up to ``until`` (default: the rolling window).
+
+    Occurrences and their template budget items are bulk-created, so the
+    rollups are rebuilt for what was added. Safe to call repeatedly and
+    concurrently: the series row is locked and existing dates are skipped.
+    Returns the new events.
+    """
+    until = until or timezone.localdate() + timedelta(days=MATERIALIZE_DAYS)
+    with transaction.atomic():
+        series = EventSeries.objects.select_related('template').select_for_update(of=('self',)).get(pk=series.pk)
+        if not series.is_active or (series.materialized_until and series.materialized_until >= until):
+            return []
+
+        start = series.materialized_until + timedelta(days=1) if series.materialized_until else series.start_date
+        existing = set(Event.objects.filter(series=series, date__range=(start, until)).values_list('date', flat=True))
+        fields = _occurrence_fields(series)
+        events = Event.objects.bulk_create(
+            [Event(date=day, **fields) for day in occurrences(series, start, until) if day not in existing],
+            batch_size=OCCURRENCE_BATCH_SIZE,
+        )
+        if events and events[0].pk is None:
+            # Backends that can't return ids from bulk inserts
+            events = list(Event.objects.filter(series=series, date__in=[event.date for event in events]))
+
+        template_items = series.template.budget_items if series.template else []
+        BudgetItem.objects.bulk_create(
+            [
+                BudgetItem(
+                    event=event,
+                    category=item['category'],
+                    item_name=item['item_name'],
+                    estimated_cost=Decimal(item['estimated_cost']),
+                    notes=item.get('notes', ''),
+                )
+                for event in events
+                for item in template_items
+            ],
+            batch_size=OCCURRENCE_BATCH_SIZE,
+        )
+
+        series.materialized_until = until
+        series.save(update_fields=['materialized_until', 'updated_at'])
+        if events:
+            rebuild_user_stats([series.user_id])
+            if template_items:
+                rebuild_event_stats([event.id for event in events])
+    return events
+
+
+def materialize_due(user=None, until=None):
+    """Materialize every active series whose window falls short of ``until``; returns the number of events created"""
+    until = until or timezone.localdate() + timedelta(days=MATERIALIZE_DAYS)
+    due = EventSeries.objects.filter(is_active=True).filter(
+        Q(materialized_until__isnull=True) | Q(materialized_until__lt=until)
+    )
+    if user is not None:
+        due = due.filter(user=user)
+    return sum(len(materialize(series, until)) for series in due)
+
+
+class EventSeriesListCreateView(generics.ListCreateAPIView):
+    serializer_class = EventSeriesSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return EventSeries.objects.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        materialize(serializer.save())
+        serializer.instance.refresh_from_db()
+
+class EventSeriesDetailView(generics.RetrieveUpdateDestroyAPIView):
+    """Detail changes apply to occurrences not yet materialized; existing events are left as edited"""
+    serializer_class = EventSeriesSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return EventSeries.objects.filter(user=self.request.user)
+
+    def perform_update(self, serializer):
+        materialize(serializer.save())
+        serializer.instance.refresh_from_db()
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def event_calendar(request):
+    """Events between ``start`` and ``end``, with series occurrences past the materialized window expanded virtually"""
+    try:
+        start = parse_date(request.query_params.get('start', ''))
+        end = parse_date(request.query_params.get('end', ''))
+    except ValueError:
+        # Well formed but not a real date, like 2024-02-30
+        start = end = None
+    if start is None or end is None:
+        return Response({
+            'message': 'start and end must be dates in YYYY-MM-DD format'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if end < start or (end - start).days > MAX_CALENDAR_DAYS:
+        return Response({
+            'message': f'end must be after start and at most {MAX_CALENDAR_DAYS} days later'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    materialize_due(request.user)
+
+    entries = [
+        {**event, 'virtual': False}
+        for event in owned_events(request.user).filter(date__range=(start, end)).values(
+            'id', 'name', 'date', 'time', 'venue', 'category', 'status', 'series'
+        )
+    ]
+    series_list = EventSeries.objects.filter(user=request.user, is_active=True, start_date__lte=end).filter(
+        Q(until__isnull=True) | Q(until__gte=start)
+    )
+    for series in series_list:
+        virtual_start = max(start, series.materialized_until + timedelta(days=1)) if series.materialized_until else start
+        entries.extend(
+            {
+                'id': None,
+                'name': series.name,
+                'date': day,
+                'time': series.time,
+                'venue': series.venue,
+                'category': series.category,
+                'status': 'planning',
+                'series': series.id,
+                'virtual': True,
+            }
+            for day in occurrences(series, virtual_start, end)
+        )
+    entries.sort(key=lambda entry: (entry['date'], entry['time']))
+
+    return Response({
+        'start': start,
+        'end': end,
+        'events': entries
+    })
@@ -0,0 +1,171 @@
+from django.db.models.signals import post_init, pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from . import live, sync, timeseries
+from .deletion import bulk_deleted, deletion_completed
+from .models import Event, BudgetItem, Guest
+
+
+# Remember the loaded values the rollups depend on, so updates can apply
+# deltas. Read from __dict__ so deferred fields aren't fetched here; the
+# pre_save handlers below fetch them only when such an instance is saved.
+@receiver(post_init, sender=BudgetItem)
+def snapshot_budget_item(sender, instance, **kwargs):
+    instance._stats_snapshot = (instance.__dict__.get('event_id'), instance.__dict__.get('actual_cost'))
+
+
+@receiver(post_init, sender=Guest)
+def snapshot_guest(sender, instance, **kwargs):
+    values = instance.__dict__
+    instance._stats_snapshot = (values.get('event_id'), values.get('plus_ones'))
+    instance._live_snapshot = (
+        values.get('event_id'),
+        (values.get('rsvp_status'), values.get('checked_in'), values.get('plus_ones')),
+    )
+    instance._sync_event_id = values.get('event_id')
+
+
+def _live_state(guest):
+    return (guest.rsvp_status, guest.checked_in, guest.plus_ones)
+
+
+def _stored_values(instance, fields):
+    return type(instance)._base_manager.filter(pk=instance.pk).values(*fields).first()
+
+
+# An instance loaded with .only() or .defer() has gaps in its snapshots.
+# Fill them from the row before the save overwrites it, so the deltas
+# stay right whatever fields are assigned.
+@receiver(pre_save, sender=BudgetItem)
+def fill_budget_item_snapshot(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding or None not in instance._stats_snapshot:
+        return
+    row = _stored_values(instance, ('event_id', 'actual_cost'))
+    if row is not None:
+        instance._stats_snapshot = (row['event_id'], row['actual_cost'])
+
+
+@receiver(pre_save, sender=Guest)
+def fill_guest_snapshot(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        return
+    live_event_id, live_state = instance._live_snapshot
+    if None not in (*instance._stats_snapshot, live_event_id, *live_state, instance._sync_event_id):
+        return
+    row = _stored_values(instance, ('event_id', 'rsvp_status', 'checked_in', 'plus_ones'))
+    if row is not None:
+        instance._stats_snapshot = (row['event_id'], row['plus_ones'])
+        instance._live_snapshot = (row['event_id'], (row['rsvp_status'], row['checked_in'], row['plus_ones']))
+        instance._sync_event_id = row['event_id']
+
+
+@receiver(post_save, sender=Event)
+def count_created_event(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        timeseries.record_event(instance.user_id, instance.created_at)
+
+
+@receiver(post_save, sender=BudgetItem)
+def update_budget_stats(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        timeseries.record_budget_item(instance.event_id, instance.created_at, amount=instance.actual_cost)
+    else:
+        old_event_id, old_cost = instance._stats_snapshot
+        if old_event_id is None or old_cost is None:
+            return
+        if old_event_id != instance.event_id:
+            timeseries.record_budget_item(old_event_id, instance.created_at, sign=-1, amount=-old_cost)
+            timeseries.record_budget_item(instance.event_id, instance.created_at, amount=instance.actual_cost)
+        elif old_cost != instance.actual_cost:
+            timeseries.record_budget_item(instance.event_id, instance.created_at, sign=0,
+                                          amount=instance.actual_cost - old_cost)
+    instance._stats_snapshot = (instance.event_id, instance.actual_cost)
+
+
+@receiver(post_save, sender=Guest)
+def update_guest_stats(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        timeseries.record_guest(instance.event_id, instance.created_at, attendees=1 + instance.plus_ones)
+    else:
+        old_event_id, old_plus_ones = instance._stats_snapshot
+        if old_event_id is None or old_plus_ones is None:
+            return
+        if old_event_id != instance.event_id:
+            timeseries.record_guest(old_event_id, instance.created_at, sign=-1, attendees=-(1 + old_plus_ones))
+            timeseries.record_guest(instance.event_id, instance.created_at, attendees=1 + instance.plus_ones)
+        elif old_plus_ones != instance.plus_ones:
+            timeseries.record_guest(instance.event_id, instance.created_at, sign=0,
+                                    attendees=instance.plus_ones - old_plus_ones)
+    instance._stats_snapshot = (instance.event_id, instance.plus_ones)
+
+
+@receiver(post_save, sender=Guest)
+def publish_guest_counters(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_event_id, old_state = (None, None) if created else instance._live_snapshot
+    if old_state is not None and None in old_state:
+        return
+    if old_state is not None and old_event_id != instance.event_id:
+        # The old event numbers the move later (record_moved_guest), so its
+        # subscribers re-read rather than get a delta without a number
+        live.resync_guest_counters(old_event_id)
+        old_state = None
+    live.publish_guest_change(instance.event_id, instance.sync_seq, old_state, _live_state(instance))
+    instance._live_snapshot = (instance.event_id, _live_state(instance))
+
+
+@receiver(post_save, sender=Guest)
+def record_moved_guest(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_event_id = None if created else instance._sync_event_id
+    if old_event_id is not None and old_event_id != instance.event_id:
+        sync.record_removed_guests(old_event_id, [instance.id])
+    instance._sync_event_id = instance.event_id
+
+
+def _deleted_directly(sender, origin):
+    return isinstance(origin, sender) or getattr(origin, 'model', None) is sender
+
+
+# Deleting an event (or its owner) cascades to the rollup rows, so only
+# deletions that start from the rows themselves are subtracted.
+@receiver(post_delete, sender=Event)
+def remove_created_event(sender, instance, origin=None, **kwargs):
+    if not _deleted_directly(sender, origin):
+        return
+    timeseries.record_event(instance.user_id, instance.created_at, sign=-1)
+
+
+@receiver(post_delete, sender=BudgetItem)
+def remove_budget_stats(sender, instance, origin=None, **kwargs):
+    if not _deleted_directly(sender, origin):
+        return
+    timeseries.record_budget_item(instance.event_id, instance.created_at, sign=-1, amount=-instance.actual_cost)
+
+
+@receiver(post_delete, sender=Guest)
+def remove_guest_stats(sender, instance, origin=None, **kwargs):
+    if not _deleted_directly(sender, origin):
+        return
+    timeseries.record_guest(instance.event_id, instance.created_at, sign=-1, attendees=-(1 + instance.plus_ones))
+    change = sync.record_removed_guests(instance.event_id, [instance.id])
+    live.publish_guest_change(instance.event_id, change, _live_state(instance), None)
+
+
+@receiver(bulk_deleted, sender=Event)
+def resync_deleted_event_counters(sender, pks, **kwargs):
+    for event_id in pks:
+        live.resync_guest_counters(event_id)
+
+
+# A queued event keeps its count until the job has really deleted it. By
+# then the row is gone, so the owner's counts are recomputed instead.
+@receiver(deletion_completed, sender=Event)
+def remove_event_deleted_by_job(sender, job, **kwargs):
+    timeseries.rebuild_user_stats([job.user_id])
@@ -0,0 +1,228 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import permissions, serializers, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from .live import resync_guest_counters
+from .deletion import owned_events
+from .models import Event, Guest, GuestTombstone, next_guest_sync_seq
+from .serializers import GuestListSerializer
+
+TOKEN_SALT = 'api.sync'
+SYNC_PAGE_SIZE = 1000
+MAX_SYNC_PAGE_SIZE = 5000
+MAX_SYNC_MUTATIONS = 1000
+# Before any change: sorts ahead of every (sync_seq, id)
+START = (-1, 0)
+
+
+def sync_token(event_id, cursor):
+    """The token a client sends back to get the changes after ``cursor``, a ``(sync_seq, guest id)`` pair"""
+    return signing.dumps({'e': event_id, 's': cursor[0], 'g': cursor[1]}, salt=TOKEN_SALT)
+
+
+def _token_cursor(token, event):
+    """The cursor in ``token``, or ``None`` when the client has to start over.
+
+    Tokens expire with the tombstones (``SYNC_TOMBSTONE_DAYS``), so a client
+    that stayed away longer can't miss a deletion. A cursor ahead of the
+    event's counter means the guest list was renumbered (restored from the
+    archive) since the token was issued.
+    """
+    try:
+        data = signing.loads(token, salt=TOKEN_SALT, max_age=timedelta(days=settings.SYNC_TOMBSTONE_DAYS))
+        cursor = (int(data['s']), int(data['g']))
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        return None
+    if data.get('e') != event.id or cursor[0] > event.guest_sync_seq:
+        return None
+    return cursor
+
+
+def _after(cursor, id_field):
+    seq, last_id = cursor
+    return Q(sync_seq__gt=seq) | Q(sync_seq=seq, **{f'{id_field}__gt': last_id})
+
+
+def record_removed_guests(event_id, guest_ids):
+    """Leave tombstones for guests that are no longer on ``event_id``'s list; returns their change number"""
+    if not guest_ids:
+        return None
+    seq = next_guest_sync_seq(event_id)
+    GuestTombstone.objects.bulk_create([
+        GuestTombstone(event_id=event_id, guest_id=guest_id, sync_seq=seq) for guest_id in guest_ids
+    ])
+    return seq
+
+
+def prune_tombstones(days=None):
+    """Delete tombstones older than any token still accepted; returns how many"""
+    cutoff = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS if days is None else days)
+    deleted, _ = GuestTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
+
+
+def changes_since(event, cursor, limit):
+    """Guests written and removed after ``cursor``, in change order, at most ``limit`` of both together.
+
+    Returns ``(guest rows, removed ids, next cursor, has_more)``. Each side
+    is read through its ``(event, sync_seq, id)`` index and cut at ``limit``
+    before merging, so a page costs two range scans however large the list.
+    """
+    guests = list(GuestListSerializer.prepare(
+        Guest.objects.filter(event=event).filter(_after(cursor, 'id')).order_by('sync_seq', 'id')
+    )[:limit + 1])
+    # A client starting from scratch has nothing to remove
+    removed = [] if cursor == START else list(
+        GuestTombstone.objects.filter(event=event).filter(_after(cursor, 'guest_id'))
+        .order_by('sync_seq', 'guest_id').values_list('sync_seq', 'guest_id')[:limit + 1]
+    )
+    changes = sorted(
+        [((row['sync_seq'], row['id']), row) for row in guests] + [(key, None) for key in removed],
+        key=lambda change: change[0],
+    )
+    page = changes[:limit]
+    next_cursor = page[-1][0] if page else cursor
+    return (
+        [row for _, row in page if row is not None],
+        [key[1] for key, row in page if row is None],
+        next_cursor,
+        len(changes) > limit,
+    )
+
+
+class CheckInMutationSerializer(serializers.Serializer):
+    guest = serializers.IntegerField()
+    checked_in = serializers.BooleanField()
+    check_in_time = serializers.DateTimeField(required=False, allow_null=True)
+    base_seq = serializers.IntegerField(min_value=0, help_text='sync_seq of the guest when the client last saw it')
+
+
+def apply_check_ins(event, mutations):
+    """Apply offline check-in mutations in order; returns ``(results, changed guest ids)``.
+
+    Conflict rules, per mutation:
+
+    * the guest was deleted or moved to another event: ``rejected``;
+    * checking in always wins; if another device already checked the
+      guest in, the earlier time is kept: ``merged``;
+    * undoing a check-in only applies if nobody wrote the guest after
+      ``base_seq``, otherwise the server state stands: ``conflict``;
+    * a mutation that changes nothing is ``unchanged``.
+
+    All changes get one new change number and are written with one
+    ``bulk_update``.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        guests = {
+            guest.id: guest
+            for guest in Guest.objects.select_for_update().filter(event=event, id__in={m['guest'] for m in mutations})
+        }
+        results, changed = [], set()
+        for index, mutation in enumerate(mutations):
+            guest = guests.get(mutation['guest'])
+            result = {'index': index, 'guest': mutation['guest']}
+            if guest is None:
+                results.append({**result, 'status': 'rejected', 'reason': 'deleted'})
+                continue
+            if mutation['checked_in']:
+                checked_in_at = min(mutation.get('check_in_time') or now, now)
+                if not guest.checked_in:
+                    guest.checked_in, guest.check_in_time = True, checked_in_at
+                    outcome = 'applied'
+                elif guest.check_in_time is None or checked_in_at < guest.check_in_time:
+                    guest.check_in_time = checked_in_at
+                    outcome = 'merged'
+                else:
+                    outcome = 'unchanged'
+            elif not guest.checked_in:
+                outcome = 'unchanged'
+            elif guest.sync_seq > mutation['base_seq']:
+                outcome = 'conflict'
+            else:
+                guest.checked_in, guest.check_in_time = False, None
+                outcome = 'applied'
+            if outcome in ('applied', 'merged'):
+                changed.add(guest.id)
+            results.append({**result, 'status': outcome})
+
+        if changed:
+            seq = next_guest_sync_seq(event.id)
+            rows = [guests[guest_id] for guest_id in changed]
+            for guest in rows:
+                guest.sync_seq, guest.updated_at = seq, now
+            Guest.objects.bulk_update(rows, ['checked_in', 'check_in_time', 'sync_seq', 'updated_at'])
+            resync_guest_counters(event.id)
+    return results, changed
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([permissions.IsAuthenticated])
+def event_guest_sync(request, event_id):
+    """Delta sync of an event's guest list for offline clients.
+
+    GET with no ``token`` starts a full download; every response carries a
+    ``token`` for the next call, which returns only guests written and ids
+    removed since. Follow ``has_more`` until it is false. ``reset`` tells
+    the client to drop its copy first: its token expired or no longer fits.
+
+    POST ``{"mutations": [{"guest", "checked_in", "check_in_time", "base_seq"}]}``
+    uploads check-ins recorded offline; see ``apply_check_ins`` for how
+    conflicts resolve. The current rows of the guests involved come back.
+    """
+    try:
+        event = owned_events(request.user).get(id=event_id)
+    except Event.DoesNotExist:
+        return Response({
+            'message': 'Event not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    if request.method == 'POST':
+        mutations = request.data.get('mutations')
+        if not isinstance(mutations, list) or not mutations:
+            return Response({
+                'message': 'mutations must be a non-empty list'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if len(mutations) > MAX_SYNC_MUTATIONS:
+            return Response({
+                'message': f'At most {MAX_SYNC_MUTATIONS} mutations can be sent at once'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        serializer = CheckInMutationSerializer(data=mutations, many=True)
+        if not serializer.is_valid():
+            return Response({
+                'message': 'Invalid mutations',
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        results, changed = apply_check_ins(event, serializer.validated_data)
+        involved = {mutation['guest'] for mutation in serializer.validated_data}
+        return Response({
+            'message': f'{len(changed)} guests updated',
+            'results': results,
+            'guests': GuestListSerializer.render(GuestListSerializer.prepare(Guest.objects.filter(event=event, id__in=involved)))
+        })
+
+    try:
+        limit = min(int(request.query_params.get('limit', SYNC_PAGE_SIZE)), MAX_SYNC_PAGE_SIZE)
+    except ValueError:
+        limit = SYNC_PAGE_SIZE
+    limit = max(limit, 1)
+    token = request.query_params.get('token')
+    cursor = _token_cursor(token, event) if token else None
+    reset = bool(token) and cursor is None
+
+    guests, removed, next_cursor, has_more = changes_since(event, cursor or START, limit)
+    return Response({
+        'token': sync_token(event.id, next_cursor),
+        'reset': reset,
+        'has_more': has_more,
+        'guests': GuestListSerializer.render(guests),
+        'deleted': removed
+    })
@@ -1,3 +1,464 @@
-from django.test import TestCase
+from datetime import date, time, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .deletion import bulk_deleted, fast_delete, run_deletion_job
+from .models import (
+    User, Event, BudgetItem, Guest, Vendor, Contact, GuestTombstone, SubscriptionPlan, UserSubscription,
+    PaymentRequest, PaymentHistory, Table, SeatAssignment, DeletionJob, EventDailyStats, UserDailyStats,
+)
+from .sync import START, apply_check_ins, changes_since, sync_token, _token_cursor
+
+
+def make_user(email, **extra):
+    return User.objects.create_user(
+        username=email, email=email, password='password', business_name='Test', business_type='Other',
+        city='Dhaka', **extra,
+    )
+
+
+def make_event(user, **extra):
+    fields = {
+        'name': 'Wedding', 'category': 'wedding', 'date': date(2030, 1, 1), 'time': time(18),
+        'venue': 'Hall', 'budget': 1000, 'expected_guests': 100, **extra,
+    }
+    return Event.objects.create(user=user, **fields)
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+class GuestSyncTests(TestCase):
+    def setUp(self):
+        self.user = make_user('sync@example.com')
+        self.event = make_event(self.user)
+        self.guests = [Guest.objects.create(event=self.event, name=f'Guest {i}') for i in range(5)]
+
+    def sync(self, token=None, limit=None):
+        params = {key: value for key, value in (('token', token), ('limit', limit)) if value is not None}
+        response = client_for(self.user).get(reverse('event-guest-sync', args=[self.event.id]), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_token_round_trip(self):
+        self.event.refresh_from_db()
+        cursor = (self.event.guest_sync_seq, self.guests[-1].id)
+        self.assertEqual(_token_cursor(sync_token(self.event.id, cursor), self.event), cursor)
+
+    def test_token_rejected_for_other_event_tampering_or_renumbering(self):
+        self.event.refresh_from_db()
+        other = make_event(self.user, name='Other')
+        self.assertIsNone(_token_cursor(sync_token(other.id, (0, 0)), self.event))
+        self.assertIsNone(_token_cursor(sync_token(self.event.id, (0, 0)) + 'x', self.event))
+        # A cursor ahead of the event's counter: the list was renumbered since
+        self.assertIsNone(_token_cursor(sync_token(self.event.id, (self.event.guest_sync_seq + 1, 0)), self.event))
+
+    def test_full_download_in_pages(self):
+        seen, token, pages = [], None, 0
+        while True:
+            page = self.sync(token, limit=2)
+            pages += 1
+            seen += [guest['id'] for guest in page['guests']]
+            self.assertFalse(page['reset'])
+            self.assertEqual(page['deleted'], [])
+            token = page['token']
+            if not page['has_more']:
+                break
+        self.assertEqual(pages, 3)
+        self.assertEqual(seen, [guest.id for guest in self.guests])
+        # Nothing changed since the last page
+        self.assertEqual(self.sync(token)['guests'], [])
+
+    def test_changes_and_removals_merge_in_change_order(self):
+        token = self.sync()['token']
+        deleted_id = self.guests[1].id
+        self.guests[1].delete()
+        self.guests[3].notes = 'changed'
+        self.guests[3].save()
+        moved = self.guests[4]
+        moved.event = make_event(self.user, name='Other')
+        moved.save()
+
+        page = self.sync(token)
+        self.assertEqual([guest['id'] for guest in page['guests']], [self.guests[3].id])
+        self.assertEqual(page['deleted'], [deleted_id, moved.id])
+
+        self.event.refresh_from_db()
+        guests, removed, cursor, has_more = changes_since(self.event, _token_cursor(token, self.event), limit=2)
+        # The deletion came first, then the edit; the move is on the next page
+        self.assertEqual(([row['id'] for row in guests], removed, has_more), ([self.guests[3].id], [deleted_id], True))
+        self.assertEqual(cursor[1], self.guests[3].id)
+
+    def test_first_download_skips_tombstones(self):
+        deleted_id = self.guests[0].id
+        self.guests[0].delete()
+        self.assertTrue(GuestTombstone.objects.filter(event=self.event, guest_id=deleted_id).exists())
+        guests, removed, _, _ = changes_since(self.event, START, limit=100)
+        self.assertEqual(removed, [])
+        self.assertEqual(len(guests), 4)
+
+    def test_stale_token_resets(self):
+        other = make_event(self.user, name='Other')
+        page = self.sync(sync_token(other.id, (0, 0)))
+        self.assertTrue(page['reset'])
+        self.assertEqual(len(page['guests']), 5)
+
+
+class CheckInConflictTests(TestCase):
+    def setUp(self):
+        self.user = make_user('checkin@example.com')
+        self.event = make_event(self.user)
+        self.now = timezone.now()
+
+    def guest(self, **fields):
+        return Guest.objects.create(event=self.event, name='Guest', **fields)
+
+    def apply(self, *mutations):
+        results, changed = apply_check_ins(self.event, list(mutations))
+        return [result['status'] for result in results], changed
+
+    def test_check_in_applies(self):
+        guest = self.guest()
+        statuses, changed = self.apply({'guest': guest.id, 'checked_in': True, 'base_seq': guest.sync_seq})
+        guest.refresh_from_db()
+        self.assertEqual((statuses, changed), (['applied'], {guest.id}))
+        self.assertTrue(guest.checked_in)
+        self.event.refresh_from_db()
+        self.assertEqual(guest.sync_seq, self.event.guest_sync_seq)
+
+    def test_second_check_in_keeps_earliest_time(self):
+        first = self.now - timedelta(hours=1)
+        guest = self.guest(checked_in=True, check_in_time=first)
+        statuses, _ = self.apply(
+            {'guest': guest.id, 'checked_in': True, 'check_in_time': self.now - timedelta(minutes=5), 'base_seq': 0},
+            {'guest': guest.id, 'checked_in': True, 'check_in_time': first - timedelta(minutes=5), 'base_seq': 0},
+        )
+        guest.refresh_from_db()
+        self.assertEqual(statuses, ['unchanged', 'merged'])
+        self.assertEqual(guest.check_in_time, first - timedelta(minutes=5))
+
+    def test_check_in_time_in_the_future_is_clamped(self):
+        guest = self.guest()
+        self.apply({'guest': guest.id, 'checked_in': True, 'check_in_time': self.now + timedelta(days=1), 'base_seq': 0})
+        guest.refresh_from_db()
+        self.assertLessEqual(guest.check_in_time, timezone.now())
+
+    def test_undo_only_applies_to_the_version_seen(self):
+        guest = self.guest(checked_in=True, check_in_time=self.now)
+        stale = guest.sync_seq - 1
+        statuses, changed = self.apply({'guest': guest.id, 'checked_in': False, 'base_seq': stale})
+        guest.refresh_from_db()
+        self.assertEqual((statuses, changed), (['conflict'], set()))
+        self.assertTrue(guest.checked_in)
+
+        statuses, _ = self.apply({'guest': guest.id, 'checked_in': False, 'base_seq': guest.sync_seq})
+        guest.refresh_from_db()
+        self.assertEqual(statuses, ['applied'])
+        self.assertFalse(guest.checked_in)
+        self.assertIsNone(guest.check_in_time)
+
+    def test_undo_of_guest_not_checked_in_is_unchanged(self):
+        guest = self.guest()
+        seq = guest.sync_seq
+        statuses, changed = self.apply({'guest': guest.id, 'checked_in': False, 'base_seq': 0})
+        guest.refresh_from_db()
+        self.assertEqual((statuses, changed, guest.sync_seq), (['unchanged'], set(), seq))
+
+    def test_deleted_or_moved_guest_is_rejected(self):
+        deleted, moved = self.guest(), self.guest()
+        deleted_id = deleted.id
+        deleted.delete()
+        moved.event = make_event(self.user, name='Other')
+        moved.save()
+        statuses, _ = self.apply(
+            {'guest': deleted_id, 'checked_in': True, 'base_seq': 0},
+            {'guest': moved.id, 'checked_in': True, 'base_seq': 0},
+        )
+        self.assertEqual(statuses, ['rejected', 'rejected'])
+        moved.refresh_from_db()
+        self.assertFalse(moved.checked_in)
+
+    def test_endpoint_validates_mutations(self):
+        client = client_for(self.user)
+        url = reverse('event-guest-sync', args=[self.event.id])
+        self.assertEqual(client.post(url, {'mutations': []}, format='json').status_code, 400)
+        response = client.post(url, {'mutations': [{'guest': 'x', 'checked_in': True, 'base_seq': 0}]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        guest = self.guest()
+        response = client.post(url, {'mutations': [{'guest': guest.id, 'checked_in': True, 'base_seq': 0}]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['status'], 'applied')
+        self.assertTrue(response.json()['guests'][0]['checked_in'])
+
+
+@override_settings(THROTTLE_ENABLED=False)
+class BulkPaymentReviewTests(TestCase):
+    def setUp(self):
+        self.admin = make_user('admin@example.com', is_staff=True)
+        self.plans = {
+            name: SubscriptionPlan.objects.create(
+                name=name, display_name=name.title(), description='', price_monthly=10, price_yearly=100,
+                max_events=10, max_guests_per_event=100, max_vendors=10,
+            )
+            for name in ('basic', 'pro')
+        }
+        self.alice = make_user('alice@example.com')
+        self.bob = make_user('bob@example.com')
+
+    def payment_request(self, user, plan, status='submitted', billing_cycle='monthly'):
+        return PaymentRequest.objects.create(
+            user=user, plan=self.plans[plan], billing_cycle=billing_cycle, amount=Decimal('10.00'),
+            payment_method='cash', status=status,
+        )
+
+    def review(self, ids, action='approve'):
+        return client_for(self.admin).post(
+            reverse('bulk_review_payment_requests'), {'ids': ids, 'action': action, 'admin_notes': 'ok'}, format='json',
+        )
+
+    def test_approves_and_activates_latest_plan_per_user(self):
+        older = self.payment_request(self.alice, 'basic')
+        newer = self.payment_request(self.alice, 'pro', billing_cycle='yearly')
+        bobs = self.payment_request(self.bob, 'basic', status='pending')
+        reviewed = self.payment_request(self.bob, 'pro', status='rejected')
+
+        response = self.review([older.id, newer.id, bobs.id, reviewed.id, 999999])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['processed'], sorted([older.id, newer.id, bobs.id]))
+        self.assertEqual(response.json()['skipped'], sorted([reviewed.id, 999999]))
+
+        self.assertEqual(PaymentRequest.objects.filter(status='approved').count(), 3)
+        subscription = UserSubscription.objects.get(user=self.alice)
+        self.assertEqual((subscription.plan.name, subscription.billing_cycle, subscription.status), ('pro', 'yearly', 'active'))
+        self.assertEqual(UserSubscription.objects.get(user=self.bob).plan.name, 'basic')
+        self.alice.refresh_from_db()
+        self.bob.refresh_from_db()
+        self.assertEqual((self.alice.subscription_plan, self.bob.subscription_plan), ('pro', 'basic'))
+        self.assertEqual(PaymentHistory.objects.filter(user=self.alice).count(), 2)
+
+    def test_existing_subscription_is_updated_in_place(self):
+        self.review([self.payment_request(self.alice, 'basic').id])
+        first = UserSubscription.objects.get(user=self.alice)
+        self.review([self.payment_request(self.alice, 'pro').id])
+        self.assertEqual(UserSubscription.objects.filter(user=self.alice).count(), 1)
+        self.assertEqual(UserSubscription.objects.get(user=self.alice).id, first.id)
+        self.assertEqual(UserSubscription.objects.get(user=self.alice).plan.name, 'pro')
+
+    def test_reject(self):
+        payment_request = self.payment_request(self.alice, 'basic')
+        response = self.review([payment_request.id], action='reject')
+        self.assertEqual(response.json()['processed'], [payment_request.id])
+        payment_request.refresh_from_db()
+        self.assertEqual(payment_request.status, 'rejected')
+        self.assertFalse(UserSubscription.objects.filter(user=self.alice).exists())
+
+    def test_single_review_only_of_open_requests(self):
+        client = client_for(self.admin)
+        rejected = self.payment_request(self.alice, 'pro', status='rejected')
+        approved = self.payment_request(self.bob, 'basic', status='approved')
+        for payment_request in (rejected, approved):
+            for name in ('approve_payment_request', 'reject_payment_request'):
+                response = client.post(reverse(name, args=[payment_request.id]), {}, format='json')
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(PaymentRequest.objects.get(id=rejected.id).status, 'rejected')
+        self.assertEqual(PaymentRequest.objects.get(id=approved.id).status, 'approved')
+        self.assertFalse(UserSubscription.objects.exists())
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.review([1], action='delete').status_code, 400)
+        self.assertEqual(self.review([]).status_code, 400)
+        self.assertEqual(self.review(['x']).status_code, 400)
+        user_client = client_for(self.alice)
+        self.assertEqual(user_client.post(reverse('bulk_review_payment_requests'), {}, format='json').status_code, 403)
+
+
+@override_settings(THROTTLE_ENABLED=False)
+class BudgetSheetConcurrencyTests(TestCase):
+    def setUp(self):
+        self.user = make_user('budget@example.com')
+        self.event = make_event(self.user)
+        self.items = [
+            BudgetItem.objects.create(event=self.event, category='venue', item_name=f'Item {i}', estimated_cost=100)
+            for i in range(3)
+        ]
+        self.url = reverse('event-budget-bulk', args=[self.event.id])
+
+    def save(self, body):
+        return client_for(self.user).post(self.url, body, format='json')
+
+    def row(self, item, **changes):
+        return {'id': item.id, 'updated_at': item.updated_at.isoformat(), **changes}
+
+    def test_saves_with_current_versions(self):
+        response = self.save({
+            'items': [self.row(self.items[0], notes='a'), self.row(self.items[1], actual_cost='40.00'), {'category': 'gifts', 'item_name': 'New', 'estimated_cost': '5.00'}],
+            'delete': [self.row(self.items[2])],
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['updated'], sorted([self.items[0].id, self.items[1].id]))
+        self.assertEqual(response.json()['deleted'], [self.items[2].id])
+        self.assertEqual(len(response.json()['created']), 1)
+        self.items[0].refresh_from_db()
+        self.items[1].refresh_from_db()
+        self.assertEqual((self.items[0].notes, self.items[1].actual_cost), ('a', Decimal('40.00')))
+
+    def test_stale_row_fails_whole_save_with_409(self):
+        stale = self.row(self.items[0], notes='mine')
+        BudgetItem.objects.filter(id=self.items[0].id).update(notes='theirs', updated_at=timezone.now() + timedelta(seconds=1))
+
+        response = self.save({
+            'items': [stale, self.row(self.items[1], notes='also mine'), {'category': 'gifts', 'item_name': 'New', 'estimated_cost': '5.00'}],
+            'delete': [self.row(self.items[2])],
+        })
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual([row['id'] for row in response.json()['conflicts']], [self.items[0].id])
+        self.assertEqual(response.json()['conflicts'][0]['notes'], 'theirs')
+        # Nothing was written
+        self.assertEqual(BudgetItem.objects.filter(event=self.event).count(), 3)
+        self.items[1].refresh_from_db()
+        self.assertEqual(self.items[1].notes, '')
+
+    def test_replace_keeps_rows_changed_after_as_of(self):
+        as_of = timezone.now()
+        BudgetItem.objects.filter(id=self.items[2].id).update(updated_at=as_of + timedelta(seconds=1))
+        response = self.save({'items': [self.row(self.items[0])], 'replace': True, 'as_of': as_of.isoformat()})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual([row['id'] for row in response.json()['conflicts']], [self.items[2].id])
+
+        response = self.save({'items': [self.row(self.items[0])], 'replace': True})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['deleted'], sorted([self.items[1].id, self.items[2].id]))
+
+    def test_update_needs_updated_at(self):
+        response = self.save({'items': [{'id': self.items[0].id, 'notes': 'x'}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('0', response.json()['errors'])
+
+
+class FastDeleteTests(TestCase):
+    def setUp(self):
+        self.user = make_user('delete@example.com')
+        self.event = make_event(self.user)
+        self.vendor = Vendor.objects.create(user=self.user, name='Caterer', category='catering')
+        self.contact = Contact.objects.create(user=self.user, name='Friend', phone='01700000000')
+        self.guests = [Guest.objects.create(event=self.event, name=f'Guest {i}', contact=self.contact) for i in range(5)]
+        self.items = [
+            BudgetItem.objects.create(event=self.event, category='catering', item_name=f'Item {i}', estimated_cost=10, vendor=self.vendor)
+            for i in range(3)
+        ]
+        table = Table.objects.create(event=self.event, name='T1', capacity=10)
+        SeatAssignment.objects.create(event=self.event, table=table, guest=self.guests[0])
+
+    def test_cascades_through_every_level_in_batches(self):
+        deleted = []
+
+        def listener(sender, pks, **kwargs):
+            deleted.append((sender, list(pks)))
+
+        bulk_deleted.connect(listener)
+        try:
+            counts = fast_delete(Event.objects.filter(id=self.event.id), batch_size=2)
+        finally:
+            bulk_deleted.disconnect(listener)
+
+        self.assertFalse(Event.objects.filter(id=self.event.id).exists())
+        self.assertFalse(Guest.objects.filter(id__in=[guest.id for guest in self.guests]).exists())
+        self.assertFalse(BudgetItem.objects.filter(id__in=[item.id for item in self.items]).exists())
+        self.assertFalse(SeatAssignment.objects.exists())
+        self.assertFalse(Table.objects.exists())
+        self.assertEqual((counts['api.Event'], counts['api.Guest'], counts['api.BudgetItem']), (1, 5, 3))
+        # Guests go in batches of two, each reported after it commits
+        self.assertEqual([len(pks) for sender, pks in deleted if sender is Guest], [2, 2, 1])
+        # Rows outside the event survive
+        self.assertTrue(Contact.objects.filter(id=self.contact.id).exists())
+        self.assertTrue(Vendor.objects.filter(id=self.vendor.id).exists())
+
+    def test_set_null_relations_are_cleared(self):
+        fast_delete(Vendor.objects.filter(id=self.vendor.id))
+        self.assertEqual(BudgetItem.objects.filter(event=self.event).count(), 3)
+        self.assertFalse(BudgetItem.objects.filter(vendor__isnull=False).exists())
+
+        fast_delete(Contact.objects.filter(id=self.contact.id))
+        self.assertEqual(Guest.objects.filter(event=self.event).count(), 5)
+        self.assertFalse(Guest.objects.filter(contact__isnull=False).exists())
+
+    def test_deleting_children_leaves_parent(self):
+        fast_delete(Guest.objects.filter(id__in=[guest.id for guest in self.guests[:2]]))
+        self.assertEqual(Guest.objects.filter(event=self.event).count(), 3)
+        self.assertFalse(SeatAssignment.objects.exists())
+        self.assertTrue(Table.objects.filter(event=self.event).exists())
+
+
+@override_settings(THROTTLE_ENABLED=False)
+class DeletionJobTests(TestCase):
+    def setUp(self):
+        self.user = make_user('job@example.com')
+        self.event = make_event(self.user)
+        self.guest = Guest.objects.create(event=self.event, name='Guest')
+        self.job = DeletionJob.objects.create(user=self.user, model='api.Event', object_id=self.event.id, object_repr='Wedding')
+
+    def events_created(self):
+        return sum(UserDailyStats.objects.filter(user=self.user).values_list('events_created', flat=True))
+
+    def test_queued_event_is_hidden_everywhere(self):
+        client = client_for(self.user)
+        self.assertEqual(client.get(reverse('event-detail', args=[self.event.id])).status_code, 404)
+        self.assertEqual(client.get(reverse('guest-list-create')).json()['results'], [])
+        self.assertEqual(client.get(reverse('guest-detail', args=[self.guest.id])).status_code, 404)
+        response = client.post(reverse('event-budget-bulk', args=[self.event.id]), {'items': []}, format='json')
+        self.assertEqual(response.status_code, 404)
+        response = client.post(reverse('guest-list-create'), {'event': self.event.id, 'name': 'Late', 'category': 'friends'}, format='json')
+        self.assertEqual((response.status_code, list(response.json())), (400, ['event']))
+
+    def test_event_counted_until_the_job_deletes_it(self):
+        self.assertEqual(self.events_created(), 1)
+        run_deletion_job(self.job.id)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, 'completed')
+        self.assertFalse(Event.objects.filter(id=self.event.id).exists())
+        self.assertEqual(self.events_created(), 0)
+
+    def test_failed_job_keeps_the_count(self):
+        with mock.patch('api.deletion.fast_delete', side_effect=RuntimeError('disk full')):
+            run_deletion_job(self.job.id)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, 'failed')
+        self.assertEqual(self.events_created(), 1)
+
+
+class DeferredSaveRollupTests(TestCase):
+    def setUp(self):
+        self.user = make_user('rollup@example.com')
+        self.event = make_event(self.user)
+        self.other = make_event(self.user, name='Other')
+
+    def stats(self, event):
+        return EventDailyStats.objects.filter(event=event).values('guests', 'attendees', 'budget_items', 'budget_amount').get()
+
+    def test_guest_saved_after_only(self):
+        guest_id = Guest.objects.create(event=self.event, name='Guest', plus_ones=1).id
+        guest = Guest.objects.only('id', 'name').get(id=guest_id)
+        guest.plus_ones = 3
+        guest.save()
+        self.assertEqual((self.stats(self.event)['guests'], self.stats(self.event)['attendees']), (1, 4))
+
+        guest = Guest.objects.defer('event', 'plus_ones').get(id=guest_id)
+        guest.event = self.other
+        guest.save()
+        self.assertEqual((self.stats(self.event)['guests'], self.stats(self.event)['attendees']), (0, 0))
+        self.assertEqual((self.stats(self.other)['guests'], self.stats(self.other)['attendees']), (1, 4))
+
+    def test_budget_item_saved_after_defer(self):
+        item_id = BudgetItem.objects.create(event=self.event, category='venue', item_name='Hall', estimated_cost=100, actual_cost=40).id
+        item = BudgetItem.objects.defer('actual_cost').get(id=item_id)
+        item.actual_cost = 75
+        item.save()
+        self.assertEqual(self.stats(self.event)['budget_amount'], Decimal('75'))
@@ -0,0 +1,134 @@
+import math
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+DEFAULT_SCOPE = 'default'
+ANONYMOUS_PLAN = 'anonymous'
+FALLBACK_PLAN = 'free'
+KEY_PREFIX = 'throttle'
+
+_PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """``'120/min'`` -> ``(capacity, tokens refilled per second)``; the period is read from its first letter like DRF's"""
+    count, period = rate.split('/')
+    count = int(count)
+    return count, count / _PERIODS[period[0]]
+
+
+def plan_rate(user, scope):
+    """The rate string ``user``'s plan allows in ``scope``, or ``None`` for no limit.
+
+    Staff are never throttled. A plan without its own entry for ``scope``
+    has no extra limit there beyond its default scope.
+    """
+    if not getattr(settings, 'THROTTLE_ENABLED', True):
+        return None
+    if user is not None and user.is_authenticated:
+        if user.is_staff:
+            return None
+        plan = user.subscription_plan
+    else:
+        plan = ANONYMOUS_PLAN
+    rates = settings.THROTTLE_PLAN_RATES
+    return rates.get(plan, rates[FALLBACK_PLAN]).get(scope)
+
+
+def _refill(state, now, capacity, per_second):
+    """Spend one token from the bucket ``state``; returns ``(new state, seconds to wait or 0)``"""
+    tokens = capacity if state is None else min(capacity, state[0] + (now - state[1]) * per_second)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / per_second
+
+
+def _bucket_args(rate):
+    capacity, per_second = parse_rate(rate)
+    # An idle bucket is full again after this long, and the same as a missing one
+    return capacity, per_second, math.ceil(capacity / per_second)
+
+
+def take(key, rate):
+    """Take a token from the bucket ``key``; returns 0, or the seconds until one is available.
+
+    The bucket is one ``(tokens, timestamp)`` value in the throttle cache,
+    refilled lazily, so each call is a get and a set. Two workers racing on
+    the same bucket can each spend the last token: the limit is approximate
+    by at most the number of concurrent requests, which a throttle can live with.
+    """
+    capacity, per_second, timeout = _bucket_args(rate)
+    cache = caches[settings.THROTTLE_CACHE]
+    state, wait = _refill(cache.get(key), time.time(), capacity, per_second)
+    cache.set(key, state, timeout)
+    return wait
+
+
+async def atake(key, rate):
+    """``take`` for async views"""
+    capacity, per_second, timeout = _bucket_args(rate)
+    cache = caches[settings.THROTTLE_CACHE]
+    state, wait = _refill(await cache.aget(key), time.time(), capacity, per_second)
+    await cache.aset(key, state, timeout)
+    return wait
+
+
+def bucket_key(scope, ident):
+    return f'{KEY_PREFIX}:{scope}:{ident}'
+
+
+class PlanRateThrottle(BaseThrottle):
+    """Token-bucket throttle with rates from the user's subscription plan.
+
+    Each user has one bucket per scope, holding up to the plan's request
+    count for the period and refilling continuously, so short bursts pass
+    and sustained load settles at the plan's rate. Anonymous requests share
+    a bucket per client address. Rates are ``THROTTLE_PLAN_RATES``.
+    """
+
+    scope = DEFAULT_SCOPE
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        rate = plan_rate(request.user, self.scope)
+        if rate is None:
+            return True
+        ident = request.user.pk if request.user.is_authenticated else f'ip-{self.get_ident(request)}'
+        self.wait_seconds = take(bucket_key(self.scope, ident), rate) or None
+        return self.wait_seconds is None
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AnalyticsRateThrottle(PlanRateThrottle):
+    scope = 'analytics'
+
+
+class ExportRateThrottle(PlanRateThrottle):
+    scope = 'exports'
+
+
+class BulkRateThrottle(PlanRateThrottle):
+    scope = 'bulk'
+
+
+async def athrottle_wait(user, scopes):
+    """For async views outside DRF: seconds the user must wait under ``scopes``, or ``None`` to go ahead.
+
+    Scopes are checked in order and stop at the first that is exhausted,
+    so a refused request doesn't spend tokens from the later ones.
+    """
+    for scope in scopes:
+        rate = plan_rate(user, scope)
+        if rate is None:
+            continue
+        wait = await atake(bucket_key(scope, user.pk), rate)
+        if wait:
+            return wait
+    return None
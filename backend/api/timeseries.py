@@ -0,0 +1,179 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Sum, Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Event, BudgetItem, Guest, EventDailyStats, UserDailyStats, ArchivedEvent
+
+GRANULARITIES = ('day', 'week', 'month')
+MAX_BUCKETS = 800
+
+
+def bump(model, keys, **deltas):
+    """Add ``deltas`` to the rollup row identified by ``keys``, creating it if needed."""
+    deltas = {name: value for name, value in deltas.items() if value}
+    if not deltas:
+        return
+    updates = {name: F(name) + value for name, value in deltas.items()}
+    if model.objects.filter(**keys).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**keys, **deltas)
+    except IntegrityError:
+        model.objects.filter(**keys).update(**updates)
+
+
+def record_budget_item(event_id, created_at, sign=1, amount=0):
+    bump(EventDailyStats, {'event_id': event_id, 'date': timezone.localdate(created_at)},
+         budget_items=sign, budget_amount=amount)
+
+
+def record_guest(event_id, created_at, sign=1, attendees=0):
+    bump(EventDailyStats, {'event_id': event_id, 'date': timezone.localdate(created_at)},
+         guests=sign, attendees=attendees)
+
+
+def record_event(user_id, created_at, sign=1):
+    bump(UserDailyStats, {'user_id': user_id, 'date': timezone.localdate(created_at)}, events_created=sign)
+
+
+def rebuild_event_stats(event_ids=None):
+    """Recompute ``EventDailyStats`` from the budget and guest tables.
+
+    Bulk writes that bypass model signals (``bulk_create``, ``update``,
+    raw deletes) must call this for the events they touched.
+    """
+    budget_items = BudgetItem.objects.all()
+    guests = Guest.objects.all()
+    existing = EventDailyStats.objects.all()
+    if event_ids is not None:
+        event_ids = list(event_ids)
+        budget_items = budget_items.filter(event_id__in=event_ids)
+        guests = guests.filter(event_id__in=event_ids)
+        existing = existing.filter(event_id__in=event_ids)
+
+    buckets = defaultdict(dict)
+    for row in (budget_items.annotate(day=TruncDate('created_at')).values('event_id', 'day')
+                .annotate(count=Count('id'), amount=Sum('actual_cost')).order_by()):
+        buckets[row['event_id'], row['day']].update(budget_items=row['count'], budget_amount=row['amount'])
+    for row in (guests.annotate(day=TruncDate('created_at')).values('event_id', 'day')
+                .annotate(count=Count('id'), attendees=Sum(F('plus_ones') + 1)).order_by()):
+        buckets[row['event_id'], row['day']].update(guests=row['count'], attendees=row['attendees'])
+
+    with transaction.atomic():
+        existing.delete()
+        EventDailyStats.objects.bulk_create(
+            [EventDailyStats(event_id=event_id, date=day, **values) for (event_id, day), values in buckets.items()],
+            batch_size=1000,
+        )
+
+
+def rebuild_user_stats(user_ids=None):
+    """Recompute ``UserDailyStats`` from the events table and the event archive.
+
+    Deleted events are not counted, so deletions that bypass model signals
+    must subtract them with ``record_event(..., sign=-1)``; archiving an
+    event doesn't change its count.
+    """
+    sources = [Event.objects.all(), ArchivedEvent.objects.all()]
+    existing = UserDailyStats.objects.all()
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        sources = [events.filter(user_id__in=user_ids) for events in sources]
+        existing = existing.filter(user_id__in=user_ids)
+
+    counts = defaultdict(int)
+    for events in sources:
+        for row in events.annotate(day=TruncDate('created_at')).values('user_id', 'day').annotate(count=Count('id')).order_by():
+            counts[row['user_id'], row['day']] += row['count']
+    with transaction.atomic():
+        existing.delete()
+        UserDailyStats.objects.bulk_create(
+            [UserDailyStats(user_id=user_id, date=day, events_created=count) for (user_id, day), count in counts.items()],
+            batch_size=1000,
+        )
+
+
+def bucket_start(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(day, granularity):
+    if granularity == 'week':
+        return day + timedelta(days=7)
+    if granularity == 'month':
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=1)
+
+
+def timeline_params(query_params, default='month'):
+    """Parse ``granularity``, ``start`` and ``end`` query parameters.
+
+    Raises ``ValueError`` with a client-facing message on invalid input.
+    """
+    granularity = query_params.get('granularity', default)
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+
+    bounds = []
+    for name in ('start', 'end'):
+        value = query_params.get(name)
+        parsed = parse_date(value) if value else None
+        if value and parsed is None:
+            raise ValueError(f'{name} must be a date in YYYY-MM-DD format')
+        bounds.append(parsed)
+    start, end = bounds
+    if start and end and start > end:
+        raise ValueError('start must not be after end')
+    return granularity, start, end
+
+
+def bucketed(rows, granularity, fields, start=None, end=None):
+    """Sum daily rollup ``rows`` into gap-filled buckets.
+
+    ``rows`` are dicts with a ``date`` key and the numeric ``fields``. Without
+    explicit bounds the series spans the first to the last day with data.
+    Each point is keyed by the granularity name (``day``, ``week``, ``month``).
+    """
+    totals = defaultdict(lambda: dict.fromkeys(fields, 0))
+    for row in rows:
+        bucket = totals[bucket_start(row['date'], granularity)]
+        for field in fields:
+            bucket[field] += row[field] or 0
+
+    if start is None or end is None:
+        if not totals:
+            return []
+        start = start or min(totals)
+        end = end or max(totals)
+
+    series = []
+    current = bucket_start(start, granularity)
+    while current <= end:
+        if len(series) >= MAX_BUCKETS:
+            raise ValueError(f'Range too large: at most {MAX_BUCKETS} {granularity} buckets per series')
+        point = totals.get(current) or dict.fromkeys(fields, 0)
+        series.append({granularity: current, **{
+            field: float(value) if isinstance(value, Decimal) else value for field, value in point.items()
+        }})
+        current = next_bucket(current, granularity)
+    return series
+
+
+def daily_rows(queryset, fields, start=None, end=None):
+    """One indexed range read of a rollup table."""
+    if start:
+        queryset = queryset.filter(date__gte=start)
+    if end:
+        queryset = queryset.filter(date__lte=end)
+    return queryset.values('date', *fields)
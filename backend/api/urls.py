@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views, analytics
+from . import views, analytics, revenue, workspace, live, exports, cloning, series, seating, dedup, contacts, profiling, archival, deletion, budget_sheet, sync
 
 urlpatterns = [
     # Authentication
@@ -10,20 +10,62 @@ urlpatterns = [
     # Events
     path('events/', views.EventListCreateView.as_view(), name='event-list-create'),
     path('events/<int:pk>/', views.EventDetailView.as_view(), name='event-detail'),
+    path('events/<int:event_id>/workspace/', workspace.event_workspace, name='event-workspace'),
+    path('events/<int:event_id>/live/', live.event_live_counters, name='event-live-counters'),
+    path('events/<int:event_id>/export/<str:kind>/', exports.export_event_data, name='event-export'),
+    path('events/<int:event_id>/clone/', cloning.clone_event_view, name='event-clone'),
+    path('deletions/<int:pk>/', deletion.deletion_job_detail, name='deletion-job-detail'),
+    
+    # Event templates
+    path('templates/', cloning.EventTemplateListCreateView.as_view(), name='event-template-list-create'),
+    path('templates/<int:pk>/', cloning.EventTemplateDetailView.as_view(), name='event-template-detail'),
+    path('templates/<int:template_id>/create-event/', cloning.create_event_from_template, name='event-template-create-event'),
+    
+    # Recurring event series
+    path('series/', series.EventSeriesListCreateView.as_view(), name='event-series-list-create'),
+    path('series/<int:pk>/', series.EventSeriesDetailView.as_view(), name='event-series-detail'),
+    path('calendar/', series.event_calendar, name='event-calendar'),
+    
+    # Archived events
+    path('archive/events/', archival.ArchivedEventListView.as_view(), name='archived-event-list'),
+    path('archive/events/<int:pk>/', archival.ArchivedEventDetailView.as_view(), name='archived-event-detail'),
+    path('archive/events/<int:pk>/restore/', archival.restore_archived_event, name='archived-event-restore'),
     
     # Budget
     path('budget/', views.BudgetItemListCreateView.as_view(), name='budget-list-create'),
     path('budget/<int:pk>/', views.BudgetItemDetailView.as_view(), name='budget-detail'),
+    path('events/<int:event_id>/budget/bulk/', budget_sheet.bulk_save_budget, name='event-budget-bulk'),
     
     # Guests
     path('guests/', views.GuestListCreateView.as_view(), name='guest-list-create'),
     path('guests/<int:pk>/', views.GuestDetailView.as_view(), name='guest-detail'),
+    path('guests/duplicates/', dedup.guest_duplicates, name='guest-duplicates'),
+    path('guests/merge/', dedup.merge_duplicate_guests, name='guest-merge'),
+    path('events/<int:event_id>/sync/', sync.event_guest_sync, name='event-guest-sync'),
+    
+    # Contact book
+    path('contacts/', contacts.ContactListCreateView.as_view(), name='contact-list-create'),
+    path('contacts/<int:pk>/', contacts.ContactDetailView.as_view(), name='contact-detail'),
+    path('contact-groups/', contacts.ContactGroupListCreateView.as_view(), name='contact-group-list-create'),
+    path('contact-groups/<int:pk>/', contacts.ContactGroupDetailView.as_view(), name='contact-group-detail'),
+    path('contact-groups/<int:pk>/add-to-event/', contacts.add_group_to_event, name='contact-group-add-to-event'),
+    
+    # Seating
+    path('tables/', seating.TableListCreateView.as_view(), name='table-list-create'),
+    path('tables/<int:pk>/', seating.TableDetailView.as_view(), name='table-detail'),
+    path('seat-assignments/', seating.SeatAssignmentListCreateView.as_view(), name='seat-assignment-list-create'),
+    path('seat-assignments/<int:pk>/', seating.SeatAssignmentDetailView.as_view(), name='seat-assignment-detail'),
+    path('seating-constraints/', seating.SeatingConstraintListCreateView.as_view(), name='seating-constraint-list-create'),
+    path('seating-constraints/<int:pk>/', seating.SeatingConstraintDetailView.as_view(), name='seating-constraint-detail'),
+    path('events/<int:event_id>/seating/', seating.event_seating, name='event-seating'),
+    path('events/<int:event_id>/seating/optimize/', seating.optimize_seating, name='event-seating-optimize'),
     
     # Vendors
     path('vendors/', views.VendorListCreateView.as_view(), name='vendor-list-create'),
     path('vendors/<int:pk>/', views.VendorDetailView.as_view(), name='vendor-detail'),
 
     path('analytics/event/<int:event_id>/', analytics.event_analytics, name='event-analytics'),
+    path('analytics/events/', analytics.events_analytics, name='events-analytics'),
     path('analytics/overall/', analytics.overall_analytics, name='overall-analytics'),
 
     # WhatsApp
@@ -43,8 +85,16 @@ urlpatterns = [
     
     # Admin billing URLs
     path('admin/payments/', views.admin_payment_requests, name='admin_payment_requests'),
+    path('admin/payments/bulk/', views.bulk_review_payment_requests, name='bulk_review_payment_requests'),
     path('admin/payments/<int:request_id>/approve/', views.approve_payment_request, name='approve_payment_request'),
     path('admin/payments/<int:request_id>/reject/', views.reject_payment_request, name='reject_payment_request'),
+    path('admin/revenue/', revenue.revenue_analytics, name='admin_revenue_analytics'),
+    
+    # Admin request profiling
+    path('admin/profiles/', profiling.RequestProfileListView.as_view(), name='admin_request_profiles'),
+    path('admin/profiles/token/', profiling.create_profile_token, name='admin_request_profile_token'),
+    path('admin/profiles/<int:pk>/', profiling.request_profile_detail, name='admin_request_profile_detail'),
+    path('admin/profiles/<int:pk>/download/', profiling.download_request_profile, name='admin_request_profile_download'),
 
 
 
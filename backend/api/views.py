@@ -1,20 +1,29 @@
 from rest_framework import status, generics, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db import transaction
 from django.db.models import Sum, Count, Q
 from .models import User, Event, BudgetItem, Guest, Vendor, SubscriptionPlan, UserSubscription, PaymentHistory, UserSettings, PaymentRequest
 import urllib.parse
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, UserSerializer,
     EventSerializer, BudgetItemSerializer, GuestSerializer, VendorSerializer, UserProfileSerializer, SubscriptionPlanSerializer, UserSubscriptionSerializer, PaymentHistorySerializer, UserSettingsSerializer,
-    PaymentRequestSerializer
+    PaymentRequestSerializer, BudgetItemListSerializer, GuestListSerializer, DeletionJobSerializer
 )
+from .fieldsets import SparseFieldsetViewMixin
+from .async_utils import async_api_view, api_response
+from .deletion import fast_delete, in_owned_events, owned_events, start_deletion
+from .normalize import normalize_phone, normalize_email
+from .throttling import BulkRateThrottle, PlanRateThrottle
+from .timeseries import record_event
 
 from django.utils import timezone
-from datetime import timedelta
+from django.utils.dateparse import parse_datetime, parse_date
+from datetime import datetime, time, timedelta
 
 
 # Authentication Views
@@ -78,6 +87,7 @@ def user_profile(request):
 # WhatsApp Views
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
+@throttle_classes([PlanRateThrottle, BulkRateThrottle])
 def create_whatsapp_group(request):
     event_id = request.data.get('event_id')
     
@@ -87,17 +97,34 @@ def create_whatsapp_group(request):
         }, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        event = Event.objects.get(id=event_id, user=request.user)
+        event = owned_events(request.user).get(id=event_id)
     except Event.DoesNotExist:
         return Response({
             'message': 'Event not found'
         }, status=status.HTTP_404_NOT_FOUND)
     
-    # Get all guests with phone numbers for this event
-    guests_with_phones = Guest.objects.filter(
-        event=event,
-        phone__isnull=False
-    ).exclude(phone='').values_list('phone', 'name')
+    # Other events whose guests join the same group; people invited to
+    # several of them are messaged once
+    other_event_ids = request.data.get('event_ids') or []
+    try:
+        event_ids = {event.id, *(int(other_id) for other_id in other_event_ids)}
+    except (TypeError, ValueError):
+        return Response({
+            'message': 'event_ids must be a list of event IDs'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if owned_events(request.user).filter(id__in=event_ids).count() != len(event_ids):
+        return Response({
+            'message': 'Event not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    # Get all guests with phone numbers for these events, this event's first
+    guests_with_phones = sorted(
+        Guest.objects.filter(
+            event_id__in=event_ids,
+            phone__isnull=False
+        ).exclude(phone='').values_list('phone', 'name', 'contact__normalized_phone', 'event_id'),
+        key=lambda guest: guest[3] != event.id
+    )
     
     if not guests_with_phones:
         return Response({
@@ -108,15 +135,20 @@ def create_whatsapp_group(request):
     phone_numbers = []
     guest_names = []
     formatted_numbers_list = []
-    
-    for phone, name in guests_with_phones:
-        # Clean phone number (remove spaces, dashes, etc.)
-        clean_phone = ''.join(filter(str.isdigit, phone))
-        if clean_phone:
-            # Add country code if not present (assuming Bangladesh +880)
-            if not clean_phone.startswith('880'):
-                clean_phone = '880' + clean_phone.lstrip('0')
-            
+    seen_phones = set()
+    duplicates_skipped = 0
+    # A single event's list is taken as it is; only people invited to
+    # several of the listed events are deduplicated
+    dedupe = len(event_ids) > 1
+    
+    for phone, name, contact_phone, _ in guests_with_phones:
+        # Clean phone number, adding the country code if not present; the
+        # linked contact's number only stands in when the guest's won't parse
+        clean_phone = normalize_phone(phone) or contact_phone
+        if dedupe and clean_phone in seen_phones:
+            duplicates_skipped += 1
+        elif clean_phone:
+            seen_phones.add(clean_phone)
             formatted_number = f"+{clean_phone}"
             phone_numbers.append(clean_phone)
             guest_names.append(name)
@@ -168,6 +200,7 @@ Looking forward to seeing everyone there! 🎊"""
         'whatsapp_group_url': whatsapp_group_url,
         'individual_links': individual_links,
         'total_guests': len(phone_numbers),
+        'duplicates_skipped': duplicates_skipped,
         'instructions': [
             "1. Click 'Open WhatsApp' to open WhatsApp with welcome message",
             "2. Create a new group with the event name",
@@ -177,30 +210,63 @@ Looking forward to seeing everyone there! 🎊"""
         ]
     })
 
-@api_view(['GET'])
-@permission_classes([permissions.IsAuthenticated])
-def get_event_contacts(request, event_id):
+@async_api_view()
+async def get_event_contacts(request, event_id):
+    """Guest contact details for an event, plus ``?events=`` (comma-separated ids) for other
+    events; a person invited to several of them is listed once"""
+    event = await owned_events(request.user).filter(id=event_id).afirst()
+    if event is None:
+        return api_response({
+            'message': 'Event not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
     try:
-        event = Event.objects.get(id=event_id, user=request.user)
-    except Event.DoesNotExist:
-        return Response({
+        event_ids = {event.id, *(int(other_id) for other_id in request.query_params.get('events', '').split(',') if other_id)}
+    except ValueError:
+        return api_response({
+            'message': 'events must be comma-separated event IDs'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if await owned_events(request.user).filter(id__in=event_ids).acount() != len(event_ids):
+        return api_response({
             'message': 'Event not found'
         }, status=status.HTTP_404_NOT_FOUND)
     
-    # Get all guests with contact information
-    guests = Guest.objects.filter(event=event).values(
-        'id', 'name', 'phone', 'email', 'category', 'rsvp_status'
+    # Get all guests with contact information, this event's first
+    guests = sorted(
+        [guest async for guest in Guest.objects.filter(event_id__in=event_ids).values(
+            'id', 'name', 'phone', 'email', 'category', 'rsvp_status',
+            'event_id', 'contact__normalized_phone', 'contact__normalized_email'
+        )],
+        key=lambda guest: guest['event_id'] != event.id
     )
     
-    contacts_with_phone = [guest for guest in guests if guest['phone']]
-    contacts_with_email = [guest for guest in guests if guest['email']]
-    
-    return Response({
+    # Only people invited to several of the listed events are deduplicated,
+    # by the guest's own normalized value, or the linked contact's when
+    # the guest's won't parse
+    dedupe = len(event_ids) > 1
+    contacts_with_phone, seen_phones = [], set()
+    contacts_with_email, seen_emails = [], set()
+    for guest in guests:
+        contact_phone = guest.pop('contact__normalized_phone')
+        contact_email = guest.pop('contact__normalized_email')
+        phone = normalize_phone(guest['phone']) or contact_phone
+        email = normalize_email(guest['email']) or contact_email
+        if not dedupe:
+            del guest['event_id']
+        if guest['phone'] and not (dedupe and phone and phone in seen_phones):
+            seen_phones.add(phone)
+            contacts_with_phone.append(guest)
+        if guest['email'] and not (dedupe and email and email in seen_emails):
+            seen_emails.add(email)
+            contacts_with_email.append(guest)
+    
+    return api_response({
         'event': {
             'id': event.id,
             'name': event.name,
             'date': event.date
         },
+        'events': sorted(event_ids),
         'total_guests': len(guests),
         'contacts_with_phone': contacts_with_phone,
         'contacts_with_email': contacts_with_email,
@@ -210,7 +276,7 @@ def get_event_contacts(request, event_id):
 
 
 # Event Views
-class EventListCreateView(generics.ListCreateAPIView):
+class EventListCreateView(SparseFieldsetViewMixin, generics.ListCreateAPIView):
     serializer_class = EventSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
@@ -219,7 +285,7 @@ class EventListCreateView(generics.ListCreateAPIView):
     ordering_fields = ['date', 'created_at']
     
     def get_queryset(self):
-        return Event.objects.filter(user=self.request.user)
+        return owned_events(self.request.user)
     
     def list(self, request, *args, **kwargs):
         try:
@@ -240,32 +306,83 @@ class EventListCreateView(generics.ListCreateAPIView):
                 'message': f'Error fetching events: {str(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class EventDetailView(generics.RetrieveUpdateDestroyAPIView):
+# Events with at least this many guests are deleted by a background job
+BACKGROUND_DELETE_GUESTS = 5000
+
+class EventDetailView(SparseFieldsetViewMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = EventSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return Event.objects.filter(user=self.request.user)
+        if self.request.method == 'DELETE':
+            # Locked so concurrent deletes of one event queue behind each other;
+            # an event already being deleted is still found and gets its job back
+            return Event.objects.filter(user=self.request.user).select_for_update()
+        return owned_events(self.request.user)
+    
+    def destroy(self, request, *args, **kwargs):
+        """Delete with set-based batches; events with big guest lists go to a background job (202).
+
+        Deleting an event that already has a job running returns that job.
+        """
+        with transaction.atomic():
+            event = self.get_object()
+            if event.guests.count() < BACKGROUND_DELETE_GUESTS:
+                fast_delete(Event.objects.filter(id=event.id))
+                # fast_delete sends no delete signals
+                record_event(event.user_id, event.created_at, sign=-1)
+                return Response(status=status.HTTP_204_NO_CONTENT)
+            
+            # events_created drops once the job has deleted it (see api.signals)
+            job, _ = start_deletion(event, request.user)
+        return Response({
+            'message': 'Event deletion started',
+            'job': DeletionJobSerializer(job).data
+        }, status=status.HTTP_202_ACCEPTED)
 
 # Budget Views
-class BudgetItemListCreateView(generics.ListCreateAPIView):
+class BudgetItemListCreateView(SparseFieldsetViewMixin, generics.ListCreateAPIView):
     serializer_class = BudgetItemSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['event', 'category', 'status']
     
     def get_queryset(self):
-        return BudgetItem.objects.filter(event__user=self.request.user)
+        return in_owned_events(BudgetItem.objects.all(), self.request.user)
+    
+    def list(self, request, *args, **kwargs):
+        queryset = BudgetItemListSerializer.prepare(self.filter_queryset(self.get_queryset()), request)
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(BudgetItemListSerializer.render(page))
+        
+        return Response(BudgetItemListSerializer.render(queryset))
 
-class BudgetItemDetailView(generics.RetrieveUpdateDestroyAPIView):
+class BudgetItemDetailView(SparseFieldsetViewMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = BudgetItemSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return BudgetItem.objects.filter(event__user=self.request.user)
+        return in_owned_events(BudgetItem.objects.all(), self.request.user)
 
 # Guest Views
-class GuestListCreateView(generics.ListCreateAPIView):
+def guest_list_stats(queryset):
+    """RSVP and check-in counters shown above guest lists, in one query"""
+    confirmed = Q(rsvp_status='confirmed')
+    stats = queryset.aggregate(
+        total_guests=Count('id'),
+        total_attendees=Sum('plus_ones') + Count('id'),  # Each guest + their plus ones
+        confirmed_guests=Count('id', filter=confirmed),
+        pending_guests=Count('id', filter=Q(rsvp_status='pending')),
+        declined_guests=Count('id', filter=Q(rsvp_status='declined')),
+        checked_in_guests=Count('id', filter=Q(checked_in=True)),
+        confirmed_attendees=Sum('plus_ones', filter=confirmed) + Count('id', filter=confirmed),
+    )
+    stats['confirmed_attendees'] = stats['confirmed_attendees'] or 0
+    return stats
+
+class GuestListCreateView(SparseFieldsetViewMixin, generics.ListCreateAPIView):
     serializer_class = GuestSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
@@ -273,50 +390,33 @@ class GuestListCreateView(generics.ListCreateAPIView):
     search_fields = ['name', 'email']
     
     def get_queryset(self):
-        return Guest.objects.filter(event__user=self.request.user)
+        return in_owned_events(Guest.objects.all(), self.request.user)
     
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
+        stats = guest_list_stats(queryset)
         
-        # Calculate statistics
-        stats = queryset.aggregate(
-            total_guests=Count('id'),
-            total_attendees=Sum('plus_ones') + Count('id'),  # Each guest + their plus ones
-            confirmed_guests=Count('id', filter=Q(rsvp_status='confirmed')),
-            pending_guests=Count('id', filter=Q(rsvp_status='pending')),
-            declined_guests=Count('id', filter=Q(rsvp_status='declined')),
-            checked_in_guests=Count('id', filter=Q(checked_in=True)),
-        )
-        
-        # Calculate confirmed attendees (including plus ones)
-        confirmed_attendees = queryset.filter(rsvp_status='confirmed').aggregate(
-            total=Sum('plus_ones') + Count('id')
-        )['total'] or 0
-        
-        stats['confirmed_attendees'] = confirmed_attendees
-        
-        page = self.paginate_queryset(queryset)
+        rows = GuestListSerializer.prepare(queryset, request)
+        page = self.paginate_queryset(rows)
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            response_data = self.get_paginated_response(serializer.data)
+            response_data = self.get_paginated_response(GuestListSerializer.render(page))
             response_data.data['stats'] = stats
             return response_data
 
-        serializer = self.get_serializer(queryset, many=True)
         return Response({
-            'results': serializer.data,
+            'results': GuestListSerializer.render(rows),
             'stats': stats
         })
 
-class GuestDetailView(generics.RetrieveUpdateDestroyAPIView):
+class GuestDetailView(SparseFieldsetViewMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = GuestSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return Guest.objects.filter(event__user=self.request.user)
+        return in_owned_events(Guest.objects.all(), self.request.user)
 
 # Vendor Views
-class VendorListCreateView(generics.ListCreateAPIView):
+class VendorListCreateView(SparseFieldsetViewMixin, generics.ListCreateAPIView):
     serializer_class = VendorSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
@@ -326,7 +426,7 @@ class VendorListCreateView(generics.ListCreateAPIView):
     def get_queryset(self):
         return Vendor.objects.filter(user=self.request.user)
 
-class VendorDetailView(generics.RetrieveUpdateDestroyAPIView):
+class VendorDetailView(SparseFieldsetViewMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = VendorSerializer
     permission_classes = [permissions.IsAuthenticated]
     
@@ -420,7 +520,7 @@ def create_payment_request(request):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def payment_requests(request):
-    requests = PaymentRequest.objects.filter(user=request.user).order_by('-created_at')
+    requests = PaymentRequest.objects.filter(user=request.user).select_related('user', 'plan').order_by('-created_at')
     serializer = PaymentRequestSerializer(requests, many=True)
     return Response(serializer.data)
 
@@ -453,95 +553,230 @@ def payment_history(request):
     return Response(serializer.data)
 
 # Admin Views for Payment Management
+class PaymentQueuePagination(CursorPagination):
+    # ``id`` breaks ties so requests created in the same instant keep a stable order
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+def _parse_queue_bound(value, end_of_day=False):
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            if day is None:
+                return None
+            parsed = datetime.combine(day, time.max if end_of_day else time.min)
+    except ValueError:
+        # Well formed but out of range, like 2024-02-30
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAdminUser])
 def admin_payment_requests(request):
-    requests = PaymentRequest.objects.all().order_by('-created_at')
-    serializer = PaymentRequestSerializer(requests, many=True)
-    return Response(serializer.data)
-
-@api_view(['POST'])
-@permission_classes([permissions.IsAdminUser])
-def approve_payment_request(request, request_id):
-    try:
-        payment_request = PaymentRequest.objects.get(id=request_id)
-        admin_notes = request.data.get('admin_notes', '')
-        
-        # Update payment request status
-        payment_request.status = 'approved'
-        payment_request.admin_notes = admin_notes
-        payment_request.verified_at = timezone.now()
-        payment_request.save()
-        
-        # Calculate subscription period
-        start_date = timezone.now()
+    """Keyset-paginated payment queue with per-status counts.
+
+    Filters: ``status`` (comma separated), ``created_after`` and
+    ``created_before`` (ISO date or datetime). Counts cover the date window
+    regardless of the status filter, so queue tabs can show their totals.
+    """
+    requests = PaymentRequest.objects.all()
+    
+    for param, lookup, end_of_day in (('created_after', 'created_at__gte', False), ('created_before', 'created_at__lte', True)):
+        value = request.query_params.get(param)
+        if not value:
+            continue
+        bound = _parse_queue_bound(value, end_of_day)
+        if bound is None:
+            return Response({
+                'message': f'Invalid {param} date'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        requests = requests.filter(**{lookup: bound})
+    
+    counts = {choice: 0 for choice, _ in PaymentRequest.STATUS_CHOICES}
+    for row in requests.order_by().values('status').annotate(count=Count('id')):
+        counts[row['status']] = row['count']
+    
+    statuses = [value for value in request.query_params.get('status', '').split(',') if value]
+    if statuses:
+        requests = requests.filter(status__in=statuses)
+    
+    paginator = PaymentQueuePagination()
+    page = paginator.paginate_queryset(requests.select_related('user', 'plan'), request)
+    response = paginator.get_paginated_response(PaymentRequestSerializer(page, many=True).data)
+    response.data['counts'] = counts
+    return response
+
+APPROVABLE_PAYMENT_STATUSES = ('pending', 'submitted', 'verified')
+MAX_BULK_PAYMENT_REQUESTS = 1000
+
+def _approve_payment_requests(payment_requests, admin_notes):
+    """Approve payment requests and activate their subscriptions.
+
+    Issues a fixed number of queries however many requests are passed. Must
+    run inside a transaction with ``payment_requests`` locked and their plans
+    loaded. When a user has several requests, the most recent one decides
+    the subscription. Returns the subscriptions keyed by user id.
+    """
+    now = timezone.now()
+    PaymentRequest.objects.filter(id__in=[pr.id for pr in payment_requests]).update(
+        status='approved', admin_notes=admin_notes, verified_at=now, updated_at=now
+    )
+    
+    latest = {}
+    for payment_request in sorted(payment_requests, key=lambda pr: pr.created_at):
+        latest[payment_request.user_id] = payment_request
+    
+    # Upsert one subscription per user
+    subscriptions = []
+    for user_id, payment_request in latest.items():
         if payment_request.billing_cycle == 'monthly':
-            end_date = start_date + timedelta(days=30)
+            end_date = now + timedelta(days=30)
         else:
-            end_date = start_date + timedelta(days=365)
-        
-        # Create or update subscription
-        subscription, created = UserSubscription.objects.get_or_create(
-            user=payment_request.user,
-            defaults={
-                'plan': payment_request.plan,
-                'billing_cycle': payment_request.billing_cycle,
-                'status': 'active',
-                'current_period_start': start_date,
-                'current_period_end': end_date,
-            }
-        )
-        
-        if not created:
-            subscription.plan = payment_request.plan
-            subscription.billing_cycle = payment_request.billing_cycle
-            subscription.status = 'active'
-            subscription.current_period_start = start_date
-            subscription.current_period_end = end_date
-            subscription.save()
-        
-        # Update user subscription plan
-        payment_request.user.subscription_plan = payment_request.plan.name
-        payment_request.user.save()
-        
-        # Create payment history record
-        PaymentHistory.objects.create(
-            user=payment_request.user,
-            subscription=subscription,
+            end_date = now + timedelta(days=365)
+        subscriptions.append(UserSubscription(
+            user_id=user_id,
+            plan=payment_request.plan,
+            billing_cycle=payment_request.billing_cycle,
+            status='active',
+            current_period_start=now,
+            current_period_end=end_date,
+        ))
+    UserSubscription.objects.bulk_create(
+        subscriptions,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=['plan', 'billing_cycle', 'status', 'current_period_start', 'current_period_end', 'updated_at'],
+    )
+    subscriptions = {
+        subscription.user_id: subscription
+        for subscription in UserSubscription.objects.select_related('plan').filter(user_id__in=latest)
+    }
+    
+    # Only the subscription_plan column changes, one UPDATE per plan
+    users_by_plan = {}
+    for user_id, payment_request in latest.items():
+        users_by_plan.setdefault(payment_request.plan.name, []).append(user_id)
+    for plan_name, user_ids in users_by_plan.items():
+        User.objects.filter(id__in=user_ids).update(subscription_plan=plan_name)
+    
+    PaymentHistory.objects.bulk_create([
+        PaymentHistory(
+            user_id=payment_request.user_id,
+            subscription=subscriptions[payment_request.user_id],
             payment_request=payment_request,
             amount=payment_request.amount,
+            currency=payment_request.currency,
             status='completed',
             payment_method=payment_request.payment_method,
             transaction_id=payment_request.transaction_id
         )
+        for payment_request in payment_requests
+    ])
+    return subscriptions
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAdminUser])
+def approve_payment_request(request, request_id):
+    admin_notes = request.data.get('admin_notes', '')
+    with transaction.atomic():
+        try:
+            payment_request = PaymentRequest.objects.select_for_update(of=('self',)).select_related('plan').get(id=request_id)
+        except PaymentRequest.DoesNotExist:
+            return Response({
+                'message': 'Payment request not found'
+            }, status=status.HTTP_404_NOT_FOUND)
         
-        return Response({
-            'message': 'Payment approved and subscription activated',
-            'subscription': UserSubscriptionSerializer(subscription).data
-        })
+        if payment_request.status not in APPROVABLE_PAYMENT_STATUSES:
+            return Response({
+                'message': f'Payment request already {payment_request.status}'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-    except PaymentRequest.DoesNotExist:
+        subscriptions = _approve_payment_requests([payment_request], admin_notes)
+    
+    return Response({
+        'message': 'Payment approved and subscription activated',
+        'subscription': UserSubscriptionSerializer(subscriptions[payment_request.user_id]).data
+    })
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAdminUser])
+def bulk_review_payment_requests(request):
+    """Approve or reject many payment requests in one transaction.
+
+    Body: ``{"ids": [...], "action": "approve" | "reject", "admin_notes": ""}``.
+    Requests that don't exist or were already reviewed are reported as skipped.
+    """
+    ids = request.data.get('ids') or []
+    action = request.data.get('action')
+    admin_notes = request.data.get('admin_notes', '')
+    
+    if action not in ('approve', 'reject'):
         return Response({
-            'message': 'Payment request not found'
-        }, status=status.HTTP_404_NOT_FOUND)
+            'message': "Action must be 'approve' or 'reject'"
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if not isinstance(ids, list) or not ids:
+        return Response({
+            'message': 'A list of payment request IDs is required'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if len(ids) > MAX_BULK_PAYMENT_REQUESTS:
+        return Response({
+            'message': f'At most {MAX_BULK_PAYMENT_REQUESTS} payment requests can be reviewed at once'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        ids = {int(request_id) for request_id in ids}
+    except (TypeError, ValueError):
+        return Response({
+            'message': 'Payment request IDs must be integers'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    with transaction.atomic():
+        payment_requests = list(
+            PaymentRequest.objects.select_for_update(of=('self',)).select_related('plan')
+            .filter(id__in=ids, status__in=APPROVABLE_PAYMENT_STATUSES)
+        )
+        if payment_requests:
+            if action == 'approve':
+                _approve_payment_requests(payment_requests, admin_notes)
+            else:
+                now = timezone.now()
+                PaymentRequest.objects.filter(id__in=[pr.id for pr in payment_requests]).update(
+                    status='rejected', admin_notes=admin_notes, verified_at=now, updated_at=now
+                )
+    
+    processed = sorted(pr.id for pr in payment_requests)
+    return Response({
+        'message': f"{len(processed)} payment request(s) {'approved' if action == 'approve' else 'rejected'}",
+        'processed': processed,
+        'skipped': sorted(ids - set(processed))
+    })
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAdminUser])
 def reject_payment_request(request, request_id):
-    try:
-        payment_request = PaymentRequest.objects.get(id=request_id)
-        admin_notes = request.data.get('admin_notes', '')
+    admin_notes = request.data.get('admin_notes', '')
+    with transaction.atomic():
+        try:
+            payment_request = PaymentRequest.objects.select_for_update().get(id=request_id)
+        except PaymentRequest.DoesNotExist:
+            return Response({
+                'message': 'Payment request not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        if payment_request.status not in APPROVABLE_PAYMENT_STATUSES:
+            return Response({
+                'message': f'Payment request already {payment_request.status}'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
         payment_request.status = 'rejected'
         payment_request.admin_notes = admin_notes
         payment_request.verified_at = timezone.now()
         payment_request.save()
-        
-        return Response({
-            'message': 'Payment request rejected'
-        })
-        
-    except PaymentRequest.DoesNotExist:
-        return Response({
-            'message': 'Payment request not found'
-        }, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+    
+    return Response({
+        'message': 'Payment request rejected'
+    })
\ No newline at end of file
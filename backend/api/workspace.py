@@ -0,0 +1,108 @@
+import asyncio
+
+from .analytics import build_event_analytics
+from .async_utils import async_api_view, api_response, gather_queries
+from .deletion import owned_events
+from .models import Event, BudgetItem, Guest, Vendor
+from .serializers import EventSerializer, VendorSerializer, BudgetItemListSerializer, GuestListSerializer
+from .timeseries import timeline_params
+from .views import guest_list_stats
+
+WORKSPACE_SECTIONS = ('event', 'budget', 'guests', 'vendors', 'analytics')
+DEFAULT_SECTION_PAGE_SIZE = 50
+MAX_SECTION_PAGE_SIZE = 500
+
+
+def workspace_options(query_params):
+    """Parse ``sections`` and per-section page sizes.
+
+    ``page_size`` applies to every list section and ``<section>_page_size``
+    overrides it. Raises ``ValueError`` with a client-facing message.
+    """
+    requested = query_params.get('sections')
+    sections = [name for name in requested.split(',') if name] if requested else list(WORKSPACE_SECTIONS)
+    unknown = set(sections) - set(WORKSPACE_SECTIONS)
+    if unknown:
+        raise ValueError(f"Unknown sections: {', '.join(sorted(unknown))}")
+
+    page_sizes = {}
+    for section in ('budget', 'guests', 'vendors'):
+        value = query_params.get(f'{section}_page_size', query_params.get('page_size', DEFAULT_SECTION_PAGE_SIZE))
+        try:
+            page_sizes[section] = max(0, min(int(value), MAX_SECTION_PAGE_SIZE))
+        except (TypeError, ValueError):
+            raise ValueError(f'{section}_page_size must be an integer')
+    return sections, page_sizes
+
+
+def _page(rows, count, page_size):
+    return {
+        'count': count,
+        'results': rows,
+        'has_more': count > page_size,
+    }
+
+
+def budget_section(event, page_size):
+    budget_items = BudgetItem.objects.filter(event=event)
+    rows = BudgetItemListSerializer.render(BudgetItemListSerializer.prepare(budget_items)[:page_size])
+    count = len(rows) if len(rows) < page_size else budget_items.count()
+    return _page(rows, count, page_size)
+
+
+def guests_section(event, page_size):
+    guests = Guest.objects.filter(event=event)
+    stats = guest_list_stats(guests)
+    rows = GuestListSerializer.render(GuestListSerializer.prepare(guests)[:page_size])
+    return {**_page(rows, stats['total_guests'], page_size), 'stats': stats}
+
+
+def vendors_section(user, page_size, request):
+    vendors = Vendor.objects.filter(user=user)
+    rows = VendorSerializer(vendors[:page_size], many=True, context={'request': request}).data
+    count = len(rows) if len(rows) < page_size else vendors.count()
+    return _page(rows, count, page_size)
+
+
+@async_api_view()
+async def event_workspace(request, event_id):
+    """Everything the event screen needs for first paint, in one round trip.
+
+    Ownership is checked once, then the sections load concurrently. Clients
+    pick sections with ``?sections=`` and size the lists with ``?page_size=``
+    or ``?<section>_page_size=``; the analytics section also accepts the
+    timeline parameters.
+    """
+    try:
+        sections, page_sizes = workspace_options(request.query_params)
+        granularity, start, end = timeline_params(request.query_params)
+    except ValueError as e:
+        return api_response({'error': str(e)}, status=400)
+
+    event = await owned_events(request.user).filter(id=event_id).afirst()
+    if event is None:
+        return api_response({'error': 'Event not found'}, status=404)
+
+    loaders = {
+        'event': lambda: EventSerializer(event, context={'request': request}).data,
+        'budget': lambda: budget_section(event, page_sizes['budget']),
+        'guests': lambda: guests_section(event, page_sizes['guests']),
+        'vendors': lambda: vendors_section(request.user, page_sizes['vendors'], request),
+    }
+    names = [name for name in WORKSPACE_SECTIONS if name in loaders and name in sections]
+    analytics = None
+    if 'analytics' in sections:
+        analytics = build_event_analytics(event, request.user, granularity, start, end)
+
+    async def load_sections():
+        return dict(zip(names, await gather_queries(*(loaders[name] for name in names))))
+
+    try:
+        if analytics is None:
+            data = await load_sections()
+        else:
+            data, data_analytics = await asyncio.gather(load_sections(), analytics)
+            data['analytics'] = data_analytics
+    except ValueError as e:
+        return api_response({'error': str(e)}, status=400)
+    return api_response(data)
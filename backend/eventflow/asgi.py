@@ -0,0 +1,21 @@
+"""
+ASGI config for eventflow project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+
+The async endpoints (analytics, workspace, exports, live counters) only
+overlap their I/O when served over ASGI, e.g.:
+
+    uvicorn eventflow.asgi:application --workers 4
+
+For more information on this file, see
+https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'eventflow.settings')
+
+application = get_asgi_application()
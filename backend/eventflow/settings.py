@@ -34,6 +34,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
+    'api.profiling.ProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -63,12 +65,33 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'eventflow.wsgi.application'
+ASGI_APPLICATION = 'eventflow.asgi.application'
 
 # Database
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections open between requests, and between the queries
+        # async views hand to their worker threads (see ASYNC_QUERY_WORKERS)
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+    }
+}
+
+# Threads shared by async views for running ORM queries side by side; each
+# holds at most one database connection
+ASYNC_QUERY_WORKERS = config('ASYNC_QUERY_WORKERS', default=8, cast=int)
+
+# Cache. Request throttling keeps its buckets here, so production should set
+# REDIS_URL (needs the redis package) to share them across workers
+REDIS_URL = config('REDIS_URL', default='')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    } if REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
@@ -122,6 +145,9 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.PlanRateThrottle',
+    ],
 }
 
 # JWT Configuration
@@ -169,3 +195,39 @@ CORS_ALLOWED_ORIGINS = [
 CORS_ALLOW_CREDENTIALS = True
 
 CORS_ALLOW_ALL_ORIGINS = DEBUG  # Only in development
+
+# Request metrics, served at /metrics to staff users. Set METRICS_DIR to a
+# directory shared by the workers so a scrape covers all of them.
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_DIR = config('METRICS_DIR', default='')
+METRICS_FLUSH_SECONDS = 5
+
+# Completed events dated more than this many days ago are moved to the
+# archive tables by the archive_events command
+ARCHIVE_AFTER_DAYS = config('ARCHIVE_AFTER_DAYS', default=365, cast=int)
+
+# Request profiling: staff get an X-Profile header value from
+# /api/admin/profiles/token/, valid for this many seconds
+PROFILING_TOKEN_MAX_AGE = 3600
+
+# Statements slower than this are logged to the api.slow_queries logger,
+# with the calling code at most once per statement per interval; 0 disables
+SLOW_QUERY_THRESHOLD_MS = config('SLOW_QUERY_THRESHOLD_MS', default=500, cast=int)
+SLOW_QUERY_STACK_INTERVAL = 60
+
+# Offline guest sync: deletions are remembered this many days, and sync
+# tokens older than that make the client download the list again
+SYNC_TOMBSTONE_DAYS = config('SYNC_TOMBSTONE_DAYS', default=30, cast=int)
+
+# Request throttling: token buckets per user and scope, sized by the user's
+# subscription plan. 'default' covers every API request; the other scopes
+# add a tighter limit to expensive endpoints. A missing scope is unlimited.
+THROTTLE_ENABLED = config('THROTTLE_ENABLED', default=True, cast=bool)
+THROTTLE_CACHE = 'default'
+THROTTLE_PLAN_RATES = {
+    'anonymous': {'default': '60/min'},
+    'free': {'default': '120/min', 'analytics': '20/min', 'exports': '5/min', 'bulk': '10/min'},
+    'basic': {'default': '300/min', 'analytics': '60/min', 'exports': '20/min', 'bulk': '30/min'},
+    'pro': {'default': '600/min', 'analytics': '120/min', 'exports': '60/min', 'bulk': '60/min'},
+    'enterprise': {'default': '1200/min', 'analytics': '300/min', 'exports': '120/min', 'bulk': '120/min'},
+}